@@ -0,0 +1,118 @@
+"""
+Benchmark of ContextManager construction backed by the employee directory.
+
+For 10k and 100k employees reports:
+- construction time of the previous approach (copy of the config dict per request)
+- construction time with a cold directory (SQLite lookup) and a warm LRU
+- memory of the LRU when it holds every employee, and the database file size
+
+Usage:
+    python benchmarks/employee_directory_benchmark.py [--sizes 10000 100000] [--lookups 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add src directory to Python path for correct imports
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from agents_core.agents.context.context_config import (
+    user_context,
+    available_dates_for_vacation,
+    available_salary_increase_percentages,
+)
+from agents_core.agents.context.context_manager import (
+    ContextManager,
+    UserContext,
+    AvailableDatesForVacation,
+    AvailableSalaryIncreasePercentages,
+)
+from agents_core.storage.employee_directory import EmployeeDirectory, set_employee_directory
+
+TENANTS = ("acme", "globex", "initech", "umbrella")
+
+
+def build_context_before(session_id: str, tenant_id: str, user_id: str) -> None:
+    """ContextManager construction as it was: copy the config dict and rebuild everything."""
+    user_data = user_context.copy()
+    user_data["user_id"] = user_id
+    UserContext(**user_data)
+    AvailableDatesForVacation(dates=available_dates_for_vacation)
+    AvailableSalaryIncreasePercentages(percentages=available_salary_increase_percentages)
+
+
+def generate_employees(count: int):
+    for i in range(count):
+        yield {
+            "tenant_id": TENANTS[i % len(TENANTS)],
+            "user_id": f"user_{i}",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "position": "Developer",
+            "current_salary": 100000 + i % 50000,
+            "employee_rating": 50 + i % 50,
+            "vacation_dates": None,
+        }
+
+
+def time_per_call_us(func, keys) -> float:
+    start = time.perf_counter()
+    for tenant_id, user_id in keys:
+        func("bench", tenant_id, user_id)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def run(size: int, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "employees.db")
+        directory = EmployeeDirectory(db_path, cache_size=size)
+        start = time.perf_counter()
+        directory.load_employees(generate_employees(size))
+        load_s = time.perf_counter() - start
+        set_employee_directory(directory)
+
+        rng = random.Random(42)
+        keys = [(TENANTS[i % len(TENANTS)], f"user_{i}") for i in (rng.randrange(size) for _ in range(lookups))]
+        cold_keys = [(TENANTS[i % len(TENANTS)], f"user_{i}") for i in range(min(size, lookups))]
+
+        before_us = time_per_call_us(build_context_before, keys)
+        cold_us = time_per_call_us(lambda s, t, u: ContextManager(session_id=s, tenant_id=t, user_id=u), cold_keys)
+
+        # Fill the LRU with every employee and measure its memory
+        directory._cache.clear()
+        tracemalloc.start()
+        for i in range(size):
+            directory.get(TENANTS[i % len(TENANTS)], f"user_{i}")
+        lru_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        warm_us = time_per_call_us(lambda s, t, u: ContextManager(session_id=s, tenant_id=t, user_id=u), keys)
+        db_bytes = sum(os.path.getsize(db_path + suffix) for suffix in ("", "-wal") if os.path.exists(db_path + suffix))
+        set_employee_directory(None)
+
+    print(f"employees: {size:,} (bulk load {load_s:.2f}s, db file {db_bytes / 1e6:.1f} MB)")
+    print(f"  before (dict copy):      {before_us:8.2f} us/ContextManager")
+    print(f"  directory, cold (SQLite):{cold_us:8.2f} us/ContextManager")
+    print(f"  directory, warm (LRU):   {warm_us:8.2f} us/ContextManager")
+    print(f"  LRU memory, all cached:  {lru_bytes / 1e6:8.1f} MB ({lru_bytes / size:.0f} B/employee)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Offline evaluation of the local pre-router.
+
+Reads a labeled JSON lines file ({"message": ..., "label": "office_culture" | "approval_request"})
+and reports, for a range of thresholds:
+- coverage: share of requests that would skip the Route Agent LLM hop
+- accuracy: share of fast-path decisions that match the label
+plus classification latency.
+
+Optionally trains the token model on the sample file and saves it
+(use PRE_ROUTER_MODEL_PATH to load it in the application).
+
+Usage:
+    python benchmarks/evaluate_pre_router.py [--samples FILE] [--model FILE] [--train-model FILE]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+# Add src directory to Python path for correct imports
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from agents_core.agents.pre_router import PreRouter, train_token_model
+
+THRESHOLDS = (0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95)
+
+
+def load_samples(path: str) -> list[tuple[str, str]]:
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record["message"], record["label"]))
+    return samples
+
+
+def evaluate(router: PreRouter, samples: list[tuple[str, str]]) -> None:
+    decisions = [(router.classify(message), label) for message, label in samples]
+    latencies = sorted(decision.latency_ms for decision, _ in decisions)
+
+    print(f"samples: {len(samples)}, model: {'yes' if router.model else 'no'}")
+    print(f"latency ms: p50={latencies[len(latencies) // 2]:.4f} "
+          f"p99={latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.4f} "
+          f"mean={statistics.mean(latencies):.4f}")
+    print(f"{'threshold':>10}{'coverage':>10}{'accuracy':>10}{'errors':>8}")
+    for threshold in THRESHOLDS:
+        fast = [(d, label) for d, label in decisions if d.label is not None and d.confidence >= threshold]
+        correct = sum(1 for d, label in fast if d.label == label)
+        coverage = len(fast) / len(decisions)
+        accuracy = correct / len(fast) if fast else float("nan")
+        print(f"{threshold:>10.2f}{coverage:>10.1%}{accuracy:>10.1%}{len(fast) - correct:>8}")
+
+    misrouted = [(message, d) for (d, label), (message, _) in zip(decisions, samples)
+                 if d.label is not None and d.label != label and d.confidence >= router.threshold]
+    for message, decision in misrouted:
+        print(f"  misrouted at {router.threshold}: {message!r} -> {decision.label} ({decision.confidence:.2f}, {decision.source})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", default=str(Path(__file__).parent / "data" / "routing_samples.jsonl"))
+    parser.add_argument("--model", help="token model JSON to evaluate with the rules")
+    parser.add_argument("--train-model", help="train a token model on the samples and save it here")
+    parser.add_argument("--threshold", type=float, default=0.85)
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+
+    model = None
+    if args.train_model:
+        model = train_token_model(samples)
+        with open(args.train_model, "w", encoding="utf-8") as f:
+            json.dump(model, f, ensure_ascii=False)
+        print(f"token model saved to {args.train_model} (evaluated on its training data)")
+    elif args.model:
+        with open(args.model, encoding="utf-8") as f:
+            model = json.load(f)
+
+    evaluate(PreRouter(model=model, threshold=args.threshold), samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Prompt size per turn for a long session, with and without history compaction.
+
+Runs a long conversation with one agent through the mock model (offline) twice:
+with the full SDK-style history and with CompactingSession. It prints the model
+input tokens of every Nth turn. Without compaction the prompt grows linearly
+with the session. With compaction it flattens once the verbatim window and the
+summary are full.
+
+Usage:
+    python benchmarks/history_compaction_benchmark.py [--turns 60] [--agent hr] [--max-turns 6] [--budget 4000]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to Python path for correct imports
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+MESSAGES = [
+    "Can I take vacation from August 15 to 17?",
+    "What about the week after that, is it free as well?",
+    "Please remind me which dates are still available for my team.",
+    "I would also like to know how the approval process works for longer trips.",
+]
+
+
+async def run_session(agent, session, turns: int) -> list[tuple[int, float]]:
+    from agents import Runner
+    from agents_core.agents.context.context_manager import ContextManager
+
+    results = []
+    for turn in range(turns):
+        context = ContextManager(session_id="benchmark", tenant_id="default")
+        start = time.perf_counter()
+        result = await Runner.run(agent, MESSAGES[turn % len(MESSAGES)], session=session, context=context)
+        results.append((result.context_wrapper.usage.input_tokens, (time.perf_counter() - start) * 1000))
+    return results
+
+
+async def main_async(args) -> str:
+    from agents_core.agents.registry import agent_registry
+    from agents_core.storage.history import CompactingSession, HistoryPolicy
+    from agents_core.storage.session_store import SQLitePoolBackend, StoredSession
+
+    agent = agent_registry.get(args.agent)
+    full_backend = SQLitePoolBackend(os.path.join(args.workdir, "full.db"))
+    compact_backend = SQLitePoolBackend(os.path.join(args.workdir, "compact.db"))
+    policy = HistoryPolicy(max_turns=args.max_turns, token_budget=args.budget, summary_tokens=args.summary_tokens)
+    try:
+        full = await run_session(agent, StoredSession("benchmark", full_backend), args.turns)
+        compact = await run_session(
+            agent, CompactingSession("benchmark", compact_backend, policy, agent_name=agent.name), args.turns
+        )
+    finally:
+        full_backend.close()
+        compact_backend.close()
+
+    lines: list[str] = []
+    out = lines.append
+    out(f"agent: {agent.name}, turns: {args.turns}, policy: {policy}")
+    out("input tokens = all model calls of the turn (the mock model estimates 4 chars per token)")
+    out(f"{'turn':>6}{'full history':>16}{'compacted':>12}{'full ms':>10}{'compact ms':>12}")
+    for turn in range(0, args.turns, args.every):
+        (full_tokens, full_ms), (compact_tokens, compact_ms) = full[turn], compact[turn]
+        out(f"{turn + 1:>6}{full_tokens:>16}{compact_tokens:>12}{full_ms:>10.1f}{compact_ms:>12.1f}")
+    total_full = sum(tokens for tokens, _ in full)
+    total_compact = sum(tokens for tokens, _ in compact)
+    out(f"total input tokens: full {total_full}, compacted {total_compact} "
+        f"({1 - total_compact / total_full:.0%} fewer)")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--every", type=int, default=5, help="print every Nth turn")
+    parser.add_argument("--agent", default="hr", help="agent registry key")
+    parser.add_argument("--max-turns", type=int, default=6)
+    parser.add_argument("--budget", type=int, default=4000)
+    parser.add_argument("--summary-tokens", type=int, default=800)
+    args = parser.parse_args()
+
+    workdir = args.workdir = tempfile.mkdtemp(prefix="agents-history-")
+    # Offline configuration (must be set before the agents are imported)
+    os.environ["MODEL_PROVIDER"] = "mock"
+    os.environ["PUBSUB_PROJECT_ID"] = "disabled"
+    os.environ["EMPLOYEE_DB_PATH"] = os.path.join(workdir, "employees.db")
+    try:
+        # Agent hooks print every run; keep only the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = asyncio.run(main_async(args))
+        print(report)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Session read/append latency of the history store as it grows, single file vs shards.
+
+For every store size (number of stored history items) the store is filled
+directly with SQLite (sessions of --items-per-session items each, spread over
+the shards the way ShardedSessionBackend assigns them), then the session store
+API is measured on random existing sessions, --concurrency at a time:
+- read: get_tail (what a compacting session reads on every turn)
+- append: add_items with a user message and an answer (one chat turn)
+
+Reports p50/p99 latency and the size of the largest database file.
+
+Usage:
+    python benchmarks/history_storage_benchmark.py [--sizes 10000,1000000,10000000] [--shards 1,8]
+                                                   [--operations 2000] [--concurrency 16]
+
+Filling 10M items takes a few minutes and a few GB of disk in --workdir.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to Python path for correct imports
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from agents_core.storage.session_store import (
+    SQLitePoolBackend,
+    ShardedSessionBackend,
+    StoredSession,
+    shard_index,
+    shard_path,
+)
+
+TENANT = "bench"
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _item(session: int, index: int) -> str:
+    if index % 2 == 0:
+        return json.dumps({"role": "user", "content": f"message {index} of session {session}"})
+    return json.dumps({"role": "assistant", "content": f"answer {index} " + "x" * 200})
+
+
+def _fill(paths: list, size: int, items_per_session: int) -> int:
+    """Writes `size` items directly into the shard files. Returns the number of sessions."""
+    sessions = max(1, size // items_per_session)
+    connections = [sqlite3.connect(path) for path in paths]
+    for conn in connections:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+    pending = [([], []) for _ in paths]
+
+    def flush(shard: int) -> None:
+        session_rows, message_rows = pending[shard]
+        with connections[shard] as conn:
+            conn.executemany("INSERT OR IGNORE INTO agent_sessions (tenant_id, session_id) VALUES (?, ?)", session_rows)
+            conn.executemany(
+                "INSERT INTO agent_messages (tenant_id, session_id, message_data) VALUES (?, ?, ?)", message_rows
+            )
+        session_rows.clear()
+        message_rows.clear()
+
+    for session in range(sessions):
+        session_id = f"session-{session}"
+        shard = shard_index(TENANT, session_id, len(paths))
+        session_rows, message_rows = pending[shard]
+        session_rows.append((TENANT, session_id))
+        message_rows.extend((TENANT, session_id, _item(session, index)) for index in range(items_per_session))
+        if len(message_rows) >= 50_000:
+            flush(shard)
+    for shard in range(len(paths)):
+        flush(shard)
+    for conn in connections:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+    return sessions
+
+
+async def _measure(backend, sessions: int, operations: int, concurrency: int) -> dict:
+    rng = random.Random(0)
+    reads, appends = [], []
+
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            session_id = f"session-{rng.randrange(sessions)}"
+            shard = backend.backend_for(TENANT, session_id)
+            start = time.perf_counter()
+            await shard.get_tail(session_id, tenant_id=TENANT)
+            reads.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            await StoredSession(session_id, shard, TENANT).add_items([
+                {"role": "user", "content": "new message"},
+                {"role": "assistant", "content": "new answer " + "x" * 200},
+            ])
+            appends.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker(operations // concurrency) for _ in range(concurrency)))
+    return {"read": reads, "append": appends}
+
+
+def run(size: int, shards: int, args, workdir: str) -> dict:
+    directory = os.path.join(workdir, f"{size}-{shards}")
+    os.makedirs(directory)
+    db_path = os.path.join(directory, "conversation_history.db")
+    # Creates the schema
+    if shards > 1:
+        backend = ShardedSessionBackend.sqlite(db_path, shards)
+        paths = [shard_path(db_path, i) for i in range(shards)]
+    else:
+        backend = SQLitePoolBackend(db_path)
+        paths = [db_path]
+
+    start = time.perf_counter()
+    sessions = _fill(paths, size, args.items_per_session)
+    fill_seconds = time.perf_counter() - start
+    # Warm-up: opens every shard's connections before anything is measured
+    asyncio.run(_measure(backend, sessions, args.operations // 4, args.concurrency))
+    latencies = asyncio.run(_measure(backend, sessions, args.operations, args.concurrency))
+    backend.close()
+    largest = max(os.path.getsize(path) for path in paths)
+    shutil.rmtree(directory, ignore_errors=True)
+    return {**latencies, "fill_seconds": fill_seconds, "largest_mb": largest / 2**20}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,1000000,10000000", help="stored items, comma separated")
+    parser.add_argument("--shards", default="1,8", help="shard counts to compare, comma separated")
+    parser.add_argument("--items-per-session", type=int, default=20)
+    parser.add_argument("--operations", type=int, default=2000, help="reads and appends per configuration")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workdir", default=None, help="directory for the databases (default: a temp dir)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="agents-history-", dir=args.workdir)
+    try:
+        print(f"{'items':>10}{'shards':>8}{'fill s':>9}{'file MB':>9}"
+              f"{'read p50':>10}{'read p99':>10}{'append p50':>12}{'append p99':>12}  (ms)")
+        for size in (int(value) for value in args.sizes.split(",")):
+            for shards in (int(value) for value in args.shards.split(",")):
+                result = run(size, shards, args, workdir)
+                print(f"{size:>10}{shards:>8}{result['fill_seconds']:>9.1f}{result['largest_mb']:>9.1f}"
+                      f"{_percentile(result['read'], 50):>10.2f}{_percentile(result['read'], 99):>10.2f}"
+                      f"{_percentile(result['append'], 50):>12.2f}{_percentile(result['append'], 99):>12.2f}"
+                      f"  mean read {statistics.mean(result['read']):.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
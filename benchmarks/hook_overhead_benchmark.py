@@ -0,0 +1,192 @@
+"""
+Event-loop time spent in the agent lifecycle hooks per agent run, before and after the event log.
+
+One simulated agent run calls the hooks the way the Runner does: on_start,
+--tools pairs of on_tool_start/on_tool_end, then on_end with a final output of
+--output-chars characters. Pub/Sub is disabled, so only logging and metrics are
+measured. Variants:
+- print: the previous hooks, which printed a timestamped start line, the whole
+  final output and a separator to stdout from the event loop
+- event_log: the current hooks (JSON lines through the queued event log, INFO)
+- event_log_debug: the same with tool events enabled (EVENT_LOG_LEVEL=DEBUG)
+- event_log_sampled: INFO with agent_start/agent_end sampled at --sample-rate
+
+stdout (print) and the event log go to the same sink: a temp file (--sink file)
+or a pipe read by a child process (--sink pipe, like a container log driver).
+"drain ms" is the time the writer thread needed afterwards to write everything
+still queued; with a tight loop of runs and DEBUG on, the queue can fill up and
+events are dropped (the "dropped" column).
+
+Usage:
+    python benchmarks/hook_overhead_benchmark.py [--runs 20000] [--output-chars 4000] [--tools 2]
+                                                 [--sink file|pipe]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src directory to Python path for correct imports
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+os.environ["PUBSUB_PROJECT_ID"] = "disabled"
+
+from agents import Agent
+from agents.usage import Usage
+
+from agents_core.agents import hooks as hooks_module
+from agents_core.agents.event_log import DEBUG, INFO, EventLog, event_log_events
+from agents_core.agents.hooks import UnifiedAgentHooks
+
+
+class PrintHooks(UnifiedAgentHooks):
+    """The hooks as they were before the event log: synchronous prints on the event loop."""
+
+    async def on_start(self, context, agent) -> None:
+        self._state(context, create=True).agents[agent.name] = hooks_module._AgentRun(
+            started=time.perf_counter(),
+            input_tokens=context.usage.input_tokens,
+            output_tokens=context.usage.output_tokens,
+        )
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}] 🚀 Agent '{agent.name}' started execution")
+        await self._send_pubsub_message(context, agent, "think", f"Agent '{agent.name}' started execution")
+
+    async def on_end(self, context, agent, output) -> None:
+        self._finish_run(context, agent)
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}] ✅ Agent '{agent.name}' completed execution")
+        print(f"[{timestamp}] 📋 Final result from '{agent.name}': {output}")
+        print("-" * 80)
+        await self._send_pubsub_message(context, agent, "completion", str(output))
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        state = self._state(context, create=True)
+        state.tool_starts[getattr(context, 'tool_call_id', tool.name)] = time.perf_counter()
+        run = state.agents.get(agent.name)
+        if run is not None:
+            run.tool_calls += 1
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        started = self._state(context).tool_starts.pop(getattr(context, 'tool_call_id', tool.name), None)
+        if started is not None:
+            hooks_module.tool_duration.observe(
+                time.perf_counter() - started, agent.name, tool.name, hooks_module._tenant(context)
+            )
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def _simulate(hooks: UnifiedAgentHooks, runs: int, output: str, tools: int) -> list:
+    agent = Agent(name="HR Agent")
+    tool = SimpleNamespace(name="get_employee_info")
+    request = SimpleNamespace(tenant_id="bench", session_id="session-1", user_context=None)
+    timings = []
+    for run in range(runs):
+        usage = Usage()
+        context = SimpleNamespace(context=request, usage=usage)
+        start = time.perf_counter()
+        await hooks.on_start(context, agent)
+        for call in range(tools):
+            tool_context = SimpleNamespace(context=request, usage=usage, tool_call_id=f"call-{run}-{call}")
+            await hooks.on_tool_start(tool_context, agent, tool)
+            await hooks.on_tool_end(tool_context, agent, tool, '{"name": "John Doe", "vacation_days": 14}')
+        await hooks.on_end(context, agent, output)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+@contextlib.contextmanager
+def _sink(kind: str, path: str):
+    """Points stdout at the sink; yields a callable returning the bytes written so far."""
+    if kind == "file":
+        with open(path, "w", encoding="utf-8") as file, contextlib.redirect_stdout(file):
+            yield lambda: file.flush() or os.path.getsize(path)
+        return
+    reader = subprocess.Popen(["wc", "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    with contextlib.redirect_stdout(reader.stdin):
+        result = {}
+
+        def written() -> int:
+            if not result:
+                reader.stdin.close()
+                result["bytes"] = int(reader.stdout.read())
+                reader.wait()
+            return result["bytes"]
+
+        yield written
+
+
+def _dropped() -> float:
+    return sum(value for (event, outcome), value in event_log_events._merged().items() if outcome == "dropped")
+
+
+def run_variant(name: str, args, workdir: str) -> dict:
+    output = ("The vacation from 15 to 30 of August can be approved. " * 100)[:args.output_chars]
+    log = None
+    if name == "print":
+        hooks = PrintHooks()
+    else:
+        log = EventLog(
+            # "-": the writer thread writes to the redirected stdout
+            path="-",
+            level=DEBUG if name == "event_log_debug" else INFO,
+            sample_rates=(
+                {"agent_start": args.sample_rate, "agent_end": args.sample_rate}
+                if name == "event_log_sampled" else None
+            ),
+        )
+        hooks_module.event_log = log
+        hooks = UnifiedAgentHooks()
+
+    dropped = _dropped()
+    with _sink(args.sink, os.path.join(workdir, f"{name}.log")) as written:
+        timings = asyncio.run(_simulate(hooks, args.runs, output, args.tools))
+        start = time.perf_counter()
+        if log is not None:
+            log.close(timeout=60)
+        sys.stdout.flush()
+        drain_ms = (time.perf_counter() - start) * 1000
+        written_mb = written() / 2**20
+    return {"timings": timings, "drain_ms": drain_ms, "written_mb": written_mb, "dropped": _dropped() - dropped}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20000, help="simulated agent runs per variant")
+    parser.add_argument("--output-chars", type=int, default=4000, help="length of the final output")
+    parser.add_argument("--tools", type=int, default=2, help="tool calls per agent run")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="agent_start/agent_end rate of event_log_sampled")
+    parser.add_argument("--sink", choices=("file", "pipe"), default="file", help="where stdout and the log go")
+    parser.add_argument("--variants", default="print,event_log,event_log_debug,event_log_sampled")
+    args = parser.parse_args()
+
+    print(f"{args.runs} agent runs, {args.tools} tool calls each, {args.output_chars}-char output, {args.sink} sink")
+    print(f"{'variant':<20}{'mean':>9}{'p50':>9}{'p99':>9}{'drain ms':>10}{'written MB':>12}{'dropped':>9}"
+          "  (µs per run)")
+    with tempfile.TemporaryDirectory(prefix="agents-hooks-") as workdir:
+        for name in args.variants.split(","):
+            result = run_variant(name, args, workdir)
+            timings = result["timings"]
+            print(f"{name:<20}{statistics.mean(timings):>9.1f}{_percentile(timings, 50):>9.1f}"
+                  f"{_percentile(timings, 99):>9.1f}{result['drain_ms']:>10.1f}{result['written_mb']:>12.1f}"
+                  f"{result['dropped']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
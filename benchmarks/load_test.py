@@ -0,0 +1,222 @@
+"""
+Offline load test of the full agent graph.
+
+Drives `src.main:app` in-process (httpx ASGI transport, no network) with the
+deterministic mock model (MODEL_PROVIDER=mock) at a target request rate and reports:
+- throughput and end-to-end latency p50/p95/p99 (measured from the scheduled send
+  time, so queueing under overload is included)
+- latency per agent hop and per tool call, from SDK trace spans
+- event-loop lag (how late a 10 ms timer fires while the test runs)
+- prompt cache: input tokens per agent and the part served from the (simulated)
+  provider prompt cache
+- with --speculative: speculative specialist runs (hit rate, latency saved, wasted tokens)
+
+With the default zero model latency the numbers are the orchestration overhead of
+our own code: routing, hooks, sessions, context construction and tools.
+
+Usage:
+    python benchmarks/load_test.py [--rps 50] [--duration 10] [--endpoint chat|stream]
+                                   [--latency fixed:0] [--sessions 100] [--speculative] [--verbose]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+# Add repository root and src directory to Python path for correct imports
+repo_dir = Path(__file__).resolve().parent.parent
+for path in (repo_dir, repo_dir / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class SpanRecorder:
+    """Trace processor collecting agent and tool span durations."""
+
+    def __init__(self):
+        self.durations: dict[str, list[float]] = defaultdict(list)
+
+    def on_trace_start(self, trace) -> None:
+        pass
+
+    def on_trace_end(self, trace) -> None:
+        pass
+
+    def on_span_start(self, span) -> None:
+        pass
+
+    def on_span_end(self, span) -> None:
+        data = span.span_data
+        if data.type == "agent":
+            key = f"agent  {data.name}"
+        elif data.type == "function":
+            key = f"tool   {data.name}"
+        else:
+            return
+        if span.started_at and span.ended_at:
+            elapsed = datetime.fromisoformat(span.ended_at) - datetime.fromisoformat(span.started_at)
+            self.durations[key].append(elapsed.total_seconds() * 1000)
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+
+async def monitor_loop_lag(lags: list[float], stop: asyncio.Event, interval: float = 0.01) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+def load_messages(path: Path) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["message"] for line in f if line.strip()]
+
+
+async def run(args) -> str:
+    import httpx
+    from agents import add_trace_processor
+    from src.main import app
+    from agents_core.agents.mock_model import mock_model_stats
+    from agents_core.agents.prompt_cache import prompt_cache_stats
+    from agents_core.agents.speculation import speculation_stats
+    from agents_core.storage.session_store import close_session_backend
+
+    recorder = SpanRecorder()
+    add_trace_processor(recorder)
+    messages = load_messages(Path(args.samples))
+
+    latencies: list[float] = []
+    errors: dict[str, int] = defaultdict(int)
+    lags: list[float] = []
+    stop = asyncio.Event()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+
+        async def one_request(index: int, scheduled: float) -> None:
+            payload = {
+                "message": messages[index % len(messages)],
+                "session_id": f"load-{index % args.sessions}",
+                "user_id": f"user-{index % args.sessions}",
+            }
+            path = "/api/v1/chat/" if args.endpoint == "chat" else "/api/v1/chat/stream"
+            try:
+                response = await client.post(path, json=payload)
+                if response.status_code != 200:
+                    errors[f"HTTP {response.status_code}"] += 1
+                    return
+                if args.endpoint == "stream" and "event: done" not in response.text:
+                    errors["stream without done"] += 1
+                    return
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+        lag_task = asyncio.create_task(monitor_loop_lag(lags, stop))
+        tasks = []
+        start = time.perf_counter()
+        total = int(args.rps * args.duration)
+        for index in range(total):
+            # Open-loop schedule: requests are sent at a fixed rate regardless of completions
+            scheduled = start + index / args.rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one_request(index, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await lag_task
+
+    close_session_backend()
+
+    model = mock_model_stats()
+    lines: list[str] = []
+    out = lines.append
+    out(f"endpoint: {args.endpoint}, target: {args.rps} rps x {args.duration}s, "
+        f"model latency: {os.environ['MOCK_MODEL_LATENCY']}")
+    out(f"requests: {total}, ok: {len(latencies)}, errors: {dict(errors) or 0}")
+    out(f"throughput: {len(latencies) / elapsed:.1f} req/s, model calls: {model['calls']:.0f} "
+        f"({model['calls'] / max(total, 1):.1f} per request)")
+    out(f"latency ms: p50={percentile(latencies, 0.5):.1f} p95={percentile(latencies, 0.95):.1f} "
+        f"p99={percentile(latencies, 0.99):.1f} max={max(latencies, default=float('nan')):.1f}")
+    out(f"event-loop lag ms: p50={percentile(lags, 0.5):.2f} p99={percentile(lags, 0.99):.2f} "
+        f"max={max(lags, default=float('nan')):.2f}")
+    out(f"\n{'hop':<45}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for key in sorted(recorder.durations):
+        values = recorder.durations[key]
+        out(f"{key:<45}{len(values):>7}{percentile(values, 0.5):>9.1f}{percentile(values, 0.95):>9.1f}"
+            f"{percentile(values, 0.99):>9.1f}{statistics.mean(values):>9.1f}")
+    out(f"\n{'prompt cache':<45}{'calls':>7}{'hits':>9}{'input':>11}{'cached':>11}{'ratio':>8}")
+    for agent, stats in prompt_cache_stats().items():
+        out(f"{agent:<45}{stats['calls']:>7.0f}{stats['cache_hit_calls']:>9.0f}{stats['input_tokens']:>11.0f}"
+            f"{stats['cached_tokens']:>11.0f}{stats['cached_token_ratio']:>8.1%}")
+    speculation = speculation_stats()
+    if speculation:
+        out(f"\n{'speculation (tenant)':<45}{'runs':>7}{'hits':>9}{'hit rate':>11}{'saved ms':>11}{'wasted tok':>12}")
+        for tenant, stats in speculation.items():
+            out(f"{tenant:<45}{stats['runs']:>7.0f}{stats['hits']:>9.0f}{stats['hit_rate']:>11.1%}"
+                f"{stats['mean_saved_ms_per_run']:>11.1f}{stats['wasted_tokens_per_run']:>12.0f}  (per run)")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--endpoint", choices=("chat", "stream"), default="chat")
+    parser.add_argument("--latency", default="fixed:0", help="mock model latency spec, e.g. lognormal:300:0.4")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sessions", type=int, default=100, help="number of distinct sessions/users")
+    parser.add_argument("--samples", default=str(Path(__file__).parent / "data" / "routing_samples.jsonl"))
+    parser.add_argument("--speculative", action="store_true", help="run likely specialists alongside routing")
+    parser.add_argument("--verbose", action="store_true", help="keep agent hook output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="agents-load-")
+    # Offline, isolated configuration (must be set before the app is imported)
+    os.environ["MODEL_PROVIDER"] = "mock"
+    os.environ["MOCK_MODEL_LATENCY"] = args.latency
+    os.environ["MOCK_MODEL_SEED"] = str(args.seed)
+    os.environ["PUBSUB_PROJECT_ID"] = "disabled"
+    os.environ["SESSION_DB_PATH"] = os.path.join(workdir, "conversation_history.db")
+    os.environ["EMPLOYEE_DB_PATH"] = os.path.join(workdir, "employees.db")
+    if not args.verbose:
+        # Hook events are still written (the writer thread is part of the overhead), just not shown
+        os.environ["EVENT_LOG_PATH"] = os.path.join(workdir, "events.jsonl")
+    if args.speculative:
+        os.environ["SPECULATIVE_ROUTING_TENANTS"] = "*"
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with output:
+            report = asyncio.run(run(args))
+        print(report)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
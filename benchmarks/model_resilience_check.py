@@ -0,0 +1,231 @@
+"""
+Fault-injection check of ResilientModel against a local fake model server.
+
+Starts a minimal OpenAI Responses API server on 127.0.0.1 whose replies are
+scripted per request (answer after a delay, return an HTTP error, or drop the
+connection) and drives the real OpenAIResponsesModel through ResilientModel:
+- retry: two 500s then an answer -> the call succeeds on the third attempt
+- dropped connection -> retried like a 5xx
+- deadline: a reply slower than the agent deadline -> ModelTimeout at the deadline
+- hedging: after a warm-up that sets the p95, a stalled reply is overtaken by the hedge
+- circuit breaker: consecutive failures open it, further calls fail fast without
+  reaching the server, and after the reset one probe closes it again
+- non-retryable 400 -> raised at once, without retries
+
+Exits with status 1 if a scenario does not behave as expected. The same
+scenarios against an in-process model stub run with pytest
+(tests/test_resilient_model.py); this check adds the real HTTP client.
+
+Usage:
+    python benchmarks/model_resilience_check.py
+"""
+
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+# Add repository root and src directory to Python path for correct imports
+repo_dir = Path(__file__).resolve().parent.parent
+for path in (repo_dir, repo_dir / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+class FakeModelServer:
+    """Responses API stub; each request takes the next scripted reply (default: answer at once)."""
+
+    def __init__(self):
+        self.script: deque = deque()
+        self.requests = 0
+        self.server = None
+
+    @property
+    def base_url(self) -> str:
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    def push(self, *replies: tuple) -> None:
+        """Replies: ("ok", delay_s), ("status", code) or ("drop",)."""
+        self.script.extend(replies)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    name, _, value = line.partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+                await reader.readexactly(length)
+                self.requests += 1
+
+                reply = self.script.popleft() if self.script else ("ok", 0)
+                if reply[0] == "drop":
+                    return
+                if reply[0] == "status":
+                    body, status = json.dumps({"error": {"message": "injected", "type": "server_error"}}), reply[1]
+                else:
+                    await asyncio.sleep(reply[1])
+                    body, status = json.dumps(self._response(self.requests)), 200
+                data = body.encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\ncontent-type: application/json\r\n"
+                    f"content-length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Client gave up (hedge loser, deadline) or the server is stopping
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _response(number: int) -> dict:
+        return {
+            "id": f"resp_{number}",
+            "object": "response",
+            "created_at": time.time(),
+            "model": "fake",
+            "status": "completed",
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [{
+                "id": f"msg_{number}",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": f"answer {number}", "annotations": []}],
+            }],
+            "usage": {
+                "input_tokens": 10,
+                "output_tokens": 2,
+                "total_tokens": 12,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens_details": {"reasoning_tokens": 0},
+            },
+        }
+
+
+async def run() -> list[str]:
+    import logging
+    import openai
+    from agents import ModelSettings
+    from agents.models.interface import ModelTracing
+    from agents.models.openai_responses import OpenAIResponsesModel
+    from agents_core.agents.resilient_model import (
+        CircuitBreaker,
+        CircuitOpen,
+        ModelPolicy,
+        ModelTimeout,
+        ResilientModel,
+    )
+
+    # The SDK logs every injected failure; the scenario results are printed instead
+    logging.getLogger("openai.agents").setLevel(logging.CRITICAL)
+    server = FakeModelServer()
+    await server.start()
+    client = openai.AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+    inner = OpenAIResponsesModel(model="fake", openai_client=client)
+    failures: list[str] = []
+
+    def model(breaker: CircuitBreaker = None, **policy) -> ResilientModel:
+        policy = {"timeout_seconds": 5, "backoff_seconds": 0.01, **policy}
+        return ResilientModel(inner, "check", ModelPolicy(**policy), breaker or CircuitBreaker(failure_threshold=0))
+
+    async def call(resilient: ResilientModel):
+        response = await resilient.get_response(
+            None, "hello", ModelSettings(), [], None, [], ModelTracing.DISABLED, previous_response_id=None
+        )
+        return response.output[0].content[0].text
+
+    def check(name: str, ok: bool, detail: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: {detail}")
+        if not ok:
+            failures.append(name)
+
+    # Retry through server errors and a dropped connection
+    for name, errors in (("retry 5xx", [("status", 500), ("status", 503)]), ("retry dropped connection", [("drop",)])):
+        before = server.requests
+        server.push(*errors, ("ok", 0))
+        answer = await call(model(max_attempts=3))
+        check(name, server.requests - before == len(errors) + 1, f"{answer!r} after {server.requests - before} requests")
+
+    # Non-retryable errors are raised at once
+    before = server.requests
+    server.push(("status", 400))
+    try:
+        await call(model(max_attempts=3))
+        check("no retry on 400", False, "call succeeded")
+    except openai.BadRequestError:
+        check("no retry on 400", server.requests - before == 1, f"{server.requests - before} request(s)")
+
+    # Deadline
+    server.push(("ok", 2.0))
+    start = time.perf_counter()
+    try:
+        await call(model(timeout_seconds=0.3))
+        check("deadline", False, "call succeeded")
+    except ModelTimeout:
+        elapsed = time.perf_counter() - start
+        check("deadline", elapsed < 0.6, f"ModelTimeout after {elapsed * 1000:.0f} ms")
+
+    # Hedging: warm up the latency window, then stall the primary request
+    hedged = model(hedge=True, hedge_min_delay_seconds=0.05)
+    for _ in range(25):
+        server.push(("ok", 0.01))
+        await call(hedged)
+    server.push(("ok", 1.5), ("ok", 0.01))
+    start = time.perf_counter()
+    answer = await call(hedged)
+    elapsed = time.perf_counter() - start
+    check("hedge", elapsed < 0.5, f"{answer!r} in {elapsed * 1000:.0f} ms (hedge delay {hedged.hedge_delay() * 1000:.0f} ms)")
+
+    # Circuit breaker: opens after 3 failures, fails fast, probes after the reset
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0.3)
+    guarded = model(breaker, max_attempts=1)
+    server.push(*[("status", 500)] * 3)
+    for _ in range(3):
+        try:
+            await call(guarded)
+        except openai.InternalServerError:
+            pass
+    before = server.requests
+    start = time.perf_counter()
+    try:
+        await call(guarded)
+        check("breaker opens", False, "call succeeded")
+    except CircuitOpen:
+        elapsed = time.perf_counter() - start
+        check("breaker opens", server.requests == before and breaker.state == "open",
+              f"CircuitOpen in {elapsed * 1000:.2f} ms without a request")
+    await asyncio.sleep(0.35)
+    answer = await call(guarded)
+    check("breaker closes after probe", breaker.state == "closed", f"{answer!r}, state {breaker.state}")
+
+    await client.close()
+    await server.stop()
+    return failures
+
+
+def main() -> None:
+    failures = asyncio.run(run())
+    if failures:
+        print(f"\n{len(failures)} scenario(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nall scenarios passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark of the vectorized payroll engine: scalar loop vs. vectorized simulation
+at 1k / 100k / 1M employees. Payroll totals of both must agree; per-employee parity
+with the scalar rules is checked by tests/test_payroll_engine.py.
+
+Usage:
+    python benchmarks/payroll_engine_benchmark.py [--sizes 1000,100000,1000000] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path for correct imports
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from agents_core.agents.context.payroll_engine import evaluate_raise, simulate_raises
+
+AVAILABLE_PERCENTAGES = [5, 10, 15, 20, 25]
+
+
+def scalar_simulation(salaries, ratings, percentages, available):
+    total = 0.0
+    for salary, rating, percentage in zip(salaries.tolist(), ratings.tolist(), percentages.tolist()):
+        total += evaluate_raise(salary, rating, percentage, available)[2]
+    return total
+
+
+def benchmark(size: int, rng: np.random.Generator) -> None:
+    salaries = rng.uniform(10_000, 500_000, size).round(2)
+    ratings = rng.integers(0, 101, size)
+    percentages = rng.choice([0, 5, 10, 12, 15, 20, 25], size)
+
+    start = time.perf_counter()
+    scalar_total = scalar_simulation(salaries, ratings, percentages, AVAILABLE_PERCENTAGES)
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    simulation = simulate_raises(salaries, ratings, percentages, AVAILABLE_PERCENTAGES)
+    summary = simulation.summary()
+    vector_s = time.perf_counter() - start
+
+    if not np.isclose(scalar_total, summary["new_payroll"]):
+        raise AssertionError(f"payroll totals differ: {scalar_total} != {summary['new_payroll']}")
+    print(f"{size:>10,}{scalar_s * 1000:>14.1f}{vector_s * 1000:>14.1f}{scalar_s / vector_s:>10.1f}x"
+          f"{summary['budget_impact_percent']:>10.2f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'employees':>10}{'scalar ms':>14}{'vector ms':>14}{'speedup':>11}{'impact':>11}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        benchmark(size, rng)
+
+
+if __name__ == "__main__":
+    main()
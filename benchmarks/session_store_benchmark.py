@@ -0,0 +1,84 @@
+"""
+Concurrency benchmark for chat persistence.
+
+Compares the previous approach (a new SQLiteSession per request) with the
+pooled session store. One "chat persistence" operation is what a chat turn
+does with its session: read the history, then append the user message and
+the assistant answer.
+
+Reports p50/p99 latency at 1, 16 and 64 concurrent sessions.
+
+Usage:
+    python benchmarks/session_store_benchmark.py [--turns 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to Python path for correct imports
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+from agents import SQLiteSession
+from agents_core.storage.session_store import SQLitePoolBackend, StoredSession
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def _chat_turn(session, turn: int) -> None:
+    await session.get_items()
+    await session.add_items([
+        {"role": "user", "content": f"message {turn}"},
+        {"role": "assistant", "content": f"answer {turn} " + "x" * 500},
+    ])
+
+
+async def _run(make_session, concurrency: int, turns: int) -> list[float]:
+    latencies: list[float] = []
+
+    async def worker(worker_id: int):
+        for turn in range(turns):
+            start = time.perf_counter()
+            session = make_session(f"bench_{concurrency}_{worker_id}")
+            await _chat_turn(session, turn)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies
+
+
+async def main(turns: int) -> None:
+    print(f"{'store':<22}{'sessions':>10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for concurrency in (1, 16, 64):
+        with tempfile.TemporaryDirectory() as tmp:
+            before_path = os.path.join(tmp, "before.db")
+            before = await _run(lambda sid: SQLiteSession(sid, before_path), concurrency, turns)
+
+            backend = SQLitePoolBackend(os.path.join(tmp, "after.db"))
+            after = await _run(lambda sid: StoredSession(sid, backend), concurrency, turns)
+            backend.close()
+
+        for name, latencies in (("SQLiteSession/request", before), ("pooled store", after)):
+            print(
+                f"{name:<22}{concurrency:>10}"
+                f"{_percentile(latencies, 50):>10.2f}{_percentile(latencies, 99):>10.2f}"
+                f"{statistics.mean(latencies):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=20, help="chat turns per session")
+    args = parser.parse_args()
+    asyncio.run(main(args.turns))
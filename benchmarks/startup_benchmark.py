@@ -0,0 +1,133 @@
+"""
+Import-time and startup-time benchmark of the API.
+
+Each run is a fresh interpreter (offline: MODEL_PROVIDER=mock, Pub/Sub disabled) that measures:
+- import: `import src.main`
+- startup: application lifespan startup (agent warmup unless --lazy)
+- first request: first POST /api/v1/chat/ after startup
+It also checks that heavy optional modules (Pub/Sub client) are not imported
+when disabled, and lists the slowest imports (python -X importtime).
+
+Use --max-import-ms / --max-startup-ms to fail on regressions.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 5] [--lazy] [--max-import-ms N] [--max-startup-ms N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+repo_dir = Path(__file__).resolve().parent.parent
+
+# Modules that must not be loaded while their feature is disabled
+DEFERRED_MODULES = ("google.cloud.pubsub_v1",)
+
+CHILD = r"""
+import asyncio, json, sys, time
+start = time.perf_counter()
+import src.main
+imported = time.perf_counter()
+
+async def main():
+    import httpx
+    app = src.main.app
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            response = await client.post("/api/v1/chat/", json={"message": "What is the office culture like?"})
+            response.raise_for_status()
+        return started, time.perf_counter()
+
+started, answered = asyncio.run(main())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "first_request_ms": (answered - started) * 1000,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def child_env(workdir: str, lazy: bool) -> dict:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env.update({
+        "MODEL_PROVIDER": "mock",
+        "PUBSUB_PROJECT_ID": "disabled",
+        "AGENT_WARMUP": "false" if lazy else "true",
+        "SESSION_DB_PATH": os.path.join(workdir, "conversation_history.db"),
+        "EMPLOYEE_DB_PATH": os.path.join(workdir, "employees.db"),
+    })
+    return env
+
+
+def run_once(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=repo_dir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, top: int = 10) -> list[tuple[int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=repo_dir, env=env, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            # Top-level packages and our own modules
+            if cumulative.strip().isdigit() and ("." not in name or name.startswith("src.")) and name != "src.main":
+                entries.append((int(cumulative), name))
+    return sorted(entries, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--lazy", action="store_true", help="skip agent warmup (AGENT_WARMUP=false)")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-startup-ms", type=float)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="agents-startup-") as workdir:
+        env = child_env(workdir, args.lazy)
+        runs = [run_once(env) for _ in range(args.runs)]
+        imports = slowest_imports(env)
+
+    failures = []
+    print(f"runs: {args.runs}, agent warmup: {'off' if args.lazy else 'on'}")
+    for key in ("import_ms", "startup_ms", "first_request_ms"):
+        values = [run[key] for run in runs]
+        print(f"{key:<18} median={statistics.median(values):8.1f}  min={min(values):8.1f}  max={max(values):8.1f}")
+    total = statistics.median(run["import_ms"] + run["startup_ms"] for run in runs)
+    print(f"{'import+startup':<18} median={total:8.1f}")
+
+    print("\nslowest imports, packages and src modules (cumulative ms):")
+    for cumulative, name in imports:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    if loaded:
+        failures.append(f"deferred modules imported while disabled: {', '.join(loaded)}")
+    if args.max_import_ms and statistics.median(run["import_ms"] for run in runs) > args.max_import_ms:
+        failures.append(f"import time above {args.max_import_ms} ms")
+    if args.max_startup_ms and total > args.max_startup_ms:
+        failures.append(f"import+startup time above {args.max_startup_ms} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
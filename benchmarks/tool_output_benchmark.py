@@ -0,0 +1,130 @@
+"""
+Prompt-token benchmark of context tool output formats.
+
+Runs the scenarios from the HR, Payroll and CEO agent modules' main() with the
+offline mock model (MODEL_PROVIDER=mock), once per TOOL_OUTPUT_FORMAT, each in a
+fresh interpreter (agents pick their format when they are built), and reports:
+- tool output tokens: size of all tool results of the scenario
+- prompt tokens: model input tokens summed over every model call of every agent
+  run (nested consultations included), from the agent_input_tokens metric
+
+Tokens are counted with tiktoken (o200k_base) when it is installed; otherwise,
+and always for prompt tokens, the mock model's estimate of 4 characters per token
+(over the instructions, tool schemas and JSON-encoded model input) is used.
+
+Usage:
+    python benchmarks/tool_output_benchmark.py [--formats verbose,compact,json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+repo_dir = Path(__file__).resolve().parent.parent
+
+# (name, agent key, message): the examples in each agent module's main()
+SCENARIOS = [
+    ("hr", "hr", "I want to take a vacation from 15 to 30 of August. Can you check if I can take it?"),
+    ("payroll", "payroll", "I want to increase my salary by 10%."),
+    ("ceo", "ceo",
+     "I need a salary increase by 10% and also want to schedule a vacation from 15 to 17 of August. "
+     "Can you help me with both the compensation review and vacation planning?"),
+]
+
+CHILD = r"""
+import asyncio, contextlib, io, json, sys
+sys.path[:0] = ["src"]
+from agents import Runner, add_trace_processor
+from agents_core.agents.context.context_manager import ContextManager
+from agents_core.agents.hooks import agent_input_tokens
+from agents_core.agents.registry import agent_registry
+
+try:
+    import tiktoken
+    encoding = tiktoken.get_encoding("o200k_base")
+    count_tokens = lambda text: len(encoding.encode(text))
+except ImportError:
+    count_tokens = lambda text: len(text) // 4
+
+
+class ToolOutputs:
+    outputs = []
+
+    def on_span_end(self, span):
+        if span.span_data.type == "function" and span.span_data.name not in ("hr_consultation", "payroll_consultation"):
+            self.outputs.append(str(span.span_data.output or ""))
+
+    on_trace_start = on_trace_end = on_span_start = lambda self, *args: None
+    shutdown = force_flush = lambda self: None
+
+
+def prompt_tokens():
+    return sum(series[-2] for series in agent_input_tokens._merged().values())
+
+
+async def main():
+    # Building the agents configures the mock provider, which resets trace processors
+    agent_registry.warmup()
+    recorder = ToolOutputs()
+    add_trace_processor(recorder)
+    results = {}
+    for name, key, message in %r:
+        recorder.outputs.clear()
+        before = prompt_tokens()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await Runner.run(agent_registry.get(key), message, context=ContextManager())
+        results[name] = {
+            "tool_calls": len(recorder.outputs),
+            "tool_output_tokens": sum(count_tokens(output) for output in recorder.outputs),
+            "prompt_tokens": prompt_tokens() - before,
+        }
+    print(json.dumps(results))
+
+asyncio.run(main())
+""" % (SCENARIOS,)
+
+
+def run_format(fmt: str, workdir: str) -> dict:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env.pop("TOOL_OUTPUT_FORMATS", None)
+    env.update({
+        "MODEL_PROVIDER": "mock",
+        "PUBSUB_PROJECT_ID": "disabled",
+        "TOOL_OUTPUT_FORMAT": fmt,
+        # Every scenario runs its tools instead of reading the other format's cached results
+        "TOOL_CACHE_ENABLED": "false",
+        "SESSION_DB_PATH": os.path.join(workdir, "conversation_history.db"),
+        "EMPLOYEE_DB_PATH": os.path.join(workdir, "employees.db"),
+    })
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=repo_dir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", default="verbose,compact,json")
+    args = parser.parse_args()
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="agents-tool-format-") as workdir:
+        results = {fmt: run_format(fmt, workdir) for fmt in formats}
+
+    baseline = results[formats[0]]
+    print(f"{'scenario':<10}{'format':<10}{'tool calls':>11}{'tool tokens':>13}{'prompt tokens':>15}{'vs ' + formats[0]:>14}")
+    for name, _, _ in SCENARIOS:
+        for fmt in formats:
+            row = results[fmt][name]
+            change = (row["prompt_tokens"] / baseline[name]["prompt_tokens"] - 1) * 100 if baseline[name]["prompt_tokens"] else 0.0
+            print(f"{name:<10}{fmt:<10}{row['tool_calls']:>11}{row['tool_output_tokens']:>13}"
+                  f"{row['prompt_tokens']:>15.0f}{change:>13.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""
+Per-tenant admission control for the chat API.
+
+Each tenant has two token buckets:
+- requests: `requests_per_second` refill, `request_burst` capacity
+- model tokens: `tokens_per_minute` refill, `token_burst` capacity; a request is
+  charged an estimate (message length / 4 + `tokens_per_request` for prompts,
+  history and tool output)
+
+A request that does not fit its tenant's buckets is rejected at once with the
+time until it would fit (the API returns 429 with Retry-After) instead of
+queueing on the event loop. Admitted requests then take one of
+`max_concurrency` global slots. When all slots are busy, requests wait in
+per-tenant queues that are served round-robin, so one tenant with many queued
+requests does not delay the others. At most `max_queued` requests wait, each
+for up to `queue_timeout_seconds`; beyond that they are rejected as well.
+Tokens taken for a request that is then rejected for lack of a slot are given
+back, so queue rejections do not use up the tenant's rate budget.
+
+Buckets are kept for the `max_tenants` most recently seen tenants. A tenant
+dropped from the map starts again with full buckets, which an idle tenant's
+buckets have refilled to anyway.
+
+Configuration: environment variables give the defaults, and an optional JSON
+file (ADMISSION_CONFIG_PATH) overrides them and sets per-tenant limits. The file
+is re-read when it changes (checked at most every ADMISSION_RELOAD_SECONDS),
+so limits change without a restart. Bucket levels survive a reload. A file that
+is not valid JSON or has a wrong value (not a number, negative, max_concurrency
+below 1) is logged and skipped: the last good limits stay until it changes again.
+
+    {
+        "max_concurrency": 32,
+        "max_queued": 128,
+        "queue_timeout_seconds": 5,
+        "default": {"requests_per_second": 5, "request_burst": 10, "tokens_per_minute": 60000},
+        "tenants": {"acme": {"requests_per_second": 20, "request_burst": 40}}
+    }
+
+Environment variables:
+- ADMISSION_ENABLED: "true"/"false" (default true)
+- ADMISSION_CONFIG_PATH: JSON file with limits (optional)
+- ADMISSION_RELOAD_SECONDS: how often the file is checked for changes (default 5)
+- ADMISSION_MAX_CONCURRENCY: global concurrent chat requests (default 64)
+- ADMISSION_MAX_QUEUED: requests waiting for a slot (default 256)
+- ADMISSION_QUEUE_TIMEOUT_SECONDS: maximum wait for a slot (default 10)
+- ADMISSION_REQUESTS_PER_SECOND / ADMISSION_REQUEST_BURST: default request bucket (0 = unlimited)
+- ADMISSION_TOKENS_PER_MINUTE / ADMISSION_TOKEN_BURST: default model-token bucket (0 = unlimited)
+- ADMISSION_TOKENS_PER_REQUEST: fixed token estimate added to every message (default 1000)
+- ADMISSION_MAX_TENANTS: tenants whose buckets are kept (default 10000)
+- ADMISSION_MAX_BODY_BYTES: largest chat request body the middleware reads (default 1 MiB, larger gets 413)
+
+Metrics (see agents/metrics.py):
+- admission_rejections_total{tenant,reason}: reason is requests, tokens, queue_full or queue_timeout
+- admission_queue_wait_seconds{tenant}: time waited for a global slot
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, fields, replace
+from typing import Deque, Dict, Optional
+
+from .metrics import DURATION_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+admission_rejections = registry.counter(
+    "admission_rejections_total", "Chat requests rejected by admission control", ("tenant", "reason")
+)
+admission_queue_wait = registry.histogram(
+    "admission_queue_wait_seconds", "Time a chat request waited for a global slot", ("tenant",), DURATION_BUCKETS
+)
+
+
+class AdmissionRejected(Exception):
+    """The request is over its limits; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: float, reason: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class TenantLimits:
+    requests_per_second: float = 0  # 0 = unlimited
+    request_burst: float = 0  # 0 = max(1, requests_per_second)
+    tokens_per_minute: float = 0  # 0 = unlimited
+    token_burst: float = 0  # 0 = tokens_per_minute
+    tokens_per_request: int = 1000
+
+    def with_overrides(self, data: dict, name: str) -> "TenantLimits":
+        """Limits with the known keys of `data` replaced (unknown keys are ignored)."""
+        if not isinstance(data, dict):
+            raise ValueError(f"{name} must be a JSON object")
+        values = {}
+        for f in fields(TenantLimits):
+            if f.name in data:
+                kind = int if f.type in (int, "int") else float
+                values[f.name] = _limit(data[f.name], f"{name}.{f.name}", kind)
+        return replace(self, **values)
+
+
+def _limit(value, name: str, kind: type, minimum: float = 0):
+    """A config number of type `kind` that is at least `minimum`; ValueError otherwise."""
+    valid = not isinstance(value, bool) and isinstance(value, int if kind is int else (int, float))
+    if not valid or value < minimum:
+        expected = "an integer" if kind is int else "a number"
+        raise ValueError(f"{name} must be {expected} >= {minimum:g}, got {value!r}")
+    return kind(value)
+
+
+def _section(data: dict, key: str) -> dict:
+    section = data.get(key, {})
+    if not isinstance(section, dict):
+        raise ValueError(f"{key} must be a JSON object")
+    return section
+
+
+@dataclass(frozen=True)
+class AdmissionConfig:
+    max_concurrency: int = 64
+    max_queued: int = 256
+    queue_timeout_seconds: float = 10
+    default: TenantLimits = TenantLimits()
+    tenants: Dict[str, TenantLimits] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "AdmissionConfig":
+        return cls(
+            max_concurrency=int(os.getenv("ADMISSION_MAX_CONCURRENCY", "64")),
+            max_queued=int(os.getenv("ADMISSION_MAX_QUEUED", "256")),
+            queue_timeout_seconds=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10")),
+            default=TenantLimits(
+                requests_per_second=float(os.getenv("ADMISSION_REQUESTS_PER_SECOND", "0")),
+                request_burst=float(os.getenv("ADMISSION_REQUEST_BURST", "0")),
+                tokens_per_minute=float(os.getenv("ADMISSION_TOKENS_PER_MINUTE", "0")),
+                token_burst=float(os.getenv("ADMISSION_TOKEN_BURST", "0")),
+                tokens_per_request=int(os.getenv("ADMISSION_TOKENS_PER_REQUEST", "1000")),
+            ),
+        )
+
+    def with_overrides(self, data: dict) -> "AdmissionConfig":
+        """
+        Applies a parsed JSON config on top of this one (tenant limits inherit from the default).
+
+        Raises:
+            ValueError: the config has a wrong structure or value
+        """
+        if not isinstance(data, dict):
+            raise ValueError("admission config must be a JSON object")
+        default = self.default.with_overrides(_section(data, "default"), "default")
+        tenants = {
+            tenant: default.with_overrides(limits, f"tenants.{tenant}")
+            for tenant, limits in _section(data, "tenants").items()
+        }
+        return replace(
+            self,
+            max_concurrency=_limit(data.get("max_concurrency", self.max_concurrency), "max_concurrency", int, 1),
+            max_queued=_limit(data.get("max_queued", self.max_queued), "max_queued", int),
+            queue_timeout_seconds=_limit(
+                data.get("queue_timeout_seconds", self.queue_timeout_seconds), "queue_timeout_seconds", float
+            ),
+            default=default,
+            tenants=tenants,
+        )
+
+    def limits_for(self, tenant_id: str) -> TenantLimits:
+        return self.tenants.get(tenant_id, self.default)
+
+
+class TokenBucket:
+    """Token bucket that never blocks: callers ask how long until `amount` fits."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def configure(self, rate: float, burst: float) -> None:
+        self._refill()
+        # A bucket that was unlimited starts full
+        self.tokens = burst if self.rate <= 0 else min(self.tokens, burst)
+        self.rate = rate
+        self.burst = burst
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        # A request larger than the bucket is admitted when the bucket is full
+        amount = min(amount, self.burst)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.rate > 0:
+            self.tokens -= min(amount, self.burst)
+
+    def give(self, amount: float) -> None:
+        """Returns tokens taken for a request that was not run."""
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + min(amount, self.burst))
+
+
+class _TenantBuckets:
+    def __init__(self, limits: TenantLimits):
+        self.requests = TokenBucket(*self._request_rate(limits))
+        self.tokens = TokenBucket(*self._token_rate(limits))
+
+    @staticmethod
+    def _request_rate(limits: TenantLimits) -> tuple:
+        return limits.requests_per_second, limits.request_burst or max(1.0, limits.requests_per_second)
+
+    @staticmethod
+    def _token_rate(limits: TenantLimits) -> tuple:
+        return limits.tokens_per_minute / 60, limits.token_burst or limits.tokens_per_minute
+
+    def configure(self, limits: TenantLimits) -> None:
+        self.requests.configure(*self._request_rate(limits))
+        self.tokens.configure(*self._token_rate(limits))
+
+
+class _FairGate:
+    """Global concurrency slots; waiting requests are served round-robin by tenant."""
+
+    def __init__(self, limit: int):
+        self.loop = asyncio.get_running_loop()
+        self.limit = limit
+        self.active = 0
+        self.queued = 0
+        self.queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    async def acquire(self, tenant_id: str, max_queued: int, timeout: float) -> None:
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            admission_queue_wait.observe(0.0, tenant_id)
+            return
+        if self.queued >= max_queued:
+            raise AdmissionRejected("Too many requests are waiting", retry_after=1, reason="queue_full")
+
+        waiter = self.loop.create_future()
+        self.queues.setdefault(tenant_id, deque()).append(waiter)
+        self.queued += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except BaseException as e:
+            if waiter.done():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._remove(tenant_id, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise AdmissionRejected(
+                    f"No capacity within {timeout:g}s", retry_after=1, reason="queue_timeout"
+                ) from None
+            raise
+        finally:
+            admission_queue_wait.observe(time.perf_counter() - start, tenant_id)
+
+    def _remove(self, tenant_id: str, waiter: asyncio.Future) -> None:
+        queue = self.queues.get(tenant_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.queued -= 1
+            if not queue:
+                del self.queues[tenant_id]
+
+    def resize(self, limit: int) -> None:
+        """Applies a new slot count: extra slots go to waiters, missing ones are dropped on release."""
+        self.limit = limit
+        while self.queues and self.active < self.limit:
+            self.active += 1
+            self.release()
+
+    def release(self) -> None:
+        """Hands the slot to the next tenant in turn, or frees it."""
+        while self.queues and self.active <= self.limit:
+            tenant_id, queue = next(iter(self.queues.items()))
+            waiter = queue.popleft()
+            self.queued -= 1
+            if queue:
+                self.queues.move_to_end(tenant_id)
+            else:
+                del self.queues[tenant_id]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    """Rate limits per tenant plus fair global concurrency."""
+
+    def __init__(self, config: AdmissionConfig, config_path: Optional[str] = None,
+                 reload_seconds: float = 5, enabled: bool = True, max_tenants: int = 10000,
+                 max_body_bytes: int = 1 << 20):
+        self.base_config = config
+        self.config = config
+        self.config_path = config_path
+        self.reload_seconds = reload_seconds
+        self.enabled = enabled
+        self.max_tenants = max_tenants
+        self.max_body_bytes = max_body_bytes
+        self._config_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        # Least recently seen tenant first
+        self._buckets: "OrderedDict[str, _TenantBuckets]" = OrderedDict()
+        self._gate: Optional[_FairGate] = None
+        self.reload()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            AdmissionConfig.from_env(),
+            config_path=os.getenv("ADMISSION_CONFIG_PATH") or None,
+            reload_seconds=float(os.getenv("ADMISSION_RELOAD_SECONDS", "5")),
+            enabled=os.getenv("ADMISSION_ENABLED", "true").lower() == "true",
+            max_tenants=max(1, int(os.getenv("ADMISSION_MAX_TENANTS", "10000"))),
+            max_body_bytes=int(os.getenv("ADMISSION_MAX_BODY_BYTES", str(1 << 20))),
+        )
+
+    def reload(self) -> bool:
+        """Re-reads the config file if it changed. Returns True if limits were reloaded."""
+        self._checked_at = time.monotonic()
+        if not self.config_path:
+            return False
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = None
+        if mtime == self._config_mtime:
+            return False
+        if mtime is None:
+            config = self.base_config
+        else:
+            try:
+                with open(self.config_path, encoding="utf-8") as f:
+                    config = self.base_config.with_overrides(json.load(f))
+            except (OSError, ValueError) as e:
+                # Half-saved or wrong file: keep the last good limits, do not re-parse until it changes
+                logger.warning("Admission config %s not loaded, keeping current limits: %s", self.config_path, e)
+                self._config_mtime = mtime
+                return False
+        self._config_mtime = mtime
+        self.config = config
+        for tenant_id, buckets in self._buckets.items():
+            buckets.configure(config.limits_for(tenant_id))
+        if self._gate is not None:
+            self._gate.resize(config.max_concurrency)
+        return True
+
+    def _maybe_reload(self) -> None:
+        if self.config_path and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self.reload()
+
+    def _tenant(self, tenant_id: str) -> _TenantBuckets:
+        buckets = self._buckets.get(tenant_id)
+        if buckets is None:
+            buckets = self._buckets[tenant_id] = _TenantBuckets(self.config.limits_for(tenant_id))
+            while len(self._buckets) > self.max_tenants:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(tenant_id)
+        return buckets
+
+    def estimate_tokens(self, tenant_id: str, message: str) -> int:
+        return len(message) // 4 + self.config.limits_for(tenant_id).tokens_per_request
+
+    def check_rate(self, charges: Dict[str, tuple]) -> None:
+        """
+        Charges request and token buckets for {tenant: (requests, tokens)}. Either all
+        tenants are charged or none.
+
+        Raises:
+            AdmissionRejected: a bucket is empty (retry_after = time until it refills)
+        """
+        self._maybe_reload()
+        for tenant_id, (requests, tokens) in charges.items():
+            buckets = self._tenant(tenant_id)
+            for reason, bucket, amount in (("requests", buckets.requests, requests), ("tokens", buckets.tokens, tokens)):
+                delay = bucket.delay(amount)
+                if delay > 0:
+                    admission_rejections.inc(tenant_id, reason)
+                    raise AdmissionRejected(
+                        f"Rate limit exceeded for tenant '{tenant_id}' ({reason})", retry_after=delay, reason=reason
+                    )
+        for tenant_id, (requests, tokens) in charges.items():
+            buckets = self._tenant(tenant_id)
+            buckets.requests.take(requests)
+            buckets.tokens.take(tokens)
+
+    def refund(self, charges: Dict[str, tuple]) -> None:
+        """Gives back what check_rate charged, for a request rejected before it ran."""
+        for tenant_id, (requests, tokens) in charges.items():
+            buckets = self._buckets.get(tenant_id)
+            if buckets is not None:
+                buckets.requests.give(requests)
+                buckets.tokens.give(tokens)
+
+    def _get_gate(self) -> _FairGate:
+        if self._gate is None or self._gate.loop is not asyncio.get_running_loop():
+            self._gate = _FairGate(self.config.max_concurrency)
+        return self._gate
+
+    async def acquire_slot(self, tenant_id: str) -> _FairGate:
+        """
+        Waits for a global slot (fairly across tenants). Release it with gate.release().
+
+        Raises:
+            AdmissionRejected: the wait queue is full or the wait timed out
+        """
+        gate = self._get_gate()
+        try:
+            await gate.acquire(tenant_id, self.config.max_queued, self.config.queue_timeout_seconds)
+        except AdmissionRejected as e:
+            admission_rejections.inc(tenant_id, e.reason)
+            raise
+        return gate
+
+    async def admit(self, charges: Dict[str, tuple]) -> _FairGate:
+        """
+        check_rate, then acquire_slot for the first tenant; the charges are refunded if no slot is free.
+
+        Raises:
+            AdmissionRejected: see check_rate and acquire_slot
+        """
+        self.check_rate(charges)
+        try:
+            return await self.acquire_slot(next(iter(charges)))
+        except BaseException:
+            self.refund(charges)
+            raise
+
+    def stats(self) -> dict:
+        gate = self._gate
+        return {
+            "enabled": self.enabled,
+            "active": gate.active if gate else 0,
+            "queued": gate.queued if gate else 0,
+            "max_concurrency": self.config.max_concurrency,
+            "tenants": {
+                tenant_id: {
+                    "requests_available": round(buckets.requests.tokens, 2) if buckets.requests.rate else None,
+                    "tokens_available": round(buckets.tokens.tokens) if buckets.tokens.rate else None,
+                }
+                for tenant_id, buckets in self._buckets.items()
+            },
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController.from_env()
+    return _controller
@@ -0,0 +1,181 @@
+"""
+Deterministic fan-out for CEO Agent.
+
+For a compound request ("10% raise and vacation 15-17 August") CEO Agent normally
+spends a model turn on profile/eligibility tools, another deciding to consult,
+and only then do HR and Payroll run. With the fan-out the departments are
+detected up front with keyword rules, both consultations start at once with the
+employee profile and eligibility already in their input, and CEO Agent runs a
+single model turn (no tools) to combine their answers.
+
+Critical path: consultations in parallel + one CEO turn, instead of
+profile turn + consultation turn + consultations + final CEO turn.
+
+Consultant agents are clones of HR/Payroll Agent without the profile tools
+(the profile is in their input). A failed consultation is passed to CEO Agent
+as an error note, as the consultation tools do.
+
+The fan-out only applies to requests the pre-router sends straight to CEO Agent.
+When Route Agent hands off to CEO Agent, the handoff target is the regular CEO
+Agent (handoffs are fixed when Route Agent is built, and the user message is
+not part of the handoff), which consults the departments through its tools.
+
+`start_fan_out` returns the running consultations, so a streaming endpoint can
+report each one as it finishes before CEO Agent answers (see chat.py).
+
+Configuration (environment variables):
+- CEO_FANOUT_ENABLED: "true"/"false" (default false)
+
+Metrics (see agents/metrics.py):
+- ceo_fanout_total{departments}: fan-outs by consulted departments ("hr", "payroll", "hr+payroll")
+"""
+
+import asyncio
+import os
+import re
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+from agents import Agent, Runner
+
+from .context.context_manager import ContextManager
+from .metrics import registry
+from .prompt_cache import with_request_context
+from .registry import agent_registry
+
+ceo_fanout_total = registry.counter("ceo_fanout_total", "CEO fan-outs by consulted departments", ("departments",))
+
+HR = "hr"
+PAYROLL = "payroll"
+
+# Department -> pattern; a department is consulted if its pattern matches
+DEPARTMENT_RULES: Dict[str, re.Pattern] = {
+    PAYROLL: re.compile(
+        r"\bsalary\b|\braise\b|\bpay rise\b|\bcompensation\b|\bbonus\b|\b\d+\s?%|зарплат|оклад|повышени|преми",
+        re.IGNORECASE,
+    ),
+    HR: re.compile(
+        r"\bvacation\b|\bholiday(s)?\b|\bday(s)? off\b|\bleave\b|\bpto\b|отпуск|выходн",
+        re.IGNORECASE,
+    ),
+}
+
+# Tools whose output is already in the consultation input
+PROFILE_TOOLS = {"get_user_info", "get_user_basic_info", "get_employee_profile", "analyze_employee_eligibility"}
+
+CONSULTANT_NOTE = """
+    The employee profile and eligibility analysis are included in the request below;
+    do not look them up again. Answer the department-specific part of the request only.
+    """
+
+SYNTHESIS_INSTRUCTIONS = """
+    You are the CEO of the company. The departments have already been consulted about
+    the employee's request; the employee profile and their answers are in the request
+    context. Combine them into one natural, friendly answer on behalf of the company.
+    Do not ask the departments again.
+    """
+
+SYNTHESIS_CONTEXT = """Employee profile:
+{profile}
+
+Department consultations:
+{consultations}"""
+
+_consultants: Dict[str, Agent] = {}
+
+
+def fanout_enabled() -> bool:
+    return os.getenv("CEO_FANOUT_ENABLED", "false").lower() == "true"
+
+
+def detect_departments(message: str) -> List[str]:
+    """Departments whose consultation the request needs, in a fixed order."""
+    return [department for department, pattern in DEPARTMENT_RULES.items() if pattern.search(message)]
+
+
+def _consultant(department: str) -> Agent:
+    agent = _consultants.get(department)
+    if agent is None:
+        base = agent_registry.get(department)
+        agent = _consultants[department] = base.clone(
+            instructions=base.instructions + CONSULTANT_NOTE,
+            tools=[tool for tool in base.tools if getattr(tool, "name", None) not in PROFILE_TOOLS],
+        )
+    return agent
+
+
+CONSULTATION_TOOLS = {HR: "hr_consultation", PAYROLL: "payroll_consultation"}
+
+
+async def _consult(department: str, request: str, context: ContextManager) -> Tuple[str, str]:
+    try:
+        result = await Runner.run(_consultant(department), request, context=context)
+        return department, str(result.final_output)
+    except Exception as e:
+        return department, f"Consultation failed: {e}"
+
+
+class FanOut:
+    """Consultations of one request, started in parallel, and the CEO Agent that combines them."""
+
+    def __init__(self, departments: List[str], profile: str, request: str, context: ContextManager):
+        self.departments = departments
+        self.profile = profile
+        self.tasks: List["asyncio.Task[Tuple[str, str]]"] = [
+            asyncio.create_task(_consult(department, request, context)) for department in departments
+        ]
+
+    def as_completed(self):
+        """Awaitables of (department, answer), in completion order."""
+        return asyncio.as_completed(self.tasks)
+
+    async def synthesizer(self) -> Agent:
+        """
+        Waits for the consultations and returns a tool-less clone of CEO Agent with them as its
+        request context (run it with the original message and the session).
+        """
+        answers = await asyncio.gather(*self.tasks)
+        consultations = "\n\n".join(f"[{_consultant(department).name}]\n{answer}" for department, answer in answers)
+        ceo = agent_registry.get("ceo")
+        return ceo.clone(
+            # Static instructions stay a cacheable prefix; the per-employee part follows the input
+            instructions=with_request_context(
+                SYNTHESIS_INSTRUCTIONS, SYNTHESIS_CONTEXT.format(profile=self.profile, consultations=consultations)
+            ),
+            tools=[],
+            # Parallel tool calls make no sense (and are rejected) without tools
+            model_settings=replace(ceo.model_settings, parallel_tool_calls=None),
+        )
+
+    def cancel(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+
+def start_fan_out(message: str, context: ContextManager) -> Optional[FanOut]:
+    """
+    Starts the consultations the request needs.
+
+    Args:
+        message: The employee's request
+        context: Request context (the same one the consultations and CEO Agent use)
+
+    Returns:
+        The running fan-out, or None if no department matches the request
+    """
+    departments = detect_departments(message)
+    if not departments:
+        return None
+    ceo_fanout_total.inc("+".join(departments))
+    # Context functions import the tool stack; keep it off the import path of the API
+    from .context.functions import employee_eligibility, employee_profile
+    from .context.tool_format import current_format, format_for
+
+    # Injected profile uses CEO Agent's tool output format
+    token = current_format.set(format_for(agent_registry.get("ceo").name))
+    try:
+        profile = f"{employee_profile(context)}\n\n{employee_eligibility(context)}"
+    finally:
+        current_format.reset(token)
+    return FanOut(departments, profile, f"{profile}\n\nEmployee request: {message}", context)
+
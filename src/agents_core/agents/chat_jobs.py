@@ -0,0 +1,215 @@
+"""
+Asynchronous chat jobs: submit a message, poll for the answer.
+
+A CEO-routed turn chains several model calls and can outlive the HTTP timeout
+of a gateway in front of the API; the synchronous endpoint then keeps running
+for a client that is gone. With jobs the request is stored in the job table
+(storage/job_store.py) and answered at once with a job id; a bounded pool of
+in-process workers runs the turn and stores the answer for `GET .../jobs/{id}`.
+
+- The pool has a fixed number of worker tasks; at most `max_queued` accepted
+  jobs wait for a worker, further submissions are rejected with JobQueueFull
+  (the API answers 429).
+- Jobs still queued when the process stopped are enqueued again on the next
+  start; jobs that were running are failed (see JobStore.recover).
+- Finished jobs are removed `CHAT_JOB_TTL_SECONDS` after they finish by a
+  periodic cleanup.
+
+The queue does not know how to run a turn: the API starts it with a `runner`
+(job -> answer) and an `error_status` (exception -> HTTP status stored with the
+error), the same ones the synchronous endpoint uses.
+
+Configuration (environment variables):
+- CHAT_JOB_WORKERS: worker tasks (default 4)
+- CHAT_JOB_MAX_QUEUED: accepted jobs allowed to wait for a worker (default 1000)
+- CHAT_JOB_CLEANUP_INTERVAL_SECONDS: how often expired jobs are removed (default 60)
+- CHAT_JOB_DB_PATH, CHAT_JOB_TTL_SECONDS: see storage/job_store.py
+
+Metrics (see agents/metrics.py):
+- chat_jobs_total{tenant,status}: finished jobs by status (succeeded, failed)
+- chat_job_rejections_total{tenant}: submissions rejected because the queue was full
+- chat_job_queue_seconds{tenant}: time from submission to a worker picking the job up
+- chat_job_run_seconds{tenant}: time a worker spent on the job
+Queue depth and worker utilization: `ChatJobQueue.stats()` (GET /api/v1/chat/jobs/stats).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .metrics import DURATION_BUCKETS, registry
+from agents_core.storage.job_store import Job, JobStore
+
+logger = logging.getLogger(__name__)
+
+jobs_total = registry.counter("chat_jobs_total", "Finished chat jobs by status", ("tenant", "status"))
+job_rejections = registry.counter(
+    "chat_job_rejections_total", "Chat jobs rejected because the job queue was full", ("tenant",)
+)
+job_queue_seconds = registry.histogram(
+    "chat_job_queue_seconds", "Time a chat job waited for a worker", ("tenant",), DURATION_BUCKETS
+)
+job_run_seconds = registry.histogram(
+    "chat_job_run_seconds", "Time a worker spent on a chat job", ("tenant",), DURATION_BUCKETS
+)
+
+Runner = Callable[[Job], Awaitable[str]]
+
+
+class JobQueueFull(Exception):
+    """Too many accepted jobs are already waiting for a worker."""
+
+
+class ChatJobQueue:
+    """Job table plus a bounded pool of worker tasks on the application's event loop."""
+
+    def __init__(self, workers: int = 4, max_queued: int = 1000, cleanup_interval: float = 60,
+                 store_factory: Callable[[], JobStore] = JobStore.from_env):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.cleanup_interval = cleanup_interval
+        self._store_factory = store_factory
+        self._store: Optional[JobStore] = None
+        self._store_lock = threading.Lock()
+        self._runner: Optional[Runner] = None
+        self._error_status: Callable[[Exception], int] = lambda error: 500
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._submitting = 0
+        # Utilization accounting (event loop only)
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._busy_since: Dict[str, float] = {}
+        self._started_at = 0.0
+
+    @classmethod
+    def from_env(cls) -> "ChatJobQueue":
+        return cls(
+            workers=int(os.getenv("CHAT_JOB_WORKERS", "4")),
+            max_queued=int(os.getenv("CHAT_JOB_MAX_QUEUED", "1000")),
+            cleanup_interval=float(os.getenv("CHAT_JOB_CLEANUP_INTERVAL_SECONDS", "60")),
+        )
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = self._store_factory()
+        return self._store
+
+    def configure(self, runner: Runner, error_status: Callable[[Exception], int]) -> None:
+        """Sets how jobs are run and how their errors map to HTTP statuses."""
+        self._runner = runner
+        self._error_status = error_status
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop is asyncio.get_running_loop()
+
+    async def start(self) -> None:
+        """Starts the workers on the running loop and enqueues jobs left queued by the previous process."""
+        if self._start_lock is None or self._loop is not asyncio.get_running_loop():
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.running:
+                return
+            if self._runner is None:
+                raise RuntimeError("ChatJobQueue.configure() must be called before start()")
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            self._busy, self._busy_seconds, self._busy_since = 0, 0.0, {}
+            self._started_at = time.perf_counter()
+            for job in await self.store.recover():
+                self._queue.put_nowait(job)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+            self._tasks.append(asyncio.create_task(self._cleanup()))
+
+    async def stop(self) -> None:
+        """Cancels the workers; jobs they were running are failed on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._loop, self._queue = [], None, None
+        with self._store_lock:
+            store, self._store = self._store, None
+        if store is not None:
+            store.close()
+
+    async def submit(self, tenant_id: str, session_id: str, user_id: str, message: str) -> Job:
+        """Stores a queued job and hands it to the workers."""
+        if not self.running:
+            await self.start()
+        if self._queue.qsize() + self._submitting >= self.max_queued:
+            job_rejections.inc(tenant_id)
+            raise JobQueueFull(f"Too many chat jobs are waiting ({self.max_queued})")
+        # Counted as queued while its row is written
+        self._submitting += 1
+        try:
+            job = await self.store.create(tenant_id, session_id, user_id, message)
+        finally:
+            self._submitting -= 1
+        self._queue.put_nowait(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            except Exception:
+                # Storing the result failed; the job stays "running" until the next start
+                logger.exception("Chat job %s could not be stored", job.id)
+
+    async def _execute(self, job: Job) -> None:
+        job.started_at = await self.store.mark_running(job.id)
+        job_queue_seconds.observe(job.started_at - job.created_at, job.tenant_id)
+        start = time.perf_counter()
+        self._busy += 1
+        self._busy_since[job.id] = start
+        try:
+            response = await self._runner(job)
+        except Exception as e:
+            await self.store.finish(job.id, error=str(e), error_status=self._error_status(e))
+            jobs_total.inc(job.tenant_id, "failed")
+        else:
+            await self.store.finish(job.id, response=response)
+            jobs_total.inc(job.tenant_id, "succeeded")
+        finally:
+            self._busy -= 1
+            self._busy_since.pop(job.id, None)
+            self._busy_seconds += time.perf_counter() - start
+            job_run_seconds.observe(time.perf_counter() - start, job.tenant_id)
+
+    async def _cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self.store.delete_expired()
+            except Exception:
+                logger.exception("Expired chat jobs could not be removed")
+
+    async def stats(self) -> dict:
+        """Queue depth, worker utilization and stored jobs per status."""
+        now = time.perf_counter()
+        elapsed = now - self._started_at if self.running else 0.0
+        busy_seconds = self._busy_seconds + sum(now - since for since in self._busy_since.values())
+        return {
+            "workers": self.workers,
+            "busy_workers": self._busy if self.running else 0,
+            "queued": self._queue.qsize() if self.running else 0,
+            "max_queued": self.max_queued,
+            "utilization": round(busy_seconds / (elapsed * self.workers), 4) if elapsed and self.workers else 0.0,
+            "jobs": await self.store.counts(),
+        }
+
+
+chat_job_queue = ChatJobQueue.from_env()
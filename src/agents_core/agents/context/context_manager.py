@@ -1,6 +1,8 @@
 import asyncio
 from dataclasses import dataclass
-from .context_config import user_context, available_dates_for_vacation, available_salary_increase_percentages
+from functools import cached_property
+from typing import Optional
+from .vacation_calendar import VacationCalendar
 
 @dataclass
 class UserContext:
@@ -14,6 +16,11 @@ class UserContext:
 @dataclass
 class AvailableDatesForVacation:
     dates: list[str]
+
+    @cached_property
+    def calendar(self) -> VacationCalendar:
+        # Индекс строится один раз на объект (объекты общие для арендатора/сотрудника)
+        return VacationCalendar.from_strings(self.dates)
     
 @dataclass
 class AvailableSalaryIncreasePercentages:
@@ -26,18 +33,34 @@ class ContextManager:
     available_salary_increase_percentages: AvailableSalaryIncreasePercentages
     session_id: str = "default"
     tenant_id: str = "default"
+    # Версия исходных данных контекста (входит в ключ кэша результатов инструментов)
+    data_version: int = 0
+    # Список - сообщения PubSub копятся здесь, а не публикуются (спекулятивный прогон, speculation.py)
+    pubsub_buffer: Optional[list] = None
     
-    def __init__(self, session_id: str = "default", tenant_id: str = "default", user_id: str = None):
-        # Создаем копию user_context и обновляем user_id если передан
-        user_data = user_context.copy()
-        if user_id:
-            user_data["user_id"] = user_id
-            
-        self.user_context = UserContext(**user_data)
-        self.available_dates_for_vacation = AvailableDatesForVacation(dates=available_dates_for_vacation)
-        self.available_salary_increase_percentages = AvailableSalaryIncreasePercentages(percentages=available_salary_increase_percentages)
+    def __init__(self, session_id: str = "default", tenant_id: str = "default", user_id: str = None, record=None):
+        # record - уже загруженная запись справочника (см. load); без нее запись читается здесь,
+        # при промахе LRU - синхронно из SQLite (в event loop используйте load)
+        if record is None:
+            # Импорт здесь: справочник сотрудников сам использует dataclass'ы этого модуля
+            from agents_core.storage.employee_directory import get_employee_directory
+
+            record = get_employee_directory().get(tenant_id, user_id)
+        # Данные сотрудника берутся из LRU справочника (общие объекты, только для чтения)
+        self.user_context = record.user_context
+        self.available_dates_for_vacation = record.available_dates_for_vacation
+        self.available_salary_increase_percentages = record.available_salary_increase_percentages
         self.session_id = session_id
         self.tenant_id = tenant_id
+        self.data_version = record.version
+
+    @classmethod
+    async def load(cls, session_id: str = "default", tenant_id: str = "default", user_id: str = None) -> "ContextManager":
+        """Создает контекст в event loop: при промахе LRU запись читается из SQLite в отдельном потоке"""
+        from agents_core.storage.employee_directory import get_employee_directory
+
+        record = await get_employee_directory().get_async(tenant_id, user_id)
+        return cls(session_id=session_id, tenant_id=tenant_id, user_id=user_id, record=record)
         
         
         
\ No newline at end of file
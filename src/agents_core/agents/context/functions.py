@@ -1,20 +1,35 @@
 """
 Context functions for agents.
 Shared functions for accessing and manipulating context data across all agents.
+Results are memoized across requests (see tool_cache.py) and rendered in the
+calling agent's output format: verbose prose, compact key=value or JSON (see tool_format.py).
 """
 
-import sys
+import asyncio
 import os
-from pathlib import Path
+from itertools import islice
+from typing import Optional
 from agents import function_tool, RunContextWrapper
 
-# Add src directory to Python path for correct imports
-current_file = Path(__file__).resolve()
-src_dir = current_file.parent.parent.parent.parent
-if str(src_dir) not in sys.path:
-    sys.path.insert(0, str(src_dir))
-
 from agents_core.agents.context.context_manager import ContextManager
+from agents_core.agents.context.tool_cache import cached_tool
+from agents_core.agents.context.tool_format import date_ranges, render
+from agents_core.agents.context.vacation_calendar import VacationCalendar, parse_date, format_interval
+from agents_core.agents.context.payroll_engine import (
+    MIN_RATING_FOR_INCREASE,
+    CAPPED,
+    RATING_TOO_LOW,
+    PERCENTAGE_UNAVAILABLE,
+    STATUS_NAMES,
+    evaluate_raise,
+    max_allowed_increase,
+    rating_cap,
+    simulate_raises,
+)
+from agents_core.storage.employee_directory import get_employee_directory
+
+# Longest vacation range accepted by check_vacation_range
+MAX_VACATION_RANGE_DAYS = 366
 
 
 # ===============================
@@ -22,79 +37,182 @@ from agents_core.agents.context.context_manager import ContextManager
 # ===============================
 
 @function_tool
+@cached_tool
 async def get_user_info(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get comprehensive user information (name, position, salary, rating)."""
     user = wrapper.context.user_context
-    return f"User: {user.first_name} {user.last_name}, Position: {user.position}, Current salary: ${user.current_salary:,}, Rating: {user.employee_rating}/100"
+    return render(
+        {"name": _full_name(user), "position": user.position, "salary": user.current_salary, "rating": user.employee_rating},
+        lambda: f"User: {user.first_name} {user.last_name}, Position: {user.position}, Current salary: ${user.current_salary:,}, Rating: {user.employee_rating}/100",
+    )
 
 @function_tool
+@cached_tool
 async def get_user_basic_info(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get basic user information (name and position only)."""
     user = wrapper.context.user_context
-    return f"User: {user.first_name} {user.last_name}, Position: {user.position}"
+    return render(
+        {"name": _full_name(user), "position": user.position},
+        lambda: f"User: {user.first_name} {user.last_name}, Position: {user.position}",
+    )
 
 @function_tool
+@cached_tool
 async def get_user_rating(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get user employee rating."""
     user = wrapper.context.user_context
-    return f"Employee rating: {user.employee_rating}/100"
+    return render({"rating": user.employee_rating}, lambda: f"Employee rating: {user.employee_rating}/100")
+
+
+def _full_name(user) -> str:
+    return f"{user.first_name} {user.last_name}"
 
 
 # ===============================
 # VACATION FUNCTIONS
 # ===============================
 
-@function_tool  
+@function_tool
+@cached_tool
 async def get_available_vacation_dates(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get all available vacation dates."""
-    dates = wrapper.context.available_dates_for_vacation.dates
-    return f"Available vacation dates: {', '.join(dates)}"
+    vacation = wrapper.context.available_dates_for_vacation
+    return render(
+        {"available": date_ranges(vacation.calendar.intervals())},
+        lambda: f"Available vacation dates: {', '.join(vacation.dates)}",
+    )
 
 @function_tool
+@cached_tool
 async def check_vacation_request(wrapper: RunContextWrapper[ContextManager], requested_dates: list[str]) -> str:
     """
     Check vacation request for specified dates. 
     Accepts a list of dates in YYYY-MM-DD format.
     Returns detailed analysis with approved/unavailable dates and alternatives.
     """
-    available_dates = wrapper.context.available_dates_for_vacation.dates
+    vacation = wrapper.context.available_dates_for_vacation
+    calendar = vacation.calendar
     user = wrapper.context.user_context
     
     conflicts = []
     approved = []
     
     for date in requested_dates:
-        if date in available_dates:
+        if _is_date_available(calendar, date):
             approved.append(date)
         else:
             conflicts.append(date)
     
-    result = f"🔍 Vacation request analysis for {user.first_name} {user.last_name}:\n"
-    result += f"📅 Requested dates: {', '.join(requested_dates)}\n"
-    
-    if approved:
-        result += f"✅ Approved dates: {', '.join(approved)}\n"
+    alternatives = None
     if conflicts:
-        result += f"❌ Unavailable dates: {', '.join(conflicts)}\n"
-        # Suggest alternatives from available dates
-        available_alternatives = [d for d in available_dates if d not in requested_dates][:3]
-        if available_alternatives:
-            result += f"💡 Alternative available dates: {', '.join(available_alternatives)}"
-        else:
-            result += f"💡 All available dates: {', '.join(available_dates)}"
+        # Suggest alternatives from available dates (stops after the first 3)
+        requested = set(requested_dates)
+        alternatives = list(islice((d.isoformat() for d in calendar.days() if d.isoformat() not in requested), 3))
+
+    def verbose() -> str:
+        result = f"🔍 Vacation request analysis for {user.first_name} {user.last_name}:\n"
+        result += f"📅 Requested dates: {', '.join(requested_dates)}\n"
+        if approved:
+            result += f"✅ Approved dates: {', '.join(approved)}\n"
+        if conflicts:
+            result += f"❌ Unavailable dates: {', '.join(conflicts)}\n"
+            if alternatives:
+                result += f"💡 Alternative available dates: {', '.join(alternatives)}"
+            else:
+                result += f"💡 All available dates: {', '.join(vacation.dates)}"
+        return result
+
+    return render(
+        {
+            "requested": requested_dates,
+            "approved": approved,
+            "unavailable": conflicts,
+            "alternatives": alternatives,
+            "all_available": date_ranges(calendar.intervals()) if conflicts and not alternatives else None,
+        },
+        verbose,
+    )
+
+@function_tool
+@cached_tool
+async def check_vacation_range(wrapper: RunContextWrapper[ContextManager], start_date: str, end_date: str) -> str:
+    """
+    Check vacation request for a date range (both ends inclusive).
+    Accepts start and end dates in YYYY-MM-DD format, e.g. "2025-08-15" and "2025-08-30".
+    Returns available/unavailable periods and the nearest alternative periods of the same length.
+    """
+    calendar = wrapper.context.available_dates_for_vacation.calendar
+    user = wrapper.context.user_context
+    
+    try:
+        start, end = parse_date(start_date), parse_date(end_date)
+    except ValueError:
+        return render(
+            {"error": "invalid_dates", "start": start_date, "end": end_date, "expected": "YYYY-MM-DD"},
+            lambda: f"❌ Invalid dates: {start_date}, {end_date}. Use YYYY-MM-DD format",
+        )
+    if end < start:
+        return render(
+            {"error": "end_before_start", "start": start_date, "end": end_date},
+            lambda: f"❌ End date {end_date} is before start date {start_date}",
+        )
+    days = (end - start).days + 1
+    if days > MAX_VACATION_RANGE_DAYS:
+        return render(
+            {"error": "range_too_long", "days": days, "max_days": MAX_VACATION_RANGE_DAYS},
+            lambda: f"❌ Range of {days} days is too long. Maximum: {MAX_VACATION_RANGE_DAYS} days",
+        )
     
-    return result
+    available, unavailable = calendar.query(start, end)
+    alternatives = calendar.nearest_windows(start, end) if unavailable else None
+
+    def verbose() -> str:
+        result = f"🔍 Vacation range analysis for {user.first_name} {user.last_name}:\n"
+        result += f"📅 Requested: {format_interval((start, end))} ({days} days)\n"
+        if not unavailable:
+            result += f"✅ All requested dates are available"
+            return result
+        if available:
+            result += f"✅ Available: {', '.join(map(format_interval, available))}\n"
+        result += f"❌ Unavailable: {', '.join(map(format_interval, unavailable))}\n"
+        if alternatives:
+            result += f"💡 Alternative periods of {days} days: {', '.join(map(format_interval, alternatives))}"
+        else:
+            result += f"💡 No available period of {days} days"
+        return result
+
+    return render(
+        {
+            "requested": date_ranges([(start, end)])[0],
+            "days": days,
+            "all_available": not unavailable,
+            "available": date_ranges(available) if unavailable else None,
+            "unavailable": date_ranges(unavailable) if unavailable else None,
+            "alternatives": date_ranges(alternatives) if unavailable else None,
+        },
+        verbose,
+    )
 
 @function_tool
+@cached_tool
 async def check_single_vacation_date(wrapper: RunContextWrapper[ContextManager], date: str) -> str:
     """Check if a single vacation date is available. Accepts date in YYYY-MM-DD format."""
-    available_dates = wrapper.context.available_dates_for_vacation.dates
+    calendar = wrapper.context.available_dates_for_vacation.calendar
     user = wrapper.context.user_context
     
-    if date in available_dates:
-        return f"✅ Date {date} is available for {user.first_name} {user.last_name}"
-    else:
-        return f"❌ Date {date} is not available for {user.first_name} {user.last_name}"
+    available = _is_date_available(calendar, date)
+    return render(
+        {"date": date, "available": available},
+        lambda: f"✅ Date {date} is available for {user.first_name} {user.last_name}" if available
+        else f"❌ Date {date} is not available for {user.first_name} {user.last_name}",
+    )
+
+
+def _is_date_available(calendar: VacationCalendar, date: str) -> bool:
+    try:
+        return calendar.is_available(parse_date(date))
+    except ValueError:
+        return False
 
 
 # ===============================
@@ -102,18 +220,27 @@ async def check_single_vacation_date(wrapper: RunContextWrapper[ContextManager],
 # ===============================
 
 @function_tool
+@cached_tool
 async def get_employee_salary_info(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get employee salary and rating information."""
     user = wrapper.context.user_context
-    return f"Employee: {user.first_name} {user.last_name}, Current salary: ${user.current_salary:,}, Rating: {user.employee_rating}/100"
+    return render(
+        {"name": _full_name(user), "salary": user.current_salary, "rating": user.employee_rating},
+        lambda: f"Employee: {user.first_name} {user.last_name}, Current salary: ${user.current_salary:,}, Rating: {user.employee_rating}/100",
+    )
 
 @function_tool
+@cached_tool
 async def get_available_salary_increases(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get available salary increase percentages."""
     percentages = wrapper.context.available_salary_increase_percentages.percentages
-    return f"Available salary increase percentages: {', '.join(map(str, percentages))}%"
+    return render(
+        {"percentages": percentages},
+        lambda: f"Available salary increase percentages: {', '.join(map(str, percentages))}%",
+    )
 
 @function_tool
+@cached_tool
 async def calculate_salary_increase(wrapper: RunContextWrapper[ContextManager], percentage: int) -> str:
     """
     Calculate salary increase by specified percentage.
@@ -125,53 +252,127 @@ async def calculate_salary_increase(wrapper: RunContextWrapper[ContextManager],
     current_salary = user.current_salary
     employee_rating = user.employee_rating
     
+    status, applied_percentage, new_salary = evaluate_raise(current_salary, employee_rating, percentage, available_percentages)
+    
     # Check percentage availability
-    if percentage not in available_percentages:
-        return f"❌ Percentage {percentage}% is not available. Available percentages: {', '.join(map(str, available_percentages))}%"
+    if status == PERCENTAGE_UNAVAILABLE:
+        return render(
+            {"status": STATUS_NAMES[status], "requested": percentage, "available": available_percentages},
+            lambda: f"❌ Percentage {percentage}% is not available. Available percentages: {', '.join(map(str, available_percentages))}%",
+        )
     
     # Check employee rating
-    min_rating_required = 70  # Minimum rating for salary increase
-    if employee_rating < min_rating_required:
-        return f"❌ Salary increase unavailable. Minimum rating required: {min_rating_required}, current rating: {employee_rating}"
+    if status == RATING_TOO_LOW:
+        return render(
+            {"status": STATUS_NAMES[status], "rating": employee_rating, "min_rating": MIN_RATING_FOR_INCREASE},
+            lambda: f"❌ Salary increase unavailable. Minimum rating required: {MIN_RATING_FOR_INCREASE}, current rating: {employee_rating}",
+        )
     
-    new_salary = current_salary * (1 + percentage / 100)
     increase_amount = new_salary - current_salary
+    fields = {
+        "status": STATUS_NAMES[status],
+        "requested": percentage,
+        "applied": applied_percentage,
+        "current_salary": current_salary,
+        "new_salary": round(new_salary, 2),
+        "increase": round(increase_amount, 2),
+        "rating": employee_rating,
+    }
+    
+    # Additional rating-based checks (higher rating allows bigger increase)
+    if status == CAPPED:
+        return render(
+            fields,
+            lambda: f"⚠️ Requested increase {percentage}% exceeds allowed amount for your rating.\n"
+                    f"Recommended increase: {applied_percentage}%\n"
+                    f"New salary: ${new_salary:,.2f} (increase of ${increase_amount:,.2f})",
+        )
     
-    # Additional rating-based checks
-    max_allowed_percentage = min(percentage, employee_rating // 10 * 5)  # Higher rating allows bigger increase
-    if max_allowed_percentage < percentage:
-        adjusted_salary = current_salary * (1 + max_allowed_percentage / 100)
-        return f"⚠️ Requested increase {percentage}% exceeds allowed amount for your rating.\n" \
-               f"Recommended increase: {max_allowed_percentage}%\n" \
-               f"New salary: ${adjusted_salary:,.2f} (increase of ${adjusted_salary - current_salary:,.2f})"
-    
-    return f"✅ Salary increase analysis for {user.first_name} {user.last_name}:\n" \
-           f"Current salary: ${current_salary:,}\n" \
-           f"Increase: {percentage}%\n" \
-           f"New salary: ${new_salary:,.2f}\n" \
-           f"Increase amount: ${increase_amount:,.2f}\n" \
-           f"Employee rating: {employee_rating}/100 ✅"
+    return render(
+        fields,
+        lambda: f"✅ Salary increase analysis for {user.first_name} {user.last_name}:\n"
+                f"Current salary: ${current_salary:,}\n"
+                f"Increase: {percentage}%\n"
+                f"New salary: ${new_salary:,.2f}\n"
+                f"Increase amount: ${increase_amount:,.2f}\n"
+                f"Employee rating: {employee_rating}/100 ✅",
+    )
 
 @function_tool
+@cached_tool
 async def get_max_allowed_salary_increase(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get maximum allowed salary increase based on employee rating."""
     user = wrapper.context.user_context
     employee_rating = user.employee_rating
     
-    if employee_rating < 70:
-        return f"❌ No salary increase allowed. Minimum rating required: 70, current rating: {employee_rating}"
+    if employee_rating < MIN_RATING_FOR_INCREASE:
+        return render(
+            {"max_allowed": 0, "rating": employee_rating, "min_rating": MIN_RATING_FOR_INCREASE},
+            lambda: f"❌ No salary increase allowed. Minimum rating required: {MIN_RATING_FOR_INCREASE}, current rating: {employee_rating}",
+        )
     
-    max_percentage = employee_rating // 10 * 5  # Higher rating allows bigger increase
     available_percentages = wrapper.context.available_salary_increase_percentages.percentages
     
-    # Find the highest available percentage that doesn't exceed max_percentage
-    allowed_percentages = [p for p in available_percentages if p <= max_percentage]
+    # Highest available percentage that doesn't exceed the rating-based maximum
+    max_allowed = max_allowed_increase(employee_rating, available_percentages)
     
-    if allowed_percentages:
-        max_allowed = max(allowed_percentages)
-        return f"Maximum allowed salary increase for rating {employee_rating}: {max_allowed}%"
-    else:
-        return f"No salary increase percentages available for rating {employee_rating}"
+    return render(
+        {"max_allowed": max_allowed or 0, "rating": employee_rating},
+        lambda: f"Maximum allowed salary increase for rating {employee_rating}: {max_allowed}%" if max_allowed
+        else f"No salary increase percentages available for rating {employee_rating}",
+    )
+
+def _simulate_department(
+    tenant_id: str, department: Optional[str], requested_percentage: int, available_percentages
+) -> Optional[dict]:
+    """Summary of simulate_raises for a department from the employee directory, None if it has no employees."""
+    _, salaries, ratings = get_employee_directory().salary_table(tenant_id, department)
+    if salaries.size == 0:
+        return None
+    return simulate_raises(salaries, ratings, requested_percentage, available_percentages).summary()
+
+@function_tool
+async def simulate_department_raises(
+    wrapper: RunContextWrapper[ContextManager], requested_percentage: int, department: Optional[str] = None
+) -> str:
+    """
+    Simulate a salary increase for all employees of a department (or the whole company).
+    Applies the same availability, rating and cap rules as calculate_salary_increase to every employee.
+    Returns counts per outcome and the total budget impact.
+    """
+    tenant_id = wrapper.context.tenant_id
+    available_percentages = wrapper.context.available_salary_increase_percentages.percentages
+    # The salary table query and the simulation over large arrays run off the event loop
+    summary = await asyncio.to_thread(
+        _simulate_department, tenant_id, department, requested_percentage, available_percentages
+    )
+    
+    scope = f"department '{department}'" if department else "all departments"
+    if summary is None:
+        return render({"error": "no_employees", "department": department or "all"}, lambda: f"❌ No employees found for {scope}")
+    
+    counts = summary["counts"]
+    return render(
+        {
+            "department": department or "all",
+            "employees": summary["employees"],
+            "requested": requested_percentage,
+            "approved": counts["approved"],
+            "capped": counts["capped"],
+            "rating_too_low": counts["rating_too_low"],
+            "percentage_unavailable": counts["percentage_unavailable"],
+            "current_payroll": round(summary["current_payroll"], 2),
+            "new_payroll": round(summary["new_payroll"], 2),
+            "budget_impact": round(summary["total_increase"], 2),
+            "budget_impact_percent": round(summary["budget_impact_percent"], 2),
+        },
+        lambda: f"📊 Raise simulation for {summary['employees']} employees ({scope}), requested {requested_percentage}%:\n"
+                f"Approved: {counts['approved']}, capped by rating: {counts['capped']}, "
+                f"rating too low: {counts['rating_too_low']}, percentage unavailable: {counts['percentage_unavailable']}\n"
+                f"Current payroll: ${summary['current_payroll']:,.2f}\n"
+                f"New payroll: ${summary['new_payroll']:,.2f}\n"
+                f"Budget impact: ${summary['total_increase']:,.2f} (+{summary['budget_impact_percent']:.2f}%)",
+    )
 
 
 # ===============================
@@ -179,49 +380,79 @@ async def get_max_allowed_salary_increase(wrapper: RunContextWrapper[ContextMana
 # ===============================
 
 @function_tool
+@cached_tool
 async def get_employee_profile(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Get complete employee profile including all context information."""
-    user = wrapper.context.user_context
-    available_dates = wrapper.context.available_dates_for_vacation.dates
-    available_percentages = wrapper.context.available_salary_increase_percentages.percentages
-    
-    profile = f"👤 Employee Profile:\n"
-    profile += f"Name: {user.first_name} {user.last_name}\n"
-    profile += f"Position: {user.position}\n"
-    profile += f"Current Salary: ${user.current_salary:,}\n"
-    profile += f"Employee Rating: {user.employee_rating}/100\n\n"
-    
-    profile += f"📅 Available Vacation Dates: {', '.join(available_dates)}\n\n"
-    profile += f"💰 Available Salary Increase Percentages: {', '.join(map(str, available_percentages))}%"
-    
-    return profile
+    return employee_profile(wrapper.context)
+
+
+def employee_profile(context: ContextManager) -> str:
+    """Employee profile text (also injected into consultations by the CEO fan-out)."""
+    user = context.user_context
+    vacation = context.available_dates_for_vacation
+    available_percentages = context.available_salary_increase_percentages.percentages
+
+    def verbose() -> str:
+        profile = f"👤 Employee Profile:\n"
+        profile += f"Name: {user.first_name} {user.last_name}\n"
+        profile += f"Position: {user.position}\n"
+        profile += f"Current Salary: ${user.current_salary:,}\n"
+        profile += f"Employee Rating: {user.employee_rating}/100\n\n"
+        
+        profile += f"📅 Available Vacation Dates: {', '.join(vacation.dates)}\n\n"
+        profile += f"💰 Available Salary Increase Percentages: {', '.join(map(str, available_percentages))}%"
+        return profile
+
+    return render(
+        {
+            "name": _full_name(user),
+            "position": user.position,
+            "salary": user.current_salary,
+            "rating": user.employee_rating,
+            "vacation_available": date_ranges(vacation.calendar.intervals()),
+            "raise_percentages": available_percentages,
+        },
+        verbose,
+    )
 
 @function_tool
+@cached_tool
 async def analyze_employee_eligibility(wrapper: RunContextWrapper[ContextManager]) -> str:
     """Analyze employee eligibility for various benefits based on rating."""
-    user = wrapper.context.user_context
+    return employee_eligibility(wrapper.context)
+
+
+def employee_eligibility(context: ContextManager) -> str:
+    """Eligibility analysis text (also injected into consultations by the CEO fan-out)."""
+    user = context.user_context
     rating = user.employee_rating
-    
-    analysis = f"🔍 Eligibility Analysis for {user.first_name} {user.last_name} (Rating: {rating}/100):\n\n"
-    
-    # Salary increase eligibility
-    if rating >= 70:
-        max_percentage = rating // 10 * 5
-        analysis += f"✅ Eligible for salary increases up to {max_percentage}%\n"
-    else:
-        analysis += f"❌ Not eligible for salary increases (minimum rating: 70)\n"
-    
-    # Vacation eligibility (assuming all employees can take vacation)
-    analysis += f"✅ Eligible for vacation requests\n"
+    max_percentage = rating_cap(rating) if rating >= MIN_RATING_FOR_INCREASE else 0
     
     # Additional benefits based on rating
     if rating >= 90:
-        analysis += f"⭐ Excellent performance - eligible for all benefits\n"
+        tier, tier_text = "excellent", "⭐ Excellent performance - eligible for all benefits"
     elif rating >= 80:
-        analysis += f"👍 Good performance - eligible for most benefits\n"
+        tier, tier_text = "good", "👍 Good performance - eligible for most benefits"
     elif rating >= 70:
-        analysis += f"📈 Satisfactory performance - eligible for basic benefits\n"
+        tier, tier_text = "satisfactory", "📈 Satisfactory performance - eligible for basic benefits"
     else:
-        analysis += f"📉 Below expectations - limited benefits available\n"
-    
-    return analysis
+        tier, tier_text = "below_expectations", "📉 Below expectations - limited benefits available"
+
+    def verbose() -> str:
+        analysis = f"🔍 Eligibility Analysis for {user.first_name} {user.last_name} (Rating: {rating}/100):\n\n"
+        
+        # Salary increase eligibility
+        if max_percentage:
+            analysis += f"✅ Eligible for salary increases up to {max_percentage}%\n"
+        else:
+            analysis += f"❌ Not eligible for salary increases (minimum rating: {MIN_RATING_FOR_INCREASE})\n"
+        
+        # Vacation eligibility (assuming all employees can take vacation)
+        analysis += f"✅ Eligible for vacation requests\n"
+        analysis += f"{tier_text}\n"
+        return analysis
+
+    return render(
+        {"name": _full_name(user), "rating": rating, "max_raise": max_percentage, "vacation": True, "tier": tier},
+        verbose,
+    )
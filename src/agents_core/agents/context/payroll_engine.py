@@ -0,0 +1,153 @@
+"""
+Payroll rules, scalar and vectorized.
+
+Salary increase rules (shared by the Payroll tools and department-wide simulations):
+- the requested percentage must be one of the available percentages
+- the employee rating must be at least MIN_RATING_FOR_INCREASE
+- the increase is capped at `rating // 10 * 5` percent
+
+`evaluate_raise` / `max_allowed_increase` apply the rules to one employee and
+back the function tools. `simulate_raises` / `max_allowed_increases` apply the
+same rules to NumPy arrays of salaries, ratings and requested percentages and
+return per-employee results plus the aggregate budget impact.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+
+MIN_RATING_FOR_INCREASE = 70
+
+# Raise evaluation statuses
+APPROVED = 0
+CAPPED = 1
+RATING_TOO_LOW = 2
+PERCENTAGE_UNAVAILABLE = 3
+STATUS_NAMES = {
+    APPROVED: "approved",
+    CAPPED: "capped",
+    RATING_TOO_LOW: "rating_too_low",
+    PERCENTAGE_UNAVAILABLE: "percentage_unavailable",
+}
+
+
+def rating_cap(rating):
+    """Maximum increase percentage allowed by rating (works for ints and arrays)."""
+    return rating // 10 * 5  # Higher rating allows bigger increase
+
+
+# ===============================
+# SCALAR RULES
+# ===============================
+
+def evaluate_raise(
+    current_salary: float, employee_rating: int, percentage: int, available_percentages: Sequence[int]
+) -> Tuple[int, int, float]:
+    """
+    Applies the salary increase rules to one employee.
+
+    Returns:
+        (status, applied percentage, new salary); the salary is unchanged unless approved or capped
+    """
+    if percentage not in available_percentages:
+        return PERCENTAGE_UNAVAILABLE, 0, current_salary
+    if employee_rating < MIN_RATING_FOR_INCREASE:
+        return RATING_TOO_LOW, 0, current_salary
+    max_allowed_percentage = min(percentage, rating_cap(employee_rating))
+    if max_allowed_percentage < percentage:
+        return CAPPED, max_allowed_percentage, current_salary * (1 + max_allowed_percentage / 100)
+    return APPROVED, percentage, current_salary * (1 + percentage / 100)
+
+
+def max_allowed_increase(employee_rating: int, available_percentages: Sequence[int]) -> int:
+    """Highest available percentage allowed by rating, 0 if none."""
+    if employee_rating < MIN_RATING_FOR_INCREASE:
+        return 0
+    max_percentage = rating_cap(employee_rating)
+    allowed_percentages = [p for p in available_percentages if p <= max_percentage]
+    return max(allowed_percentages) if allowed_percentages else 0
+
+
+# ===============================
+# VECTORIZED RULES
+# ===============================
+
+@dataclass
+class RaiseSimulation:
+    """Per-employee results and aggregate budget impact of a raise simulation."""
+    status: np.ndarray
+    applied_percentages: np.ndarray
+    current_salaries: np.ndarray
+    new_salaries: np.ndarray
+
+    @property
+    def increases(self) -> np.ndarray:
+        return self.new_salaries - self.current_salaries
+
+    def summary(self) -> Dict:
+        current_total = float(self.current_salaries.sum())
+        increase_total = float(self.increases.sum())
+        counts = np.bincount(self.status, minlength=len(STATUS_NAMES))
+        return {
+            "employees": int(self.status.size),
+            "counts": {STATUS_NAMES[code]: int(count) for code, count in enumerate(counts)},
+            "current_payroll": current_total,
+            "new_payroll": current_total + increase_total,
+            "total_increase": increase_total,
+            "budget_impact_percent": increase_total / current_total * 100 if current_total else 0.0,
+        }
+
+
+def simulate_raises(
+    salaries: Iterable[float],
+    ratings: Iterable[int],
+    requested_percentages,
+    available_percentages: Sequence[int],
+) -> RaiseSimulation:
+    """
+    Applies the salary increase rules to whole arrays of employees.
+
+    Args:
+        salaries: Current salaries
+        ratings: Employee ratings (0-100)
+        requested_percentages: Requested percentage per employee, or one percentage for everyone
+        available_percentages: Percentages that can be granted
+
+    Returns:
+        RaiseSimulation with results identical to `evaluate_raise` per employee
+    """
+    salaries = np.asarray(salaries, dtype=np.float64)
+    ratings = np.asarray(ratings, dtype=np.int64)
+    requested = np.broadcast_to(np.asarray(requested_percentages, dtype=np.int64), salaries.shape)
+    if ratings.shape != salaries.shape:
+        raise ValueError("salaries and ratings must have the same length")
+
+    available = np.isin(requested, np.asarray(list(available_percentages), dtype=np.int64))
+    eligible = ratings >= MIN_RATING_FOR_INCREASE
+    capped = rating_cap(ratings) < requested
+
+    status = np.full(salaries.shape, APPROVED, dtype=np.int64)
+    status[capped] = CAPPED
+    status[~eligible] = RATING_TOO_LOW
+    status[~available] = PERCENTAGE_UNAVAILABLE
+
+    applied = np.where(status <= CAPPED, np.minimum(requested, rating_cap(ratings)), 0)
+    new_salaries = np.where(status <= CAPPED, salaries * (1 + applied / 100), salaries)
+    return RaiseSimulation(
+        status=status,
+        applied_percentages=applied,
+        current_salaries=salaries,
+        new_salaries=new_salaries,
+    )
+
+
+def max_allowed_increases(ratings: Iterable[int], available_percentages: Sequence[int]) -> np.ndarray:
+    """Vectorized `max_allowed_increase`."""
+    ratings = np.asarray(ratings, dtype=np.int64)
+    available = np.sort(np.asarray(list(available_percentages), dtype=np.int64))
+    if available.size == 0:
+        return np.zeros(ratings.shape, dtype=np.int64)
+    index = np.searchsorted(available, rating_cap(ratings), side="right") - 1
+    allowed = available[np.clip(index, 0, None)]
+    return np.where((ratings >= MIN_RATING_FOR_INCREASE) & (index >= 0), allowed, 0)
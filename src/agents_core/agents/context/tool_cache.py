@@ -0,0 +1,164 @@
+"""
+Cross-request memoization for context function tools.
+
+Context tools are pure functions of the ContextManager data, but HR, Payroll
+and CEO agents call the same ones repeatedly within a chat and on every turn.
+`cached_tool` memoizes their results in a process-wide LRU/TTL cache keyed on
+(tenant, user, tool name, arguments and output format, context data version).
+
+Invalidation:
+- `tool_cache.invalidate_user(tenant_id, user_id)` when a user's record changes
+- `tool_cache.invalidate_tenant(tenant_id)` when tenant configuration changes
+- a new `ContextManager.data_version` also produces new keys
+
+Configuration (environment variables):
+- TOOL_CACHE_ENABLED: "true"/"false" (default true)
+- TOOL_CACHE_MAX_SIZE: maximum number of cached results (default 4096)
+- TOOL_CACHE_TTL_SECONDS: time-to-live of a cached result (default 300)
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .tool_format import current_format
+
+_MISSING = object()
+
+
+class ToolCache:
+    """LRU/TTL cache of tool results with per-tool hit/miss counters."""
+
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 300, enabled: bool = True):
+        """
+        Args:
+            max_size: Maximum number of cached results (least recently used are evicted)
+            ttl_seconds: How long a result stays valid
+            enabled: If False, every call goes to the tool
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Invalidation generations, part of every key
+        self._tenant_generation: Dict[str, int] = defaultdict(int)
+        self._user_generation: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ToolCache":
+        return cls(
+            max_size=int(os.getenv("TOOL_CACHE_MAX_SIZE", "4096")),
+            ttl_seconds=float(os.getenv("TOOL_CACHE_TTL_SECONDS", "300")),
+            enabled=os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true",
+        )
+
+    def make_key(self, tenant_id: str, user_id: str, tool_name: str, args: Dict[str, Any], data_version: Any) -> Hashable:
+        arguments = json.dumps(args, sort_keys=True, default=str)
+        # Only invalidations add generation entries; lookups must not create one per user seen
+        with self._lock:
+            tenant_generation = self._tenant_generation.get(tenant_id, 0)
+            user_generation = self._user_generation.get((tenant_id, user_id), 0)
+        return tenant_id, user_id, tool_name, arguments, data_version, tenant_generation, user_generation
+
+    def get(self, key: Hashable, tool_name: str) -> Any:
+        """Returns the cached result or `_MISSING`, counting a hit or a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats[tool_name]["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self._evictions += 1
+            self._stats[tool_name]["misses"] += 1
+            return _MISSING
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate_user(self, tenant_id: str, user_id: str) -> None:
+        """Drops cached results of one user (call when the user's record changes)."""
+        with self._lock:
+            self._user_generation[(tenant_id, user_id)] += 1
+            for key in [k for k in self._entries if k[0] == tenant_id and k[1] == user_id]:
+                del self._entries[key]
+
+    def invalidate_tenant(self, tenant_id: str) -> None:
+        """Drops cached results of all users of a tenant (call when tenant config changes)."""
+        with self._lock:
+            self._tenant_generation[tenant_id] += 1
+            for key in [k for k in self._entries if k[0] == tenant_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {}
+            for tool_name, stats in self._stats.items():
+                total = stats["hits"] + stats["misses"]
+                tools[tool_name] = {**stats, "hit_rate": stats["hits"] / total if total else 0.0}
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self._evictions,
+                "tools": tools,
+            }
+
+
+tool_cache = ToolCache.from_env()
+
+
+def cached_tool(func: Callable) -> Callable:
+    """
+    Memoizes an async context tool. Apply below `@function_tool`:
+
+        @function_tool
+        @cached_tool
+        async def get_user_info(wrapper: RunContextWrapper[ContextManager]) -> str:
+            ...
+    """
+    tool_name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(ctx, *args, **kwargs):
+        if not tool_cache.enabled:
+            return await func(ctx, *args, **kwargs)
+
+        context = ctx.context
+        user_id = getattr(getattr(context, "user_context", None), "user_id", None)
+        call_args = {"args": list(args), "kwargs": kwargs, "format": current_format.get()}
+        key = tool_cache.make_key(
+            getattr(context, "tenant_id", "default"),
+            str(user_id),
+            tool_name,
+            call_args,
+            getattr(context, "data_version", None),
+        )
+
+        result = tool_cache.get(key, tool_name)
+        if result is _MISSING:
+            result = await func(ctx, *args, **kwargs)
+            tool_cache.put(key, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,102 @@
+"""
+Output formats of context tools.
+
+Tool results are sent back to the model on every later turn, so their size is
+paid for again and again. Every context tool builds its result as ordered fields
+and renders it in the format selected for the calling agent:
+
+- verbose: the original human-readable prose with emoji (default)
+- compact: `key=value` pairs separated by "; ", lists joined with ","
+- json: one JSON object without whitespace
+
+Field order is fixed by the tool, so the same data always renders the same text.
+Date lists are rendered as merged ranges (2025-08-15..2025-08-19) in compact and
+json formats.
+
+Tools do not know which agent calls them; `with_output_format(tools, agent_name)`
+returns copies of an agent's tools that run in that agent's format.
+
+Configuration (environment variables):
+- TOOL_OUTPUT_FORMAT: default format for all agents (default "verbose")
+- TOOL_OUTPUT_FORMATS: per-agent formats as JSON, e.g. {"HR Agent": "compact", "CEO Agent": "json"}
+"""
+
+import json
+import os
+from contextvars import ContextVar
+from dataclasses import replace
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List
+
+VERBOSE = "verbose"
+COMPACT = "compact"
+JSON = "json"
+FORMATS = (VERBOSE, COMPACT, JSON)
+
+# Format of the tool call being executed (set by the tools returned from with_output_format)
+current_format: ContextVar[str] = ContextVar("tool_output_format", default=VERBOSE)
+
+
+def format_for(agent_name: str) -> str:
+    """Configured output format of an agent's tools."""
+    formats = json.loads(os.getenv("TOOL_OUTPUT_FORMATS", "{}"))
+    fmt = formats.get(agent_name, os.getenv("TOOL_OUTPUT_FORMAT", VERBOSE)).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown tool output format '{fmt}' for {agent_name} (expected one of {', '.join(FORMATS)})")
+    return fmt
+
+
+def date_ranges(intervals: Iterable[tuple]) -> List[str]:
+    """Merged date intervals as 'YYYY-MM-DD' or 'YYYY-MM-DD..YYYY-MM-DD'."""
+    return [start.isoformat() if start == end else f"{start.isoformat()}..{end.isoformat()}" for start, end in intervals]
+
+
+def _compact_value(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return ",".join(_compact_value(item) for item in value)
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def render(fields: Dict[str, Any], verbose: Callable[[], str]) -> str:
+    """
+    Renders a tool result in the current format.
+
+    Args:
+        fields: Result fields in their output order (None values and empty lists are left out)
+        verbose: Builds the prose form; only called in the verbose format
+    """
+    fmt = current_format.get()
+    if fmt == VERBOSE:
+        return verbose()
+    fields = {key: value for key, value in fields.items() if value is not None and value != []}
+    if fmt == JSON:
+        return json.dumps(fields, ensure_ascii=False, separators=(",", ":"), default=str)
+    return "; ".join(f"{key}={_compact_value(value)}" for key, value in fields.items())
+
+
+def _in_format(tool: Any, fmt: str) -> Any:
+    on_invoke_tool = tool.on_invoke_tool
+
+    async def invoke(ctx, arguments: str):
+        token = current_format.set(fmt)
+        try:
+            return await on_invoke_tool(ctx, arguments)
+        finally:
+            current_format.reset(token)
+
+    return replace(tool, on_invoke_tool=invoke)
+
+
+def with_output_format(tools: List[Any], agent_name: str) -> List[Any]:
+    """
+    The agent's function tools set to its configured format. Verbose tools are wrapped
+    too, so an agent used as a tool by another agent does not inherit the caller's format.
+    """
+    fmt = format_for(agent_name)
+    return [_in_format(tool, fmt) if hasattr(tool, "on_invoke_tool") else tool for tool in tools]
@@ -0,0 +1,151 @@
+"""
+Calendar index for vacation availability.
+
+Available days are stored as a sorted list of merged intervals keyed by ordinal
+day (date.toordinal()), so point and range queries are binary searches:
+- is_available(day): O(log n)
+- query(start, end): merged available/unavailable intervals inside the range, O(log n + k)
+- nearest_windows(start, end): closest fully available windows of the same length
+
+A calendar is built once per AvailableDatesForVacation object (see
+context_manager.py), i.e. once per tenant or per user with own dates.
+"""
+
+import bisect
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Tuple
+
+Interval = Tuple[date, date]
+
+
+def parse_date(value: str) -> date:
+    """Parses a YYYY-MM-DD date (raises ValueError otherwise)."""
+    return date.fromisoformat(value.strip())
+
+
+class VacationCalendar:
+    """Sorted, merged interval set of available days."""
+
+    def __init__(self, days: Iterable[date]):
+        ordinals = sorted({d.toordinal() for d in days})
+        starts: List[int] = []
+        ends: List[int] = []
+        for ordinal in ordinals:
+            if ends and ordinal == ends[-1] + 1:
+                ends[-1] = ordinal
+            else:
+                starts.append(ordinal)
+                ends.append(ordinal)
+        # Interval i covers days starts[i]..ends[i] inclusive
+        self._starts = starts
+        self._ends = ends
+
+    @classmethod
+    def from_strings(cls, dates: Iterable[str]) -> "VacationCalendar":
+        parsed = []
+        for value in dates:
+            try:
+                parsed.append(parse_date(value))
+            except ValueError:
+                continue
+        return cls(parsed)
+
+    def __len__(self) -> int:
+        return sum(end - start + 1 for start, end in zip(self._starts, self._ends))
+
+    def intervals(self) -> List[Interval]:
+        return [(date.fromordinal(s), date.fromordinal(e)) for s, e in zip(self._starts, self._ends)]
+
+    def days(self) -> Iterator[date]:
+        for start, end in zip(self._starts, self._ends):
+            for ordinal in range(start, end + 1):
+                yield date.fromordinal(ordinal)
+
+    def _find(self, ordinal: int) -> int:
+        """Index of the interval that could contain `ordinal` (last interval starting at or before it)."""
+        return bisect.bisect_right(self._starts, ordinal) - 1
+
+    def is_available(self, day: date) -> bool:
+        ordinal = day.toordinal()
+        index = self._find(ordinal)
+        return index >= 0 and ordinal <= self._ends[index]
+
+    def query(self, start: date, end: date) -> Tuple[List[Interval], List[Interval]]:
+        """
+        Splits [start, end] into merged available and unavailable intervals.
+
+        Returns:
+            (available, unavailable) lists of inclusive (start, end) date pairs
+        """
+        lo, hi = start.toordinal(), end.toordinal()
+        available: List[Interval] = []
+        unavailable: List[Interval] = []
+        cursor = lo
+        index = max(self._find(lo), 0)
+        while index < len(self._starts) and self._starts[index] <= hi:
+            s, e = max(self._starts[index], lo), min(self._ends[index], hi)
+            if e >= s:
+                if s > cursor:
+                    unavailable.append((date.fromordinal(cursor), date.fromordinal(s - 1)))
+                available.append((date.fromordinal(s), date.fromordinal(e)))
+                cursor = e + 1
+            index += 1
+        if cursor <= hi:
+            unavailable.append((date.fromordinal(cursor), date.fromordinal(hi)))
+        return available, unavailable
+
+    def is_range_available(self, start: date, end: date) -> bool:
+        index = self._find(start.toordinal())
+        return index >= 0 and end.toordinal() <= self._ends[index]
+
+    def nearest_windows(self, start: date, end: date, count: int = 3) -> List[Interval]:
+        """
+        Finds fully available windows with the same length as [start, end], closest to `start`.
+
+        Each interval contributes at most one window (the one nearest to `start`).
+        """
+        length = end.toordinal() - start.toordinal() + 1
+        target = start.toordinal()
+        pivot = bisect.bisect_right(self._starts, target)
+        candidates: List[Tuple[int, int]] = []
+        left, right = pivot - 1, pivot
+
+        def left_bound(i: int) -> int:
+            return max(0, target - (self._ends[i] - length + 1))
+
+        def right_bound(j: int) -> int:
+            return self._starts[j] - target
+
+        # Walk outwards from the requested start; the bounds only grow, so stop once
+        # neither side can beat the worst window collected so far
+        while left >= 0 or right < len(self._starts):
+            use_left = right >= len(self._starts) or (left >= 0 and left_bound(left) <= right_bound(right))
+            bound = left_bound(left) if use_left else right_bound(right)
+            if len(candidates) >= count and bound > candidates[-1][0]:
+                break
+            if use_left:
+                index, left = left, left - 1
+            else:
+                index, right = right, right + 1
+
+            s, e = self._starts[index], self._ends[index]
+            if e - s + 1 < length:
+                continue
+            window_start = min(max(target, s), e - length + 1)
+            if window_start == target:
+                # The requested window itself is available: offer the nearest shifted one
+                if target + 1 <= e - length + 1:
+                    window_start = target + 1
+                elif target - 1 >= s:
+                    window_start = target - 1
+                else:
+                    continue
+            bisect.insort(candidates, (abs(window_start - target), window_start))
+            del candidates[count:]
+
+        return [(date.fromordinal(s), date.fromordinal(s + length - 1)) for _, s in candidates]
+
+
+def format_interval(interval: Interval) -> str:
+    start, end = interval
+    return start.isoformat() if start == end else f"{start.isoformat()} to {end.isoformat()}"
@@ -0,0 +1,232 @@
+"""
+Structured, non-blocking event log for agent hooks.
+
+Hooks run on the event loop, so they must not format or write large payloads
+themselves. `EventLog.log()` only decides whether the event is kept (level of
+the tenant, sampling rate of the event type), truncates large string fields and
+puts a dict on a bounded queue. A background writer thread serializes events as
+JSON lines and writes them in batches. When the queue is full, events are
+dropped and counted instead of blocking the caller.
+
+One line per event:
+{"ts": "2025-08-15T10:00:00.123Z", "level": "INFO", "event": "agent_end",
+ "agent": "CEO Agent", "tenant": "acme", "session": "s1", "output": "...", "output_chars": 5120}
+
+Event types and levels used by the hooks (see hooks.py):
+- agent_start (INFO), agent_end (INFO, with the truncated final output),
+  handoff (INFO), tool_start (DEBUG), tool_end (DEBUG, with the truncated result)
+- pubsub_error (WARNING): Pub/Sub publish or spill failures (pubsub_publisher.py)
+
+Configuration (environment variables):
+- EVENT_LOG_ENABLED: "true"/"false" (default true)
+- EVENT_LOG_PATH: output file, "-" for stdout (default "-")
+- EVENT_LOG_LEVEL: minimum level (DEBUG, INFO, WARNING, ERROR; default INFO)
+- EVENT_LOG_TENANT_LEVELS: per-tenant levels as JSON, e.g. {"acme": "DEBUG"}
+- EVENT_LOG_SAMPLE_RATES: kept fraction per event type as JSON, e.g. {"agent_start": 0.1}
+  (default 1 for every type; WARNING and above are never sampled out)
+- EVENT_LOG_MAX_FIELD_CHARS: longer string fields are truncated (default 1000)
+- EVENT_LOG_QUEUE_SIZE: events waiting for the writer before new ones are dropped (default 10000)
+
+Metrics (see agents/metrics.py):
+- event_log_events_total{event,outcome}: outcome is written, sampled_out or dropped
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TextIO
+
+from .metrics import registry
+
+event_log_events = registry.counter(
+    "event_log_events_total", "Hook events by outcome (written, sampled_out, dropped)", ("event", "outcome")
+)
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+_STOP = object()
+
+
+def _level(name: str) -> int:
+    level = logging.getLevelName(str(name).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown event log level '{name}'")
+    return level
+
+
+class EventLog:
+    """Bounded queue of structured events drained by a writer thread."""
+
+    def __init__(
+        self,
+        path: str = "-",
+        level: int = INFO,
+        tenant_levels: Optional[Dict[str, int]] = None,
+        sample_rates: Optional[Dict[str, float]] = None,
+        max_field_chars: int = 1000,
+        queue_size: int = 10000,
+        enabled: bool = True,
+        batch_size: int = 1000,
+        flush_interval: float = 0.05,
+    ):
+        self.path = path
+        self.level = level
+        self.tenant_levels = tenant_levels or {}
+        self.sample_rates = sample_rates or {}
+        self.max_field_chars = max_field_chars
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._random = random.Random()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "EventLog":
+        return cls(
+            path=os.getenv("EVENT_LOG_PATH", "-"),
+            level=_level(os.getenv("EVENT_LOG_LEVEL", "INFO")),
+            tenant_levels={
+                tenant: _level(name) for tenant, name in json.loads(os.getenv("EVENT_LOG_TENANT_LEVELS", "{}")).items()
+            },
+            sample_rates={
+                event: float(rate) for event, rate in json.loads(os.getenv("EVENT_LOG_SAMPLE_RATES", "{}")).items()
+            },
+            max_field_chars=int(os.getenv("EVENT_LOG_MAX_FIELD_CHARS", "1000")),
+            queue_size=int(os.getenv("EVENT_LOG_QUEUE_SIZE", "10000")),
+            enabled=os.getenv("EVENT_LOG_ENABLED", "true").lower() == "true",
+        )
+
+    def is_enabled_for(self, level: int, tenant: str = "default") -> bool:
+        """Whether events of `level` are kept for the tenant (checked before building a payload)."""
+        return self.enabled and level >= self.tenant_levels.get(tenant, self.level)
+
+    def log(self, event: str, level: int = INFO, tenant: str = "default", **fields: Any) -> bool:
+        """
+        Queues an event without blocking.
+
+        String fields longer than max_field_chars are truncated, and their original
+        length is added as <field>_chars.
+
+        Returns:
+            True if the event was queued
+        """
+        if not self.is_enabled_for(level, tenant):
+            return False
+        rate = self.sample_rates.get(event, 1.0)
+        if level < WARNING and rate < 1.0 and self._random.random() >= rate:
+            event_log_events.inc(event, "sampled_out")
+            return False
+
+        record: Dict[str, Any] = {"ts": time.time(), "level": level, "event": event, "tenant": tenant}
+        for key, value in fields.items():
+            if isinstance(value, str) and len(value) > self.max_field_chars:
+                record[f"{key}_chars"] = len(value)
+                value = value[:self.max_field_chars] + "…"
+            record[key] = value
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            event_log_events.inc(event, "dropped")
+            return False
+        return True
+
+    # ===============================
+    # WRITER THREAD
+    # ===============================
+
+    def _ensure_writer(self) -> None:
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._write_loop, name="event-log-writer", daemon=True)
+                    self._thread.start()
+
+    def _open(self) -> Optional[TextIO]:
+        if self.path == "-":
+            return None
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _format(record: Dict[str, Any]) -> str:
+        ts = datetime.fromtimestamp(record["ts"], timezone.utc)
+        record["ts"] = ts.strftime("%Y-%m-%dT%H:%M:%S.") + f"{ts.microsecond // 1000:03d}Z"
+        record["level"] = logging.getLevelName(record["level"])
+        return json.dumps(record, ensure_ascii=False, default=str)
+
+    def _write_loop(self) -> None:
+        file = self._open()
+        try:
+            while True:
+                batch: List[Any] = [self._queue.get()]
+                if batch[0] is not _STOP and self._queue.qsize() < self.batch_size:
+                    # Lets a burst accumulate: fewer, larger writes and less GIL contention with the loop
+                    time.sleep(self.flush_interval)
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = any(record is _STOP for record in batch)
+                records = [record for record in batch if record is not _STOP]
+                if records:
+                    lines = "".join(self._format(record) + "\n" for record in records)
+                    # Looked up per batch: stdout may be redirected
+                    out = file or sys.stdout
+                    try:
+                        out.write(lines)
+                        out.flush()
+                    except (OSError, ValueError):
+                        pass
+                    written: Dict[str, int] = {}
+                    for record in records:
+                        written[record["event"]] = written.get(record["event"], 0) + 1
+                    for event, count in written.items():
+                        event_log_events.inc(event, "written", amount=count)
+                for _ in batch:
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            if file is not None:
+                file.close()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until queued events are written. Returns False on timeout."""
+        if self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Writes queued events and stops the writer thread."""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+
+event_log = EventLog.from_env()
+atexit.register(event_log.close)
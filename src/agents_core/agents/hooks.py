@@ -4,32 +4,133 @@ Agent lifecycle hooks for logging and monitoring agent execution.
 This module provides unified hooks for all agents to track their lifecycle events:
 - Agent start: When an agent begins execution
 - Agent end: When an agent completes execution with final output
+- Handoff: When an agent hands the conversation off to another agent
+- Tool start/end: Around every tool call
 
 These hooks can be applied to any agent to provide consistent logging across the system.
+Events are written as JSON lines by the non-blocking event log (see event_log.py):
+agent_start, agent_end (with the truncated final output) and handoff at INFO,
+tool_start and tool_end at DEBUG. Levels per tenant and sampling per event type
+are configured there; the hooks themselves never format or write output.
+They also record per-agent and per-tool metrics (see metrics.py), exposed at /metrics:
+- agent_duration_seconds{agent,tenant}: from agent start to final output or handoff
+- agent_input_tokens / agent_output_tokens{agent,tenant}: model tokens used by the agent
+- agent_tool_calls{agent,tenant}: tool calls made by the agent per run
+- tool_duration_seconds{agent,tool,tenant}: tool call duration
+- agent_handoffs_total{source,target,tenant}: handoffs between agents
 """
 
 from agents.lifecycle import AgentHooksBase
 from agents import Agent
-from typing import Any, TypeVar
+from agents.tool import Tool
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, TypeVar
 import datetime
-import json
-import os
-from google.cloud import pubsub_v1
+import time
+import weakref
+from .event_log import DEBUG, event_log
+from .metrics import COUNT_BUCKETS, TOKEN_BUCKETS, registry
+from .pubsub_publisher import get_publisher
 
 TContext = TypeVar('TContext')
 
+agent_duration = registry.histogram(
+    "agent_duration_seconds", "Agent run duration, until final output or handoff", ("agent", "tenant")
+)
+agent_input_tokens = registry.histogram(
+    "agent_input_tokens", "Model input tokens used by an agent run", ("agent", "tenant"), TOKEN_BUCKETS
+)
+agent_output_tokens = registry.histogram(
+    "agent_output_tokens", "Model output tokens used by an agent run", ("agent", "tenant"), TOKEN_BUCKETS
+)
+agent_tool_calls = registry.histogram(
+    "agent_tool_calls", "Tool calls made by an agent run", ("agent", "tenant"), COUNT_BUCKETS
+)
+tool_duration = registry.histogram(
+    "tool_duration_seconds", "Tool call duration", ("agent", "tool", "tenant")
+)
+agent_handoffs = registry.counter(
+    "agent_handoffs_total", "Handoffs between agents", ("source", "target", "tenant")
+)
+
+
+@dataclass
+class _AgentRun:
+    started: float
+    input_tokens: int
+    output_tokens: int
+    tool_calls: int = 0
+
+
+@dataclass
+class _RunState:
+    """Hook state of one Runner run: agents and tool calls in flight."""
+    agents: Dict[str, _AgentRun] = field(default_factory=dict)
+    tool_starts: Dict[str, float] = field(default_factory=dict)
+
+
+def _tenant(context) -> str:
+    return str(getattr(getattr(context, 'context', context), 'tenant_id', 'default'))
+
+
+def _session(context) -> str:
+    return str(getattr(getattr(context, 'context', context), 'session_id', 'default'))
+
+
 class UnifiedAgentHooks(AgentHooksBase[TContext, Agent]):
     """
     Unified hooks for agent lifecycle events.
     
-    Provides consistent logging for:
+    Provides consistent structured logging (event_log) for:
     - Agent start events
     - Agent completion events with final output
+    - Handoffs and tool calls
+    
+    and metrics for agents, tool calls and handoffs.
     """
     
+    def __init__(self):
+        # State of runs in flight by id of their Usage object; only touched from the event loop
+        self._states: Dict[int, _RunState] = {}
+    
+    def _state(self, context, create: bool = False) -> Optional[_RunState]:
+        """
+        State of the run the context belongs to.
+        
+        The Usage object is shared by a run's context wrapper and its tool contexts,
+        so it identifies the run (agents used as tools get their own run). The state
+        is dropped when that object is collected, however the run ended (final output,
+        error, timeout, cancellation), so a later run reusing the id never sees it.
+        """
+        key = id(context.usage)
+        state = self._states.get(key)
+        if state is None and create:
+            state = self._states[key] = _RunState()
+            weakref.finalize(context.usage, self._states.pop, key, None)
+        return state
+    
+    def _finish_run(self, context, agent: Agent) -> Optional[float]:
+        """
+        Records metrics of an agent run that ended with a final output or a handoff.
+        
+        Returns:
+            Run duration in milliseconds, None if the run's start was not seen
+        """
+        state = self._state(context)
+        run = state.agents.pop(agent.name, None) if state is not None else None
+        if run is None:
+            return None
+        tenant = _tenant(context)
+        duration = time.perf_counter() - run.started
+        agent_duration.observe(duration, agent.name, tenant)
+        agent_input_tokens.observe(context.usage.input_tokens - run.input_tokens, agent.name, tenant)
+        agent_output_tokens.observe(context.usage.output_tokens - run.output_tokens, agent.name, tenant)
+        agent_tool_calls.observe(run.tool_calls, agent.name, tenant)
+        return round(duration * 1000, 3)
+    
     async def _send_pubsub_message(self, context, agent: Agent, message_type: str, message: str) -> None:
         """
-        Sends message to PubSub topic.
+        Queues message for the PubSub topic without waiting for the broker.
         
         Args:
             context: Agent execution context
@@ -37,55 +138,34 @@ class UnifiedAgentHooks(AgentHooksBase[TContext, Agent]):
             message_type: Message type (e.g., 'think', 'chat')
             message: Message text
         """
-        try:
-            # Get configuration from environment variables
-            project_id = os.getenv("PUBSUB_PROJECT_ID")
-            topic_id = os.getenv("PUBSUB_TOPIC_ID")
-            
-            # Check if PubSub is disabled
-            if project_id.lower() == "disabled":
-                print(f"🔇 PubSub disabled for agent {agent.name}")
-                return
-            
-            # Create PubSub client
-            publisher = pubsub_v1.PublisherClient()
-            topic_path = publisher.topic_path(project_id, topic_id)
-            
-            # Form message data
-            data = {
-                "agent_name": agent.name,
-                "message_ts": datetime.datetime.now().isoformat() + "Z",
-                "message_type": message_type,
-                "message": message
-            }
-            
-            # Get real IDs from context
-            user_id = getattr(context, 'user_context', {})
-            if hasattr(user_id, 'user_id'):
-                user_id = user_id.user_id
-            else:
-                user_id = "system"  # fallback
-            
-            session_id = getattr(context, 'session_id', 'default')
-            tenant_id = getattr(context, 'tenant_id', 'default')
-            
-            # Send message
-            future = publisher.publish(
-                topic_path,
-                json.dumps(data).encode("utf-8"),
-                user_id=user_id,
-                session_id=session_id,
-                tenant=tenant_id
-            )
-            
-            # Wait for send result
-            future.result()
-            print(f"✓ Message sent to PubSub: {agent.name} - {message_type}")
-            
-        except Exception as e:
-            print(f"⚠️ Error sending message to PubSub: {e}")
-            print(f"   Using project: {project_id}, topic: {topic_id}")
-            print(f"   To disable PubSub set PUBSUB_PROJECT_ID=disabled")
+        publisher = get_publisher()
+        if publisher is None:
+            return
+        
+        # Form message data
+        data = {
+            "agent_name": agent.name,
+            "message_ts": datetime.datetime.now().isoformat() + "Z",
+            "message_type": message_type,
+            "message": message
+        }
+        
+        # Get real IDs from context (hooks receive RunContextWrapper)
+        context_manager = getattr(context, 'context', context)
+        user_context = getattr(context_manager, 'user_context', None)
+        user_id = getattr(user_context, 'user_id', None) or "system"
+        session_id = getattr(context_manager, 'session_id', 'default')
+        tenant_id = getattr(context_manager, 'tenant_id', 'default')
+        
+        attributes = {"user_id": str(user_id), "session_id": str(session_id), "tenant": str(tenant_id)}
+        # Speculative runs buffer their messages until the run is kept (see speculation.py)
+        buffer = getattr(context_manager, 'pubsub_buffer', None)
+        if buffer is not None:
+            buffer.append((data, attributes))
+            return
+        
+        # Send message (batched by the shared publisher)
+        publisher.publish(data, **attributes)
     
     async def on_start(self, context, agent: Agent) -> None:
         """
@@ -95,8 +175,13 @@ class UnifiedAgentHooks(AgentHooksBase[TContext, Agent]):
             context: The run context wrapper
             agent: The agent that is starting
         """
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] 🚀 Agent '{agent.name}' started execution")
+        self._state(context, create=True).agents[agent.name] = _AgentRun(
+            started=time.perf_counter(),
+            input_tokens=context.usage.input_tokens,
+            output_tokens=context.usage.output_tokens,
+        )
+        
+        event_log.log("agent_start", tenant=_tenant(context), agent=agent.name, session=_session(context))
         
         # Send message to PubSub when agent starts
         await self._send_pubsub_message(context, agent, "think", f"Agent '{agent.name}' started execution")
@@ -110,13 +195,74 @@ class UnifiedAgentHooks(AgentHooksBase[TContext, Agent]):
             agent: The agent that completed
             output: The final output from the agent
         """
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] ✅ Agent '{agent.name}' completed execution")
-        print(f"[{timestamp}] 📋 Final result from '{agent.name}': {output}")
-        print("-" * 80)
+        duration = self._finish_run(context, agent)
+        text = str(output)
+        
+        event_log.log(
+            "agent_end", tenant=_tenant(context), agent=agent.name, session=_session(context),
+            duration_ms=duration, output=text,
+        )
         
         # Send message to PubSub when agent completes
-        await self._send_pubsub_message(context, agent, "completion", output)
+        await self._send_pubsub_message(context, agent, "completion", text)
+    
+    async def on_handoff(self, context, agent: Agent, source: Agent) -> None:
+        """
+        Called on the source agent's hooks when it hands off to `agent`.
+        
+        Args:
+            context: The run context wrapper
+            agent: The agent receiving the conversation
+            source: The agent handing off (its run ends here)
+        """
+        duration = self._finish_run(context, source)
+        tenant = _tenant(context)
+        agent_handoffs.inc(source.name, agent.name, tenant)
+        event_log.log(
+            "handoff", tenant=tenant, source=source.name, target=agent.name, session=_session(context),
+            duration_ms=duration,
+        )
+    
+    async def on_tool_start(self, context, agent: Agent, tool: Tool) -> None:
+        """
+        Called when the agent starts a tool call.
+        
+        Args:
+            context: The tool context (carries tool_call_id)
+            agent: The agent calling the tool
+            tool: The tool being called
+        """
+        state = self._state(context, create=True)
+        state.tool_starts[getattr(context, 'tool_call_id', tool.name)] = time.perf_counter()
+        run = state.agents.get(agent.name)
+        if run is not None:
+            run.tool_calls += 1
+        tenant = _tenant(context)
+        if event_log.is_enabled_for(DEBUG, tenant):
+            event_log.log("tool_start", DEBUG, tenant, agent=agent.name, tool=tool.name, session=_session(context))
+    
+    async def on_tool_end(self, context, agent: Agent, tool: Tool, result: str) -> None:
+        """
+        Called when a tool call completes.
+        
+        Args:
+            context: The tool context (carries tool_call_id)
+            agent: The agent that called the tool
+            tool: The tool that was called
+            result: The tool output
+        """
+        state = self._state(context)
+        started = state.tool_starts.pop(getattr(context, 'tool_call_id', tool.name), None) if state is not None else None
+        tenant = _tenant(context)
+        duration = None
+        if started is not None:
+            duration = time.perf_counter() - started
+            tool_duration.observe(duration, agent.name, tool.name, tenant)
+        if event_log.is_enabled_for(DEBUG, tenant):
+            event_log.log(
+                "tool_end", DEBUG, tenant, agent=agent.name, tool=tool.name, session=_session(context),
+                duration_ms=round(duration * 1000, 3) if duration is not None else None, result=str(result),
+            )
 
 # Create a shared instance that can be used across all agents
 agent_hooks = UnifiedAgentHooks()
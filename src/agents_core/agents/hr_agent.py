@@ -1,25 +1,19 @@
-import sys
 import os
-from pathlib import Path
 
-# Add src directory to Python path for correct imports
-current_file = Path(__file__).resolve()
-src_dir = current_file.parent.parent.parent
-if str(src_dir) not in sys.path:
-    sys.path.insert(0, str(src_dir))
-
-from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, set_default_openai_key, function_tool, RunContextWrapper
+from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, function_tool, RunContextWrapper
 from agents.exceptions import InputGuardrailTripwireTriggered
 from pydantic import BaseModel
 import asyncio
-from dotenv import load_dotenv
 from agents_core.agents.context.context_manager import ContextManager
+from agents_core.agents.context.tool_format import with_output_format
+from agents_core.agents.model_config import get_agent_model
 from agents_core.agents.context.functions import (
     get_user_info,
     get_user_basic_info,
     get_user_rating,
     get_available_vacation_dates,
     check_vacation_request,
+    check_vacation_range,
     check_single_vacation_date,
     get_employee_profile,
     analyze_employee_eligibility
@@ -27,12 +21,8 @@ from agents_core.agents.context.functions import (
 from agents_core.agents.hooks import agent_hooks
 
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-model = os.getenv("MODEL_NAME")
-if not api_key:
-    raise EnvironmentError("OPENAI_API_KEY not found in environment variables. Check the .env file")
-set_default_openai_key(api_key)
+# OpenAI model (MODEL_NAME) or the offline mock model, depending on MODEL_PROVIDER
+model = get_agent_model("hr")
 
 hr_agent = Agent[ContextManager](
     name="HR Agent",
@@ -48,23 +38,25 @@ hr_agent = Agent[ContextManager](
     4. Provide employee profile information when needed
     5. Analyze employee eligibility for various benefits
     
-    IMPORTANT: When calling check_vacation_request, pass dates as a list in YYYY-MM-DD format.    
-    For example, if user asks for "vacation from 15 to 17 of September", pass ["2025-09-15", "2025-09-16", "2025-09-17"].
+    IMPORTANT: For a continuous period use check_vacation_range with start and end dates in YYYY-MM-DD format.
+    For example, if user asks for "vacation from 15 to 30 of September", pass start_date="2025-09-15", end_date="2025-09-30".
+    Use check_vacation_request only for separate, non-consecutive dates, passed as a list in YYYY-MM-DD format.
     
     Always check user info first, then available dates, then provide detailed analysis.
     Use get_employee_profile for comprehensive employee information.
     Use analyze_employee_eligibility to assess benefit eligibility.
     """,
-    tools=[
+    tools=with_output_format([
         get_user_info,
         get_user_basic_info,
         get_user_rating,
         get_available_vacation_dates, 
         check_vacation_request,
+        check_vacation_range,
         check_single_vacation_date,
         get_employee_profile,
         analyze_employee_eligibility
-    ],
+    ], "HR Agent"),
     hooks=agent_hooks
 )
 
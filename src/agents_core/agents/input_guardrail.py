@@ -0,0 +1,344 @@
+"""
+Local input guardrail: checks a chat message before any model is called.
+
+Every message used to reach at least Route Agent, including empty, oversized or
+clearly off-topic ones. `InputGuard.check()` runs cheap local checks first and
+decides, in order:
+- empty: nothing but whitespace -> reject
+- size: longer than INPUT_GUARDRAIL_MAX_CHARS -> reject
+- blocklist: matches a blocked pattern (prompt injection, abuse) -> reject
+- language: written in a language outside INPUT_GUARDRAIL_LANGUAGES -> canned answer
+- off_topic: scores clearly off-topic (coding, homework, weather, sports...) and not
+  on-topic for the pre-router's rules -> canned answer
+Anything else is allowed and routed as before. Canned answers are returned
+without running an agent and are not written to the session history.
+
+Language detection is local: the dominant script of the letters (Latin,
+Cyrillic, CJK, Arabic...) and, for Latin text, stop-word counts of a few common
+European languages. Short messages without enough evidence count as allowed.
+
+The optional model-based guardrail (INPUT_GUARDRAIL_MODEL_ENABLED, see
+guardrail_agent.py) is an SDK input guardrail passed to the Runner: it runs
+concurrently with the starting agent's first turn (routing), not before it, and
+a tripped verdict stops the run (InputGuardrailTripwireTriggered; the API answers
+with the off-topic canned answer).
+
+Configuration (environment variables):
+- INPUT_GUARDRAIL_ENABLED: "true"/"false" (default true)
+- INPUT_GUARDRAIL_CHECKS: checks to run, comma separated (default "size,blocklist,language,off_topic";
+  empty messages are always rejected)
+- INPUT_GUARDRAIL_MAX_CHARS: maximum message length (default 4000)
+- INPUT_GUARDRAIL_LANGUAGES: supported languages (default "en,ru")
+- INPUT_GUARDRAIL_BLOCKLIST_PATH: optional file with more blocked regexes, one per line ("#" comments)
+- INPUT_GUARDRAIL_OFF_TOPIC_THRESHOLD: minimum off-topic confidence for the canned answer (default 0.85)
+- INPUT_GUARDRAIL_MODEL_ENABLED: "true"/"false" (default false)
+
+Metrics (see agents/metrics.py):
+- input_guardrail_decisions_total{tenant,check,action}: action is allow, answer or reject;
+  check is the check that decided ("none" when allowed, "model" for the model guardrail)
+- input_guardrail_seconds: duration of the local checks
+"""
+
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agents import GuardrailFunctionOutput, InputGuardrail, RunContextWrapper, Runner
+
+from .metrics import registry
+from .pre_router import pre_router, tokenize
+
+logger = logging.getLogger(__name__)
+
+guardrail_decisions = registry.counter(
+    "input_guardrail_decisions_total", "Input guardrail decisions", ("tenant", "check", "action")
+)
+guardrail_seconds = registry.histogram(
+    "input_guardrail_seconds", "Duration of the local input guardrail checks",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+
+ALLOW = "allow"
+ANSWER = "answer"
+REJECT = "reject"
+
+CHECKS = ("size", "blocklist", "language", "off_topic")
+
+# Prompt injection and abuse; organization-specific terms go to INPUT_GUARDRAIL_BLOCKLIST_PATH
+DEFAULT_BLOCKLIST: List[str] = [
+    r"\bignore (all |any )?(the )?(previous|prior|above) (instructions|prompts?|rules)\b",
+    r"\b(reveal|show|print|repeat) (me )?(your|the) (system )?(prompt|instructions)\b",
+    # "Developer mode" only as a jailbreak addressed to the assistant, not a laptop setting
+    r"\bjailbreak\b|\bDAN mode\b",
+    r"\b(you are|you're) (now )?(in )?developer mode\b|\bdeveloper mode (is )?(enabled|activated)\b",
+    r"игнорируй (все )?(предыдущие )?инструкции|покажи (свой |системный )?промпт",
+    r"\b(i will|i'll|gonna) (kill|hurt|beat) (you|him|her|them)\b",
+    r"\bf+u+c+k+ (you|off)\b|\bstupid (bot|assistant)\b",
+]
+
+# (pattern, weight): requests no agent of ours can serve; weights below 2 need a second match.
+# Topics that also come up at work are weak on their own: working from home in bad weather,
+# the office football match, employee stock options, a movie night, a Java training course,
+# a script for onboarding. A coding or homework request shows two signals (a language and
+# "write ... function", "solve" and "equation"), and only recipes, horoscopes and lotteries
+# are enough alone.
+OFF_TOPIC_RULES: List[Tuple[str, float]] = [
+    (r"\b(python|javascript|java|sql|html|css|regex|c\+\+)\b", 1.5),
+    (r"\bwrite (a |some |the )?(\w+ )?(code|script|function|program|query|sql)\b", 1.5),
+    (r"\b(sort(ing)?|array|algorithm|compiler?|debug)\b", 1.0),
+    (r"\b(integral|derivative|equation|homework|essay)\b|\b\d+\s*[-+*/^]\s*\d+\s*=", 1.5),
+    (r"\bsolve\b", 1.0),
+    (r"\brecipe\b|\bhoroscope\b|\blottery\b", 2.5),
+    (r"\bweather\b|\bforecast\b", 1.5),
+    (r"\bfootball\b|\bsoccer\b|\bnba\b|\bmatch score\b", 1.5),
+    (r"\bbitcoin\b|\bcrypto\b|\bstock price\b", 1.5),
+    (r"\bpoem\b|\blyrics\b|\bmovie\b|\bnetflix\b|\bvideo game\b|\belection\b|\bpresident\b", 1.5),
+    (r"\btranslate\b", 1.5),
+    (r"рецепт|гороскоп", 2.5),
+    (r"напиши (код|скрипт|программу|функцию)", 1.5),
+    (r"сортировк|массив|алгоритм|компилятор|отладк", 1.0),
+    (r"домашн\w* задани|уравнени|стихотворен", 1.5),
+    (r"\bреши\b", 1.0),
+    (r"погод|футбол", 1.5),
+    (r"биткоин|криптовалют", 1.5),
+    (r"переведи", 1.5),
+]
+
+# Stop words of Latin-script languages, to tell English from other Latin text
+STOP_WORDS: Dict[str, frozenset] = {
+    "en": frozenset("a the and is are to of for with my i you can what how do it this that in on".split()),
+    "de": frozenset("der die das und ist ich nicht mit ein eine zu für auf wie was kann".split()),
+    "fr": frozenset("le la les et est je pas avec un une pour sur comment que qui des du".split()),
+    "es": frozenset("el la los las y es yo no con un una para por como que qué del quiero".split()),
+    "it": frozenset("il lo la gli e è io non con un una per come che di del voglio".split()),
+    "pt": frozenset("o a os as e é eu não com um uma para por como que do da quero".split()),
+}
+
+# Unicode script (first word of the character name) -> language code
+SCRIPT_LANGUAGES = {"LATIN": "en", "CYRILLIC": "ru", "CJK": "zh", "HIRAGANA": "ja", "KATAKANA": "ja",
+                    "HANGUL": "ko", "ARABIC": "ar", "HEBREW": "he", "GREEK": "el", "DEVANAGARI": "hi",
+                    "THAI": "th", "GEORGIAN": "ka", "ARMENIAN": "hy"}
+
+MIN_LETTERS = 3
+MIN_STOP_WORDS = 2
+
+CANNED_REPLIES = {
+    "language": (
+        "Sorry, I can only help with messages in English or Russian.\n"
+        "Извините, я отвечаю только на сообщения на английском или русском языке."
+    ),
+    "off_topic": {
+        "en": "I can help with office life and company culture, vacations, salary, business trips "
+              "and other requests that need approval. Please ask about one of these.",
+        "ru": "Я помогаю с вопросами об офисе и корпоративной культуре, отпусках, зарплате, командировках "
+              "и других запросах на согласование. Пожалуйста, задайте вопрос на одну из этих тем.",
+    },
+}
+
+REJECTION_STATUS = {"empty": 422, "size": 413, "blocklist": 400}
+
+
+class InputRejected(Exception):
+    """The local checks rejected the message (the API answers with `status`)."""
+
+    def __init__(self, decision: "GuardrailDecision"):
+        super().__init__(decision.reply)
+        self.decision = decision
+
+    @property
+    def status(self) -> int:
+        return self.decision.status
+
+
+@dataclass
+class GuardrailDecision:
+    """Result of the local checks."""
+    action: str
+    check: str = "none"
+    # Canned answer (action "answer") or reason of the rejection (action "reject")
+    reply: Optional[str] = None
+    language: Optional[str] = None
+    latency_ms: float = 0.0
+
+    @property
+    def status(self) -> int:
+        """HTTP status for a rejection."""
+        return REJECTION_STATUS.get(self.check, 400)
+
+
+def detect_language(message: str) -> Optional[str]:
+    """Language code of the message, None if there is too little text to tell."""
+    if message.isascii():
+        scripts = Counter({"LATIN": sum(char.isalpha() for char in message)})
+    else:
+        scripts = Counter(
+            unicodedata.name(char, "UNKNOWN").split(" ", 1)[0] for char in message if char.isalpha()
+        )
+    if sum(scripts.values()) < MIN_LETTERS:
+        return None
+    script = scripts.most_common(1)[0][0]
+    language = SCRIPT_LANGUAGES.get(script, script.lower())
+    if script != "LATIN":
+        return language
+    # Latin script: English unless another language's stop words clearly dominate
+    tokens = tokenize(message)
+    hits = {code: sum(token in words for token in tokens) for code, words in STOP_WORDS.items()}
+    best = max(hits, key=hits.get)
+    if best != "en" and hits[best] >= MIN_STOP_WORDS and hits[best] > hits["en"]:
+        return best
+    return "en"
+
+
+class InputGuard:
+    """Local checks before routing, with decision metrics."""
+
+    def __init__(
+        self,
+        checks: Sequence[str] = CHECKS,
+        max_chars: int = 4000,
+        languages: Sequence[str] = ("en", "ru"),
+        blocklist: Sequence[str] = DEFAULT_BLOCKLIST,
+        off_topic_rules: Sequence[Tuple[str, float]] = OFF_TOPIC_RULES,
+        off_topic_threshold: float = 0.85,
+        enabled: bool = True,
+        model_enabled: bool = False,
+    ):
+        unknown = set(checks) - set(CHECKS)
+        if unknown:
+            raise ValueError(f"Unknown input guardrail checks: {', '.join(sorted(unknown))}")
+        self.checks = tuple(checks)
+        self.max_chars = max_chars
+        self.languages = set(languages)
+        self.blocklist = [re.compile(pattern, re.IGNORECASE) for pattern in blocklist]
+        self.off_topic_rules = [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in off_topic_rules]
+        self.off_topic_threshold = off_topic_threshold
+        self.enabled = enabled
+        self.model_enabled = model_enabled
+
+    @classmethod
+    def from_env(cls) -> "InputGuard":
+        blocklist = list(DEFAULT_BLOCKLIST)
+        blocklist_path = os.getenv("INPUT_GUARDRAIL_BLOCKLIST_PATH")
+        if blocklist_path:
+            try:
+                with open(blocklist_path, encoding="utf-8") as f:
+                    blocklist += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+            except OSError as e:
+                logger.warning("Input guardrail blocklist not loaded from %s: %s", blocklist_path, e)
+        checks = os.getenv("INPUT_GUARDRAIL_CHECKS", ",".join(CHECKS))
+        return cls(
+            checks=[check.strip() for check in checks.split(",") if check.strip()],
+            max_chars=int(os.getenv("INPUT_GUARDRAIL_MAX_CHARS", "4000")),
+            languages=[code.strip() for code in os.getenv("INPUT_GUARDRAIL_LANGUAGES", "en,ru").split(",")],
+            blocklist=blocklist,
+            off_topic_threshold=float(os.getenv("INPUT_GUARDRAIL_OFF_TOPIC_THRESHOLD", "0.85")),
+            enabled=os.getenv("INPUT_GUARDRAIL_ENABLED", "true").lower() == "true",
+            model_enabled=os.getenv("INPUT_GUARDRAIL_MODEL_ENABLED", "false").lower() == "true",
+        )
+
+    # ===============================
+    # CHECKS
+    # ===============================
+
+    def off_topic_confidence(self, message: str) -> float:
+        """Logistic of off-topic minus on-topic (pre-router rules) score; 0 without off-topic evidence."""
+        off_topic = sum(weight for pattern, weight in self.off_topic_rules if pattern.search(message))
+        if off_topic == 0:
+            return 0.0
+        on_topic = sum(weight for _, pattern, weight in pre_router.rules if pattern.search(message))
+        return 1 / (1 + math.exp(-(off_topic - on_topic)))
+
+    def _decide(self, message: str) -> GuardrailDecision:
+        if not message.strip():
+            return GuardrailDecision(REJECT, "empty", "Empty message")
+        if "size" in self.checks and len(message) > self.max_chars:
+            return GuardrailDecision(REJECT, "size", f"Message is longer than {self.max_chars} characters")
+        if "blocklist" in self.checks and any(pattern.search(message) for pattern in self.blocklist):
+            return GuardrailDecision(REJECT, "blocklist", "Message matches the blocklist")
+        language = detect_language(message) if "language" in self.checks or "off_topic" in self.checks else None
+        if "language" in self.checks and language is not None and language not in self.languages:
+            return GuardrailDecision(ANSWER, "language", CANNED_REPLIES["language"], language)
+        if "off_topic" in self.checks and self.off_topic_confidence(message) >= self.off_topic_threshold:
+            return GuardrailDecision(ANSWER, "off_topic", self.off_topic_reply(language), language)
+        return GuardrailDecision(ALLOW, language=language)
+
+    def check(self, message: str, tenant: str = "default") -> GuardrailDecision:
+        """Runs the local checks and records the decision (rejections are returned, not raised)."""
+        if not self.enabled:
+            return GuardrailDecision(ALLOW)
+        start = time.perf_counter()
+        decision = self._decide(message)
+        elapsed = time.perf_counter() - start
+        decision.latency_ms = elapsed * 1000
+        guardrail_seconds.observe(elapsed)
+        guardrail_decisions.inc(tenant, decision.check, decision.action)
+        return decision
+
+    def enforce(self, message: str, tenant: str = "default") -> GuardrailDecision:
+        """Like `check`, but raises InputRejected for rejected messages."""
+        decision = self.check(message, tenant)
+        if decision.action == REJECT:
+            raise InputRejected(decision)
+        return decision
+
+    @staticmethod
+    def off_topic_reply(language: Optional[str]) -> str:
+        replies = CANNED_REPLIES["off_topic"]
+        return replies.get(language or "en", replies["en"])
+
+    def stats(self) -> Dict:
+        """Configuration and decision counts: {tenant: {check: {action: count}}}."""
+        decisions: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for (tenant, check, action), count in sorted(guardrail_decisions._merged().items()):
+            decisions.setdefault(tenant, {}).setdefault(check, {})[action] = int(count)
+        return {
+            "enabled": self.enabled,
+            "checks": list(self.checks),
+            "model_enabled": self.model_enabled,
+            "max_chars": self.max_chars,
+            "languages": sorted(self.languages),
+            "off_topic_threshold": self.off_topic_threshold,
+            "decisions": decisions,
+        }
+
+    # ===============================
+    # MODEL GUARDRAIL
+    # ===============================
+
+    def model_guardrails(self) -> List[InputGuardrail]:
+        """SDK input guardrails for the Runner (run concurrently with the first turn); empty if disabled."""
+        if not (self.enabled and self.model_enabled):
+            return []
+        return [InputGuardrail(guardrail_function=_model_guardrail, name="model_input_guardrail")]
+
+
+def _last_user_message(input) -> str:
+    """The current user message: the Runner passes the session history plus the new input."""
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if isinstance(item, dict) and item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            return " ".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+    return ""
+
+
+async def _model_guardrail(context: RunContextWrapper, agent, input) -> GuardrailFunctionOutput:
+    from .registry import agent_registry
+
+    result = await Runner.run(agent_registry.get("guardrail"), _last_user_message(input), context=context.context)
+    verdict = result.final_output
+    tenant = str(getattr(context.context, "tenant_id", "default"))
+    guardrail_decisions.inc(tenant, "model", ALLOW if verdict.allowed else ANSWER)
+    return GuardrailFunctionOutput(output_info=verdict, tripwire_triggered=not verdict.allowed)
+
+
+input_guard = InputGuard.from_env()
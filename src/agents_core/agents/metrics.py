@@ -0,0 +1,175 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Recording is lock-free: every thread (in practice, every event loop) writes to
+its own shard of plain counters, and shards are only merged when /metrics is
+scraped. An observation is one bisect plus a few integer additions.
+
+Usage:
+    from agents_core.agents.metrics import registry
+
+    latency = registry.histogram("agent_duration_seconds", "Agent run duration", ("agent", "tenant"))
+    latency.observe(0.42, "HR Agent", "acme")
+
+    print(registry.render())  # Prometheus text format 0.0.4
+"""
+
+import bisect
+import math
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Default buckets for durations in seconds (tool calls are milliseconds, model turns are seconds)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            # Taken once per thread, never on the hot path
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _merged(self) -> dict:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merged(self) -> Dict[Labels, float]:
+        merged: Dict[Labels, float] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, value in sorted(self._merged().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram (bucket counts, sum and count per label set)."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # [count per bucket..., +Inf bucket, sum, count]
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def _merged(self) -> Dict[Labels, list]:
+        merged: Dict[Labels, list] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, series in list(shard.items()):
+                target = merged.setdefault(labels, [0] * len(series))
+                for i, value in enumerate(series):
+                    target[i] += value
+        return merged
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, series in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = 'le="+Inf"' if math.isinf(bound) else f'le="{float(bound)!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(float(series[-2]))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together at /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric '{metric.name}' is already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
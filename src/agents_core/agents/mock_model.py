@@ -0,0 +1,419 @@
+"""
+Deterministic offline model for running the full agent graph without OpenAI.
+
+`MockModel` implements the SDK `Model` interface. Each agent gets a script: a
+list of turns, where a turn is either
+- a list of tool calls (several calls in one turn are parallel tool calls),
+- a handoff chosen from the last user message (Route Agent),
+- a structured guardrail verdict from the last user message (guardrail agent), or
+- the final text answer.
+
+On every model call the first turn whose tool calls are not yet answered in the
+current input is played, so a run goes route -> handoff -> tools -> answer in a
+fixed order. Tools the agent does not have are skipped. Latency is simulated
+with a configurable distribution.
+
+Usage is estimated at 4 characters per token over the instructions, tool schemas
+and input. Provider prompt caching is simulated like OpenAI's: prompts of 1024+
+tokens are cached in 128-token blocks, and a call reports as cached the longest
+run of leading blocks some earlier call already sent.
+
+Configuration (environment variables):
+- MOCK_MODEL_LATENCY: "fixed:<ms>", "uniform:<min_ms>:<max_ms>", "normal:<mean_ms>:<sd_ms>"
+  or "lognormal:<median_ms>:<sigma>" (default "fixed:0")
+- MOCK_MODEL_SEED: seed of the latency generator (default 0)
+
+Enable with MODEL_PROVIDER=mock (see model_config.py).
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from agents.agent_output import AgentOutputSchemaBase
+from agents.handoffs import Handoff
+from agents.items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from agents.model_settings import ModelSettings
+from agents.models.fake_id import FAKE_RESPONSES_ID
+from agents.models.interface import Model, ModelTracing
+from agents.tool import Tool
+from agents.usage import Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+
+# ===============================
+# SCRIPTS
+# ===============================
+
+@dataclass(frozen=True)
+class ToolCall:
+    name: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    # Pass the last user message as the "input" argument (agent-as-tool consultations)
+    forward_input: bool = False
+
+
+@dataclass(frozen=True)
+class RouteHandoff:
+    """Hands off to the agent chosen for the last user message by the local pre-router rules."""
+    targets: Dict[str, str]
+    default: str
+
+
+@dataclass(frozen=True)
+class GuardrailVerdict:
+    """Answers the guardrail agent's verdict from the local off-topic score of the last user message."""
+    max_off_topic: float = 0.5
+
+
+FINAL_ANSWER = "final_answer"
+
+Turn = Union[List[ToolCall], RouteHandoff, GuardrailVerdict, str]
+
+MOCK_SCRIPTS: Dict[str, List[Turn]] = {
+    "route": [
+        RouteHandoff(
+            targets={"office_culture": "Office Culture Agent", "approval_request": "CEO Agent"},
+            default="Office Culture Agent",
+        ),
+    ],
+    "office_culture": [
+        [ToolCall("get_user_basic_info")],
+        FINAL_ANSWER,
+    ],
+    "ceo": [
+        [ToolCall("get_employee_profile"), ToolCall("analyze_employee_eligibility")],
+        [ToolCall("payroll_consultation", forward_input=True), ToolCall("hr_consultation", forward_input=True)],
+        FINAL_ANSWER,
+    ],
+    "payroll": [
+        [ToolCall("get_max_allowed_salary_increase"), ToolCall("calculate_salary_increase", {"percentage": 10})],
+        FINAL_ANSWER,
+    ],
+    "hr": [
+        [ToolCall("check_vacation_range", {"start_date": "2025-08-15", "end_date": "2025-08-17"})],
+        FINAL_ANSWER,
+    ],
+    "guardrail": [GuardrailVerdict()],
+}
+
+
+# ===============================
+# LATENCY
+# ===============================
+
+class LatencyModel:
+    """Simulated model latency in seconds, drawn from a seeded distribution."""
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 0):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(kind) != len(self.params):
+            raise ValueError(f"Invalid latency spec '{spec}'")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LatencyModel":
+        return cls(os.getenv("MOCK_MODEL_LATENCY", "fixed:0"), int(os.getenv("MOCK_MODEL_SEED", "0")))
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                ms = self.params[0]
+            elif self.kind == "uniform":
+                ms = self._random.uniform(*self.params)
+            elif self.kind == "normal":
+                ms = self._random.gauss(*self.params)
+            else:
+                median, sigma = self.params
+                ms = self._random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return max(ms, 0.0) / 1000
+
+
+latency_model = LatencyModel.from_env()
+
+_call_ids = itertools.count(1)
+_stats = {"calls": 0, "simulated_latency_s": 0.0}
+_stats_lock = threading.Lock()
+
+
+def mock_model_stats() -> Dict[str, float]:
+    """Number of mock model calls and total simulated latency."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+# ===============================
+# PROMPT CACHE
+# ===============================
+
+CHARS_PER_TOKEN = 4
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+
+class PrefixCache:
+    """Simulated provider prompt cache: hashes of every cached block-aligned prefix (LRU)."""
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max_entries
+        self._prefixes: "OrderedDict[bytes, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup_and_store(self, prompt: str) -> int:
+        """Cached tokens of the prompt; its block prefixes are cached for later calls."""
+        data = prompt.encode()
+        block = CACHE_BLOCK_TOKENS * CHARS_PER_TOKEN
+        if len(data) < CACHE_MIN_TOKENS * CHARS_PER_TOKEN:
+            return 0
+        digest = hashlib.sha1()
+        prefixes = []
+        for end in range(block, len(data) + 1, block):
+            digest.update(data[end - block:end])
+            prefixes.append(digest.digest())
+        cached_blocks = 0
+        with self._lock:
+            for key in prefixes:
+                if key not in self._prefixes:
+                    break
+                cached_blocks += 1
+            for key in prefixes:
+                self._prefixes[key] = None
+                self._prefixes.move_to_end(key)
+            while len(self._prefixes) > self.max_entries:
+                self._prefixes.popitem(last=False)
+        return cached_blocks * CACHE_BLOCK_TOKENS
+
+
+prefix_cache = PrefixCache()
+
+
+def _tool_schema(tool: Any) -> Dict[str, Any]:
+    return {
+        "name": getattr(tool, "name", ""),
+        "description": getattr(tool, "description", ""),
+        "parameters": getattr(tool, "params_json_schema", None),
+    }
+
+
+def _handoff_schema(handoff: Handoff) -> Dict[str, Any]:
+    return {"name": handoff.tool_name, "description": handoff.tool_description, "parameters": handoff.input_json_schema}
+
+
+# ===============================
+# MODEL
+# ===============================
+
+def _text_of(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def _current_turn(input: Union[str, List[TResponseInputItem]]) -> tuple:
+    """Returns (last user message, tool calls and outputs after it) of the model input."""
+    if isinstance(input, str):
+        return input, {}, []
+    user_message, calls, outputs = "", {}, []
+    for item in input:
+        item_type = item.get("type")
+        if item.get("role") == "user" and item_type in (None, "message"):
+            user_message, calls, outputs = _text_of(item.get("content")), {}, []
+        elif item_type == "function_call":
+            calls[item["call_id"]] = item["name"]
+        elif item_type == "function_call_output":
+            outputs.append((calls.get(item["call_id"]), str(item.get("output", ""))))
+    return user_message, calls, outputs
+
+
+class MockModel(Model):
+    """Scripted offline model for one agent (see MOCK_SCRIPTS)."""
+
+    def __init__(self, agent_key: str, script: Optional[List[Turn]] = None, latency: Optional[LatencyModel] = None):
+        self.agent_key = agent_key
+        self.script = script if script is not None else MOCK_SCRIPTS.get(agent_key, [FINAL_ANSWER])
+        self.latency = latency or latency_model
+
+    def _plan(self, input, tools: List[Tool], handoffs: List[Handoff]) -> List[Any]:
+        """Output items for the next turn of the script."""
+        user_message, calls, outputs = _current_turn(input)
+        answered = {name for name, _ in outputs}
+        tool_names = {getattr(tool, "name", None) for tool in tools}
+
+        for turn in self.script:
+            if isinstance(turn, RouteHandoff):
+                if not handoffs:
+                    continue
+                from .pre_router import pre_router
+                label = pre_router.classify(user_message).label
+                target = turn.targets.get(label, turn.default)
+                handoff = next((h for h in handoffs if h.agent_name == target), handoffs[0])
+                return [self._function_call(handoff.tool_name, {})]
+
+            if isinstance(turn, GuardrailVerdict):
+                from .input_guardrail import input_guard
+                confidence = input_guard.off_topic_confidence(user_message)
+                allowed = confidence < turn.max_off_topic
+                reason = f"[mock guardrail] off-topic confidence {confidence:.2f}"
+                return [self._message(json.dumps({"allowed": allowed, "reason": reason}))]
+
+            if isinstance(turn, list):
+                pending = [call for call in turn if call.name in tool_names and call.name not in answered]
+                if not pending:
+                    continue
+                return [
+                    self._function_call(call.name, {**call.arguments, **({"input": user_message} if call.forward_input else {})})
+                    for call in pending
+                ]
+
+            return [self._message(self._answer(user_message, outputs))]
+        return [self._message(self._answer(user_message, outputs))]
+
+    def _answer(self, user_message: str, outputs: List[tuple]) -> str:
+        lines = [f"[mock {self.agent_key}] {user_message[:200]}"]
+        lines += [f"{name}: {output[:200]}" for name, output in outputs]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _function_call(name: str, arguments: Dict[str, Any]) -> ResponseFunctionToolCall:
+        call_id = f"call_mock_{next(_call_ids)}"
+        return ResponseFunctionToolCall(
+            id=FAKE_RESPONSES_ID,
+            call_id=call_id,
+            name=name,
+            arguments=json.dumps(arguments),
+            type="function_call",
+        )
+
+    @staticmethod
+    def _message(text: str) -> ResponseOutputMessage:
+        return ResponseOutputMessage(
+            id=FAKE_RESPONSES_ID,
+            content=[ResponseOutputText(text=text, type="output_text", annotations=[])],
+            role="assistant",
+            status="completed",
+            type="message",
+        )
+
+    @staticmethod
+    def _usage(system_instructions: Optional[str], input, tools: List[Tool], handoffs: List[Handoff],
+               output: List[Any]) -> Usage:
+        # Rough token estimate so usage accounting is exercised; the prompt is laid out
+        # like the provider's: instructions, tool schemas, input
+        schemas = [_tool_schema(tool) for tool in tools] + [_handoff_schema(handoff) for handoff in handoffs]
+        prompt = "".join((
+            system_instructions or "",
+            json.dumps(schemas, default=str),
+            json.dumps(input, default=str),
+        ))
+        input_tokens = len(prompt) // CHARS_PER_TOKEN
+        output_tokens = sum(len(item.model_dump_json()) for item in output) // CHARS_PER_TOKEN
+        return Usage(
+            requests=1,
+            input_tokens=input_tokens,
+            input_tokens_details=InputTokensDetails(cached_tokens=min(prefix_cache.lookup_and_store(prompt), input_tokens)),
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+
+    async def _simulate_latency(self) -> None:
+        delay = self.latency.sample()
+        with _stats_lock:
+            _stats["calls"] += 1
+            _stats["simulated_latency_s"] += delay
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def get_response(
+        self,
+        system_instructions: Optional[str],
+        input: Union[str, List[TResponseInputItem]],
+        model_settings: ModelSettings,
+        tools: List[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: List[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: Optional[str],
+        prompt: Any = None,
+    ) -> ModelResponse:
+        await self._simulate_latency()
+        output = self._plan(input, tools, handoffs)
+        usage = self._usage(system_instructions, input, tools, handoffs, output)
+        return ModelResponse(output=output, usage=usage, response_id=None)
+
+    async def stream_response(
+        self,
+        system_instructions: Optional[str],
+        input: Union[str, List[TResponseInputItem]],
+        model_settings: ModelSettings,
+        tools: List[Tool],
+        output_schema: Optional[AgentOutputSchemaBase],
+        handoffs: List[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: Optional[str],
+        prompt: Any = None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        await self._simulate_latency()
+        output = self._plan(input, tools, handoffs)
+        sequence = itertools.count()
+
+        for output_index, item in enumerate(output):
+            if isinstance(item, ResponseOutputMessage):
+                for word in item.content[0].text.split(" "):
+                    yield ResponseTextDeltaEvent(
+                        content_index=0,
+                        delta=word + " ",
+                        item_id=item.id,
+                        logprobs=[],
+                        output_index=output_index,
+                        sequence_number=next(sequence),
+                        type="response.output_text.delta",
+                    )
+
+        usage = self._usage(system_instructions, input, tools, handoffs, output)
+        yield ResponseCompletedEvent(
+            response=Response(
+                id=FAKE_RESPONSES_ID,
+                created_at=time.time(),
+                model=f"mock-{self.agent_key}",
+                object="response",
+                output=output,
+                parallel_tool_calls=True,
+                tool_choice="auto",
+                tools=[],
+                usage=ResponseUsage(
+                    input_tokens=usage.input_tokens,
+                    output_tokens=usage.output_tokens,
+                    total_tokens=usage.total_tokens,
+                    input_tokens_details=usage.input_tokens_details,
+                    output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+                ),
+            ),
+            sequence_number=next(sequence),
+            type="response.completed",
+        )
@@ -0,0 +1,99 @@
+"""
+Model configuration shared by all agents.
+
+Every agent module asks `get_agent_model(agent_key)` for its model instead of
+reading the environment itself, so the provider is configured once per process.
+
+Configuration (environment variables, .env is loaded once):
+- MODEL_PROVIDER: "openai" (default) or "mock"
+  - openai: agents use MODEL_NAME through the OpenAI API; OPENAI_API_KEY is required
+  - mock: agents use the deterministic offline MockModel (mock_model.py); no key or
+    network is needed and traces are not exported
+- MODEL_NAME: OpenAI model name (openai provider)
+- MOCK_MODEL_LATENCY, MOCK_MODEL_SEED: see mock_model.py
+- MODEL_RESILIENCE_ENABLED and the MODEL_TIMEOUT/RETRY/HEDGE/BREAKER settings: see
+  resilient_model.py; with resilience enabled (default) every agent's model is
+  wrapped in ResilientModel
+- PROMPT_CACHE_LAYOUT_ENABLED, PROMPT_CACHE_KEY_PREFIX: see prompt_cache.py; with the
+  layout enabled (default) every agent's model is wrapped in StablePromptModel
+"""
+
+import os
+import threading
+from typing import Optional, Union
+
+from agents import set_default_openai_key
+from agents.models.interface import Model
+from dotenv import load_dotenv
+
+_configured_provider: Optional[str] = None
+_configure_lock = threading.Lock()
+
+
+def get_model_provider() -> str:
+    """Configures the model provider on first use and returns its name."""
+    global _configured_provider
+    if _configured_provider is None:
+        with _configure_lock:
+            if _configured_provider is None:
+                load_dotenv()
+                provider = os.getenv("MODEL_PROVIDER", "openai").lower()
+                if provider == "mock":
+                    from agents import set_trace_processors
+                    # Keep tracing (local processors still work) but drop the OpenAI exporter
+                    set_trace_processors([])
+                elif provider == "openai":
+                    api_key = os.getenv("OPENAI_API_KEY")
+                    if not api_key:
+                        raise EnvironmentError("OPENAI_API_KEY not found in environment variables. Check the .env file")
+                    set_default_openai_key(api_key)
+                else:
+                    raise EnvironmentError(f"Unknown MODEL_PROVIDER '{provider}' (expected 'openai' or 'mock')")
+                _configured_provider = provider
+    return _configured_provider
+
+
+_openai_provider = None
+
+
+def _get_openai_provider():
+    """One OpenAI client for all agents; with ResilientModel retrying, the client itself does not."""
+    global _openai_provider
+    with _configure_lock:
+        if _openai_provider is None:
+            from agents.models.openai_provider import OpenAIProvider
+            from openai import AsyncOpenAI
+            from .resilient_model import resilience_enabled
+            retries = {"max_retries": 0} if resilience_enabled() else {}
+            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), **retries)
+            _openai_provider = OpenAIProvider(openai_client=client)
+    return _openai_provider
+
+
+def get_agent_model(agent_key: str) -> Union[str, Model, None]:
+    """
+    Returns the model for an agent.
+
+    Args:
+        agent_key: Agent identifier used by the mock provider to pick its script and
+                   by the resilience settings ("route", "ceo", "hr", "payroll", "office_culture")
+
+    Returns:
+        The OpenAI model MODEL_NAME or a MockModel, depending on the provider, wrapped
+        in StablePromptModel and ResilientModel; with both disabled, MODEL_NAME itself
+        for the OpenAI provider
+    """
+    from .prompt_cache import StablePromptModel, prompt_layout_enabled
+    from .resilient_model import ResilientModel, resilience_enabled
+
+    if get_model_provider() == "mock":
+        from .mock_model import MockModel
+        model = MockModel(agent_key)
+    elif resilience_enabled() or prompt_layout_enabled():
+        model = _get_openai_provider().get_model(os.getenv("MODEL_NAME"))
+    else:
+        return os.getenv("MODEL_NAME")
+    if prompt_layout_enabled():
+        # Inside ResilientModel: every attempt and hedge is a provider call of its own
+        model = StablePromptModel(model, agent_key)
+    return ResilientModel(model, agent_key) if resilience_enabled() else model
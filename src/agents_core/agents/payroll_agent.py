@@ -1,19 +1,12 @@
-from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, set_default_openai_key, function_tool, RunContextWrapper
+from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, function_tool, RunContextWrapper
 from agents.exceptions import InputGuardrailTripwireTriggered
 from pydantic import BaseModel
 import asyncio
-from dotenv import load_dotenv
 import os
-import sys
-from pathlib import Path
-
-# Add src directory to Python path for correct imports
-current_file = Path(__file__).resolve()
-src_dir = current_file.parent.parent.parent
-if str(src_dir) not in sys.path:
-    sys.path.insert(0, str(src_dir))
 
 from agents_core.agents.context.context_manager import ContextManager
+from agents_core.agents.context.tool_format import with_output_format
+from agents_core.agents.model_config import get_agent_model
 from agents_core.agents.context.functions import (
     get_user_info,
     get_user_basic_info,
@@ -22,18 +15,15 @@ from agents_core.agents.context.functions import (
     get_available_salary_increases,
     calculate_salary_increase,
     get_max_allowed_salary_increase,
+    simulate_department_raises,
     get_employee_profile,
     analyze_employee_eligibility
 )
 from agents_core.agents.hooks import agent_hooks
 
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-model = os.getenv("MODEL_NAME")
-if not api_key:
-    raise EnvironmentError("OPENAI_API_KEY not found in environment variables. Check the .env file")
-set_default_openai_key(api_key)
+# OpenAI model (MODEL_NAME) or the offline mock model, depending on MODEL_PROVIDER
+model = get_agent_model("payroll")
 
 
 payroll_agent = Agent[ContextManager](
@@ -54,10 +44,11 @@ payroll_agent = Agent[ContextManager](
     Always check employee info first, then available percentages, then provide detailed analysis.
     Consider employee rating when making recommendations.
     Use get_max_allowed_salary_increase to understand rating-based limits.
+    Use simulate_department_raises for department-wide or company-wide raise questions and budget impact.
     Use get_employee_profile for comprehensive employee information.
     Use analyze_employee_eligibility to assess benefit eligibility.
     """,
-    tools=[
+    tools=with_output_format([
         get_user_info,
         get_user_basic_info,
         get_user_rating,
@@ -65,9 +56,10 @@ payroll_agent = Agent[ContextManager](
         get_available_salary_increases,
         calculate_salary_increase,
         get_max_allowed_salary_increase,
+        simulate_department_raises,
         get_employee_profile,
         analyze_employee_eligibility
-    ],
+    ], "Payroll Agent"),
     hooks=agent_hooks
 )
 
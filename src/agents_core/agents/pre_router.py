@@ -0,0 +1,239 @@
+"""
+Local fast-path pre-router.
+
+Route Agent only decides between two paths, and obvious keywords usually settle it:
+- 'office_culture': small talk about office life and company culture
+- 'approval_request': vacations, salary increases, business trips, schedule changes
+
+PreRouter scores a message with a keyword/regex rule set and, optionally, a
+lightweight token model loaded from disk (JSON, see `train_token_model`).
+If the confidence is above the threshold the request can be dispatched straight
+to the target agent; otherwise Route Agent makes the decision as before.
+
+Metrics (`PreRouter.metrics()`):
+- fast-path / fallback counts and classification latency
+- agreement of the local prediction with the LLM router on fallbacks,
+  bucketed by confidence, to tune the threshold
+
+Configuration (environment variables):
+- PRE_ROUTER_ENABLED: "true"/"false" (default true)
+- PRE_ROUTER_THRESHOLD: minimum confidence for the fast path (default 0.85)
+- PRE_ROUTER_MODEL_PATH: optional path to a token model JSON file
+"""
+
+import json
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+OFFICE_CULTURE = "office_culture"
+APPROVAL_REQUEST = "approval_request"
+LABELS = (OFFICE_CULTURE, APPROVAL_REQUEST)
+
+# (label, pattern, weight)
+DEFAULT_RULES: List[Tuple[str, str, float]] = [
+    (APPROVAL_REQUEST, r"\bvacation\b|\bholiday(s)?\b|\bday(s)? off\b|\bleave\b|\bpto\b", 2.5),
+    (APPROVAL_REQUEST, r"\bsalary\b|\braise\b|\bpay rise\b|\bcompensation\b|\bbonus\b", 2.5),
+    (APPROVAL_REQUEST, r"\bbusiness trip\b|\btravel request\b", 2.5),
+    (APPROVAL_REQUEST, r"\bschedule change\b|\bchange (my )?schedule\b|\bapprov", 2.0),
+    (APPROVAL_REQUEST, r"\bincrease\b|\b\d+\s?%", 1.0),
+    (APPROVAL_REQUEST, r"отпуск|зарплат|оклад|повышени|преми|командировк|согласова", 2.5),
+    (OFFICE_CULTURE, r"\boffice culture\b|\bcompany culture\b|\bculture\b", 2.5),
+    (OFFICE_CULTURE, r"\batmosphere\b|\bteam building\b|\bcolleagues\b|\bkitchen\b|\bcoffee\b|\bparty\b", 2.0),
+    (OFFICE_CULTURE, r"\boffice life\b|\bdress code\b|\bvalues\b|\bwork environment\b", 2.0),
+    (OFFICE_CULTURE, r"культур|атмосфер|корпоратив|коллег|офис", 2.0),
+]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_CONFIDENCE_BUCKETS = (0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+@dataclass
+class RouteDecision:
+    """Result of local classification."""
+    label: Optional[str]
+    confidence: float
+    source: str
+    latency_ms: float = 0.0
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def train_token_model(samples: Iterable[Tuple[str, str]], alpha: float = 1.0) -> Dict:
+    """
+    Trains a multinomial naive Bayes token model.
+
+    Args:
+        samples: (message, label) pairs
+        alpha: Laplace smoothing
+
+    Returns:
+        JSON-serializable model: {"labels", "bias", "weights": {token: {label: log_prob}}, "default"}
+    """
+    label_counts: Counter = Counter()
+    token_counts: Dict[str, Counter] = defaultdict(Counter)
+    for message, label in samples:
+        label_counts[label] += 1
+        token_counts[label].update(tokenize(message))
+
+    labels = sorted(label_counts)
+    vocabulary = set()
+    for counts in token_counts.values():
+        vocabulary.update(counts)
+
+    total = sum(label_counts.values())
+    bias = {label: math.log(label_counts[label] / total) for label in labels}
+    weights: Dict[str, Dict[str, float]] = {}
+    default: Dict[str, float] = {}
+    for label in labels:
+        denominator = sum(token_counts[label].values()) + alpha * (len(vocabulary) + 1)
+        default[label] = math.log(alpha / denominator)
+        for token in vocabulary:
+            weights.setdefault(token, {})[label] = math.log((token_counts[label][token] + alpha) / denominator)
+
+    return {"labels": labels, "bias": bias, "weights": weights, "default": default}
+
+
+class PreRouter:
+    """Keyword/regex rule set plus an optional token model, with routing metrics."""
+
+    def __init__(
+        self,
+        rules: List[Tuple[str, str, float]] = DEFAULT_RULES,
+        model: Optional[Dict] = None,
+        threshold: float = 0.85,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            rules: (label, regex, weight) rules; weights of matched rules are summed per label
+            model: Token model as returned by `train_token_model`
+            threshold: Minimum confidence for dispatching directly to the target agent
+            enabled: If False, `classify` never returns a confident decision
+        """
+        self.rules = [(label, re.compile(pattern, re.IGNORECASE), weight) for label, pattern, weight in rules]
+        self.model = model
+        self.threshold = threshold
+        self.enabled = enabled
+        self.reset_metrics()
+
+    @classmethod
+    def from_env(cls) -> "PreRouter":
+        model = None
+        model_path = os.getenv("PRE_ROUTER_MODEL_PATH")
+        if model_path:
+            try:
+                with open(model_path, encoding="utf-8") as f:
+                    model = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Pre-router model not loaded from {model_path}: {e}")
+        return cls(
+            model=model,
+            threshold=float(os.getenv("PRE_ROUTER_THRESHOLD", "0.85")),
+            enabled=os.getenv("PRE_ROUTER_ENABLED", "true").lower() == "true",
+        )
+
+    # ===============================
+    # CLASSIFICATION
+    # ===============================
+
+    def _classify_rules(self, message: str) -> Tuple[Optional[str], float]:
+        scores = {label: 0.0 for label in LABELS}
+        for label, pattern, weight in self.rules:
+            if pattern.search(message):
+                scores[label] = scores.get(label, 0.0) + weight
+        (best, best_score), (_, other_score) = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:2]
+        if best_score == 0:
+            return None, 0.0
+        # Logistic of the score margin: one strong keyword ~0.92, a tie 0.5
+        return best, 1 / (1 + math.exp(-(best_score - other_score)))
+
+    def _classify_model(self, message: str) -> Tuple[Optional[str], float]:
+        model = self.model
+        scores = dict(model["bias"])
+        weights, default = model["weights"], model["default"]
+        for token in tokenize(message):
+            token_weights = weights.get(token)
+            for label in scores:
+                scores[label] += token_weights[label] if token_weights else default[label]
+        top = max(scores.values())
+        normalizer = sum(math.exp(score - top) for score in scores.values())
+        best = max(scores, key=scores.get)
+        return best, 1 / normalizer
+
+    def classify(self, message: str) -> RouteDecision:
+        """Classifies a message; the decision is confident if `confidence >= threshold`."""
+        start = time.perf_counter()
+        label, confidence = self._classify_rules(message)
+        source = "rules" if label else "none"
+        if self.model is not None and confidence < self.threshold:
+            model_label, model_confidence = self._classify_model(message)
+            if model_confidence > confidence:
+                label, confidence, source = model_label, model_confidence, "model"
+        latency_ms = (time.perf_counter() - start) * 1000
+        return RouteDecision(label=label, confidence=confidence, source=source, latency_ms=latency_ms)
+
+    def is_confident(self, decision: RouteDecision) -> bool:
+        return self.enabled and decision.label is not None and decision.confidence >= self.threshold
+
+    # ===============================
+    # METRICS
+    # ===============================
+
+    def reset_metrics(self) -> None:
+        self._fast_path: Counter = Counter()
+        self._fallbacks = 0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+        self._classified = 0
+        # bucket -> [agreements, comparisons]
+        self._agreement: Dict[float, List[int]] = {bucket: [0, 0] for bucket in _CONFIDENCE_BUCKETS}
+
+    def record_decision(self, decision: RouteDecision, fast_path: bool) -> None:
+        """Records one classification and whether it was dispatched directly."""
+        self._classified += 1
+        self._latency_total_ms += decision.latency_ms
+        self._latency_max_ms = max(self._latency_max_ms, decision.latency_ms)
+        if fast_path:
+            self._fast_path[decision.label] += 1
+        else:
+            self._fallbacks += 1
+
+    def record_router_choice(self, decision: RouteDecision, router_label: Optional[str]) -> None:
+        """Compares a fallback's local prediction with the label chosen by the LLM router."""
+        if decision.label is None or router_label is None:
+            return
+        bucket = next(b for b in _CONFIDENCE_BUCKETS if decision.confidence <= b)
+        self._agreement[bucket][1] += 1
+        if decision.label == router_label:
+            self._agreement[bucket][0] += 1
+
+    def metrics(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "classified": self._classified,
+            "fast_path": dict(self._fast_path),
+            "fallbacks": self._fallbacks,
+            "latency_ms": {
+                "mean": self._latency_total_ms / self._classified if self._classified else 0.0,
+                "max": self._latency_max_ms,
+            },
+            "router_agreement": {
+                f"<={bucket}": {
+                    "agreed": agreed,
+                    "total": total,
+                    "accuracy": agreed / total if total else None,
+                }
+                for bucket, (agreed, total) in self._agreement.items()
+            },
+        }
+
+
+pre_router = PreRouter.from_env()
@@ -0,0 +1,174 @@
+"""
+Stable prompt prefixes for provider-side prompt caching.
+
+Providers cache the longest previously seen prefix of a prompt (OpenAI: prompts of
+1024+ tokens, in 128-token steps) and bill and serve the cached part faster. The
+prompt is instructions, then tool schemas, then the input (history and the new
+message), so a cache hit needs the first two to be byte-identical between calls.
+
+`StablePromptModel` wraps an agent's model (see model_config.py) and, for every
+model call of the agent and of its clones:
+
+- normalizes the instructions (dedented, no trailing whitespace), so the same
+  text always renders the same bytes however it was indented in the source;
+- orders tools and handoffs by name, so the schemas come in one canonical order;
+- moves per-request data out of the system prompt: text appended with
+  `with_request_context()` is sent as a developer message after the input, so
+  the instructions stay the agent's static prefix (the message is not stored in
+  the session, it is only part of that model call);
+- sends a `prompt_cache_key` per agent (OpenAI provider), so requests of all
+  tenants with the same prefix are routed to the same cache;
+- records the cached input tokens the provider reports.
+
+Configuration (environment variables):
+- PROMPT_CACHE_LAYOUT_ENABLED: "true"/"false" (default true)
+- PROMPT_CACHE_KEY_PREFIX: prefix of the prompt_cache_key, "" to not send one (default "agents-")
+
+Metrics (see agents/metrics.py):
+- prompt_input_tokens_total{agent}: input tokens of model calls
+- prompt_cached_tokens_total{agent}: part of them the provider served from its cache
+- prompt_cache_calls_total{agent,cache}: model calls with (hit) and without (miss) cached tokens
+- prompt_call_duration_seconds{agent,cache}: single model call duration by cache outcome
+"""
+
+import os
+import re
+import textwrap
+import time
+from dataclasses import replace
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from agents.models.interface import Model
+
+from .metrics import DURATION_BUCKETS, registry
+
+prompt_input_tokens = registry.counter("prompt_input_tokens_total", "Model input tokens", ("agent",))
+prompt_cached_tokens = registry.counter(
+    "prompt_cached_tokens_total", "Model input tokens served from the provider prompt cache", ("agent",)
+)
+prompt_cache_calls = registry.counter(
+    "prompt_cache_calls_total", "Model calls by prompt cache outcome", ("agent", "cache")
+)
+prompt_call_duration = registry.histogram(
+    "prompt_call_duration_seconds", "Model call duration by prompt cache outcome", ("agent", "cache"), DURATION_BUCKETS
+)
+
+# Separates an agent's static instructions from per-request context (see with_request_context)
+REQUEST_CONTEXT_MARKER = "\n<<request-context>>\n"
+
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+
+
+def with_request_context(instructions: str, context: str) -> str:
+    """
+    Instructions for an agent clone that needs per-request data (profile, consultations).
+
+    The data is not kept in the system prompt: StablePromptModel sends it as a
+    developer message after the input, and the instructions stay a shared prefix.
+    """
+    return f"{instructions}{REQUEST_CONTEXT_MARKER}{context}"
+
+
+@lru_cache(maxsize=256)
+def canonical_instructions(instructions: str) -> Tuple[str, Optional[str]]:
+    """Returns (normalized static instructions, per-request context or None)."""
+    static, marker, context = instructions.partition(REQUEST_CONTEXT_MARKER)
+    static = _TRAILING_SPACE.sub("", textwrap.dedent(static)).strip()
+    return static, (context.strip() if marker else None)
+
+
+def _with_context(input: Any, context: str) -> List[Any]:
+    items = [{"role": "user", "content": input}] if isinstance(input, str) else list(input)
+    items.append({"role": "developer", "content": context})
+    return items
+
+
+def _cached_tokens(usage: Any) -> int:
+    details = getattr(usage, "input_tokens_details", None)
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+def record_usage(agent_key: str, input_tokens: int, cached_tokens: int, duration: float) -> None:
+    cache = "hit" if cached_tokens else "miss"
+    prompt_input_tokens.inc(agent_key, amount=input_tokens)
+    prompt_cached_tokens.inc(agent_key, amount=cached_tokens)
+    prompt_cache_calls.inc(agent_key, cache)
+    prompt_call_duration.observe(duration, agent_key, cache)
+
+
+class StablePromptModel(Model):
+    """Gives an agent's model calls a canonical, cacheable prompt prefix."""
+
+    def __init__(self, model: Model, agent_key: str, cache_key_prefix: Optional[str] = None):
+        self.model = model
+        self.agent_key = agent_key
+        prefix = os.getenv("PROMPT_CACHE_KEY_PREFIX", "agents-") if cache_key_prefix is None else cache_key_prefix
+        self.cache_key = f"{prefix}{agent_key}" if prefix else None
+
+    def _layout(self, system_instructions, input, model_settings, tools, handoffs) -> tuple:
+        context = None
+        if system_instructions:
+            system_instructions, context = canonical_instructions(system_instructions)
+        if context:
+            input = _with_context(input, context)
+        tools = sorted(tools, key=lambda tool: getattr(tool, "name", ""))
+        handoffs = sorted(handoffs, key=lambda handoff: handoff.tool_name)
+        if self.cache_key and "prompt_cache_key" not in (model_settings.extra_body or {}):
+            model_settings = replace(
+                model_settings, extra_body={**(model_settings.extra_body or {}), "prompt_cache_key": self.cache_key}
+            )
+        return system_instructions, input, model_settings, tools, handoffs
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id, prompt=None):
+        system_instructions, input, model_settings, tools, handoffs = self._layout(
+            system_instructions, input, model_settings, tools, handoffs
+        )
+        start = time.perf_counter()
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+        record_usage(
+            self.agent_key, response.usage.input_tokens, _cached_tokens(response.usage), time.perf_counter() - start
+        )
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id, prompt=None) -> AsyncIterator[Any]:
+        system_instructions, input, model_settings, tools, handoffs = self._layout(
+            system_instructions, input, model_settings, tools, handoffs
+        )
+        start = time.perf_counter()
+        async for event in self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        ):
+            if getattr(event, "type", None) == "response.completed" and event.response.usage:
+                usage = event.response.usage
+                record_usage(self.agent_key, usage.input_tokens, _cached_tokens(usage), time.perf_counter() - start)
+            yield event
+
+
+def prompt_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Input tokens, cached tokens and hit rates per agent key since start."""
+    input_tokens = prompt_input_tokens._merged()
+    cached_tokens = prompt_cached_tokens._merged()
+    calls = prompt_cache_calls._merged()
+    stats = {}
+    for (agent,), total in sorted(input_tokens.items()):
+        cached = cached_tokens.get((agent,), 0)
+        hits, misses = calls.get((agent, "hit"), 0), calls.get((agent, "miss"), 0)
+        stats[agent] = {
+            "calls": hits + misses,
+            "cache_hit_calls": hits,
+            "input_tokens": total,
+            "cached_tokens": cached,
+            "cached_token_ratio": round(cached / total, 4) if total else 0.0,
+        }
+    return stats
+
+
+def prompt_layout_enabled() -> bool:
+    return os.getenv("PROMPT_CACHE_LAYOUT_ENABLED", "true").lower() == "true"
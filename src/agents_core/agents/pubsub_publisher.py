@@ -0,0 +1,307 @@
+"""
+Shared Pub/Sub publisher for agent lifecycle events.
+
+One long-lived publisher is created per process and reused by all hooks:
+- Messages are published without waiting for the broker (fire-and-forget)
+- The client batches messages by count, size and latency
+- The number of in-flight messages is bounded; when the broker falls behind,
+  new messages are dropped or spilled to a local JSON lines file and counted.
+  Spilled messages go through a bounded queue to a writer thread that appends
+  them in batches (as the event log does), so the event loop never writes the
+  file; when that queue is full too, messages are dropped
+
+Configuration (environment variables):
+- PUBSUB_PROJECT_ID / PUBSUB_TOPIC_ID: target topic ("disabled" turns publishing off)
+- PUBSUB_BATCH_MAX_MESSAGES, PUBSUB_BATCH_MAX_BYTES, PUBSUB_BATCH_MAX_LATENCY: batching
+- PUBSUB_MAX_PENDING: maximum number of in-flight messages
+- PUBSUB_OVERFLOW: "drop" or "spill"; PUBSUB_SPILL_PATH: file used for spilling
+- PUBSUB_SPILL_QUEUE_SIZE: spilled messages waiting for the writer (default 10000)
+
+Publish and spill failures are reported as `pubsub_error` events of the hook
+event log (see event_log.py), not printed.
+
+PUBSUB_EMULATOR_HOST is honoured by the Google client, so the publisher can be
+exercised against the local emulator. Any object with `topic_path` and `publish`
+methods can be passed as `client` (or installed with `set_publisher`) to use a fake.
+
+The Google client library is imported only when a real client is created, so
+processes with Pub/Sub disabled never load it.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .event_log import WARNING, event_log
+
+SPILL_BATCH_SIZE = 1000
+
+_STOP = object()
+
+
+class PubSubPublisher:
+    """
+    Non-blocking, batching wrapper around a Pub/Sub publisher client.
+
+    Counters are available in `stats`: published, failed, dropped and spilled.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        topic_id: str,
+        client: Any = None,
+        max_messages: int = 100,
+        max_bytes: int = 1_000_000,
+        max_latency: float = 0.05,
+        max_pending: int = 1000,
+        overflow: str = "drop",
+        spill_path: str = "src/database/pubsub_spill.jsonl",
+        spill_queue_size: int = 10000,
+    ):
+        """
+        Args:
+            project_id: GCP project id
+            topic_id: Pub/Sub topic id
+            client: Publisher client; a batching PublisherClient is created if omitted
+            max_messages: Maximum number of messages in one batch
+            max_bytes: Maximum size of one batch in bytes
+            max_latency: Maximum time in seconds a message waits for its batch
+            max_pending: Maximum number of messages not yet confirmed by the broker
+            overflow: What to do when max_pending is reached: 'drop' or 'spill'
+            spill_path: JSON lines file for spilled messages
+            spill_queue_size: Spilled messages waiting for the writer thread before new ones are dropped
+        """
+        if overflow not in ("drop", "spill"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        if client is None:
+            # Heavy import, deferred until Pub/Sub is actually enabled
+            from google.cloud import pubsub_v1
+
+            client = pubsub_v1.PublisherClient(
+                batch_settings=pubsub_v1.types.BatchSettings(
+                    max_bytes=max_bytes,
+                    max_latency=max_latency,
+                    max_messages=max_messages,
+                )
+            )
+
+        self._client = client
+        self._topic_path = client.topic_path(project_id, topic_id)
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.spill_path = spill_path
+
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self.stats: Dict[str, int] = {"published": 0, "failed": 0, "dropped": 0, "spilled": 0}
+        self._spill_queue: "queue.Queue[Any]" = queue.Queue(maxsize=spill_queue_size)
+        self._spill_thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of messages sent to the client but not yet confirmed."""
+        return self._pending
+
+    def publish(self, data: Dict[str, Any], **attributes: str) -> bool:
+        """
+        Queues a message for publishing without waiting for the broker.
+
+        Args:
+            data: Message payload, serialized as JSON
+            **attributes: Pub/Sub message attributes
+
+        Returns:
+            True if the message was handed to the client, False if it was dropped or spilled
+        """
+        payload = json.dumps(data).encode("utf-8")
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                overflowed = True
+            else:
+                overflowed = False
+                self._pending += 1
+
+        if overflowed:
+            self._handle_overflow(data, attributes)
+            return False
+
+        try:
+            future = self._client.publish(self._topic_path, payload, **attributes)
+        except Exception as e:
+            self._finish(ok=False)
+            event_log.log("pubsub_error", WARNING, attributes.get("tenant", "default"),
+                          operation="publish", error=str(e))
+            return False
+
+        tenant = attributes.get("tenant", "default")
+        future.add_done_callback(lambda done: self._on_done(done, tenant))
+        return True
+
+    def _on_done(self, future, tenant: str = "default") -> None:
+        """Publish future callback, runs on the client's background thread."""
+        try:
+            future.result()
+        except Exception as e:
+            event_log.log("pubsub_error", WARNING, tenant, operation="publish", error=str(e))
+            self._finish(ok=False)
+        else:
+            self._finish(ok=True)
+
+    def _finish(self, ok: bool) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.stats["published" if ok else "failed"] += 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _handle_overflow(self, data: Dict[str, Any], attributes: Dict[str, str]) -> None:
+        if self.overflow == "spill":
+            self._ensure_spill_writer()
+            try:
+                self._spill_queue.put_nowait((data, attributes))
+                return
+            except queue.Full:
+                pass
+
+        with self._lock:
+            self.stats["dropped"] += 1
+
+    # ===============================
+    # SPILL WRITER THREAD
+    # ===============================
+
+    def _ensure_spill_writer(self) -> None:
+        if self._spill_thread is None:
+            with self._lock:
+                if self._spill_thread is None:
+                    self._spill_thread = threading.Thread(
+                        target=self._spill_loop, name="pubsub-spill-writer", daemon=True
+                    )
+                    self._spill_thread.start()
+
+    def _spill_loop(self) -> None:
+        while True:
+            batch: List[Any] = [self._spill_queue.get()]
+            while len(batch) < SPILL_BATCH_SIZE:
+                try:
+                    batch.append(self._spill_queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not _STOP]
+            if records:
+                self._write_spill(records)
+            for _ in batch:
+                self._spill_queue.task_done()
+            if len(records) < len(batch):
+                return
+
+    def _write_spill(self, records: List[tuple]) -> None:
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps({"data": data, "attributes": attributes}) + "\n"
+                                for data, attributes in records))
+            outcome = "spilled"
+        except OSError as e:
+            event_log.log("pubsub_error", WARNING, records[0][1].get("tenant", "default"),
+                          operation="spill", path=self.spill_path, error=str(e), messages=len(records))
+            outcome = "dropped"
+        with self._lock:
+            self.stats[outcome] += len(records)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until all in-flight messages are confirmed and spilled messages are written.
+
+        Returns:
+            True if nothing is pending anymore, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            if not self._idle.wait_for(lambda: self._pending == 0, timeout=timeout):
+                return False
+        while self._spill_queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """Publishes outstanding batches, writes spilled messages and stops the client."""
+        stop = getattr(self._client, "stop", None)
+        if stop is not None:
+            stop()
+        self.flush(timeout=timeout)
+        with self._lock:
+            thread, self._spill_thread = self._spill_thread, None
+        if thread is not None:
+            self._spill_queue.put(_STOP)
+            thread.join(timeout)
+
+
+_publisher: Optional[PubSubPublisher] = None
+_publisher_lock = threading.Lock()
+_publisher_initialized = False
+
+
+def _create_publisher_from_env() -> Optional[PubSubPublisher]:
+    project_id = os.getenv("PUBSUB_PROJECT_ID")
+    topic_id = os.getenv("PUBSUB_TOPIC_ID")
+
+    if not project_id or project_id.lower() == "disabled" or not topic_id:
+        print("🔇 PubSub disabled (set PUBSUB_PROJECT_ID and PUBSUB_TOPIC_ID to enable)")
+        return None
+
+    try:
+        return PubSubPublisher(
+            project_id,
+            topic_id,
+            max_messages=int(os.getenv("PUBSUB_BATCH_MAX_MESSAGES", "100")),
+            max_bytes=int(os.getenv("PUBSUB_BATCH_MAX_BYTES", "1000000")),
+            max_latency=float(os.getenv("PUBSUB_BATCH_MAX_LATENCY", "0.05")),
+            max_pending=int(os.getenv("PUBSUB_MAX_PENDING", "1000")),
+            overflow=os.getenv("PUBSUB_OVERFLOW", "drop"),
+            spill_path=os.getenv("PUBSUB_SPILL_PATH", "src/database/pubsub_spill.jsonl"),
+            spill_queue_size=int(os.getenv("PUBSUB_SPILL_QUEUE_SIZE", "10000")),
+        )
+    except Exception as e:
+        print(f"⚠️ Error creating PubSub publisher: {e}")
+        print(f"   Using project: {project_id}, topic: {topic_id}")
+        print(f"   To disable PubSub set PUBSUB_PROJECT_ID=disabled")
+        return None
+
+
+def get_publisher() -> Optional[PubSubPublisher]:
+    """Returns the process-wide publisher, creating it on first use. None if PubSub is disabled."""
+    global _publisher, _publisher_initialized
+    if not _publisher_initialized:
+        with _publisher_lock:
+            if not _publisher_initialized:
+                _publisher = _create_publisher_from_env()
+                _publisher_initialized = True
+    return _publisher
+
+
+def set_publisher(publisher: Optional[PubSubPublisher]) -> None:
+    """Installs a publisher explicitly (e.g. one wrapping a fake client)."""
+    global _publisher, _publisher_initialized
+    with _publisher_lock:
+        _publisher = publisher
+        _publisher_initialized = True
+
+
+def shutdown_publisher() -> None:
+    """Flushes and stops the process-wide publisher if it was created."""
+    global _publisher, _publisher_initialized
+    with _publisher_lock:
+        publisher = _publisher
+        _publisher = None
+        _publisher_initialized = False
+    if publisher is not None:
+        publisher.shutdown()
@@ -0,0 +1,92 @@
+"""
+Agent registry: one place to get agents, built on first use.
+
+Agent modules are imported (and their agents built) only when an agent is
+first requested, so importing the API does not pay for the agent graph.
+`warmup()` builds agents eagerly; the application calls it on startup unless
+AGENT_WARMUP=false (see src/main.py).
+
+Model configuration is read once per process by model_config.py.
+
+Usage:
+    from agents_core.agents.registry import agent_registry
+
+    agent = agent_registry.get("route")
+    ceo = agent_registry.route_target("approval_request")
+"""
+
+import importlib
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from agents import Agent
+
+# Agent key -> (module, attribute); modules are imported lazily
+AGENT_MODULES = {
+    "route": ("agents_core.agents.route_agent", "route_agent"),
+    "ceo": ("agents_core.agents.ceo_agent", "ceo_agent"),
+    "hr": ("agents_core.agents.hr_agent", "hr_agent"),
+    "payroll": ("agents_core.agents.payroll_agent", "payroll_agent"),
+    "office_culture": ("agents_core.agents.office_culture", "office_culture_agent"),
+    "guardrail": ("agents_core.agents.guardrail_agent", "guardrail_agent"),
+}
+
+# Routing path -> agent key (targets of Route Agent handoffs and of the pre-router fast path)
+ROUTE_TARGETS = {
+    "office_culture": "office_culture",
+    "approval_request": "ceo",
+}
+
+
+class AgentRegistry:
+    """Lazily built, process-wide agents."""
+
+    def __init__(self, modules: Optional[Dict[str, tuple]] = None):
+        self._modules = modules or AGENT_MODULES
+        self._agents: Dict[str, Agent] = {}
+        self._lock = threading.Lock()
+        self.load_times_ms: Dict[str, float] = {}
+
+    def get(self, key: str) -> Agent:
+        """Returns the agent, importing its module on first use."""
+        agent = self._agents.get(key)
+        if agent is not None:
+            return agent
+        if key not in self._modules:
+            raise KeyError(f"Unknown agent '{key}'")
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is None:
+                module_name, attribute = self._modules[key]
+                start = time.perf_counter()
+                agent = getattr(importlib.import_module(module_name), attribute)
+                self.load_times_ms[key] = (time.perf_counter() - start) * 1000
+                self._agents[key] = agent
+        return agent
+
+    def route_target(self, label: str) -> Agent:
+        """Agent serving a routing path ('office_culture' or 'approval_request')."""
+        return self.get(ROUTE_TARGETS[label])
+
+    def route_label(self, agent_name: str) -> Optional[str]:
+        """Routing path served by an agent, by agent name (None if it is not a route target)."""
+        for label in ROUTE_TARGETS:
+            if self.route_target(label).name == agent_name:
+                return label
+        return None
+
+    def warmup(self, keys: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Builds agents eagerly. Returns load time in milliseconds per agent built by this call."""
+        loaded = {}
+        for key in keys or self._modules:
+            if key not in self._agents:
+                self.get(key)
+                loaded[key] = self.load_times_ms[key]
+        return loaded
+
+    def loaded(self) -> list:
+        return list(self._agents)
+
+
+agent_registry = AgentRegistry()
@@ -0,0 +1,208 @@
+"""
+Deduplication of chat requests: single-flight coalescing and idempotency keys.
+
+- `SingleFlight`: concurrent calls with the same key share one execution. The
+  first caller starts the work as a separate task and every caller (including
+  the first) awaits it, so one caller disconnecting does not cancel the others.
+- `IdempotencyCache`: completed responses stored by `Idempotency-Key` for a TTL,
+  so late retries get the stored answer instead of a new model run. A key reused
+  with a different request is rejected, also while the first request is still
+  running: the fingerprint is recorded when the key is first seen.
+
+Both are per process (per worker), keyed by tenant.
+
+Configuration (environment variables):
+- CHAT_SINGLE_FLIGHT_ENABLED: "true"/"false" (default true)
+- IDEMPOTENCY_TTL_SECONDS: how long completed responses are kept (default 600)
+- IDEMPOTENCY_MAX_ENTRIES: maximum number of stored responses (default 10000)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .metrics import registry
+
+coalesced_requests = registry.counter(
+    "chat_coalesced_requests_total", "Requests that awaited an identical in-flight request", ("tenant",)
+)
+idempotency_replays = registry.counter(
+    "chat_idempotency_replays_total", "Requests answered from the idempotency cache", ("tenant",)
+)
+
+
+class IdempotencyConflict(Exception):
+    """The idempotency key was already used for a different request."""
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Stable hash of the request fields that define "the same request"."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        # (event loop, key) -> running task
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        return cls(enabled=os.getenv("CHAT_SINGLE_FLIGHT_ENABLED", "true").lower() == "true")
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Runs `func` once for all concurrent callers with the same key.
+
+        Returns:
+            (result, shared): shared is True if the caller joined a call already in flight
+        """
+        if not self.enabled:
+            return await func(), False
+
+        call_key = (id(asyncio.get_running_loop()), key)
+        task = self._calls.get(call_key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[call_key] = task
+            task.add_done_callback(lambda _: self._calls.pop(call_key, None))
+        # shield: a cancelled caller must not cancel the shared execution
+        return await asyncio.shield(task), shared
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class IdempotencyCache:
+    """TTL/LRU store of completed responses by idempotency key."""
+
+    def __init__(self, ttl_seconds: float = 600, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (expires at, request fingerprint, response)
+        self._entries: "OrderedDict[Hashable, Tuple[float, str, Any]]" = OrderedDict()
+        # key -> [request fingerprint, callers currently running it]
+        self._in_flight: Dict[Hashable, list] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyCache":
+        return cls(
+            ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600")),
+            max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+        )
+
+    def get(self, key: Hashable, fingerprint: str) -> Optional[Any]:
+        """
+        Returns the stored response, or None if there is none.
+
+        Raises:
+            IdempotencyConflict: the key was stored for a different request
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, stored_fingerprint, response = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyConflict(f"Idempotency key {key[-1]!r} was used for a different request")
+            self._entries.move_to_end(key)
+            return response
+
+    def acquire(self, key: Hashable, fingerprint: str) -> None:
+        """
+        Records that a request with this key is running; release() must follow.
+
+        Raises:
+            IdempotencyConflict: the key is in flight for a different request
+        """
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is None:
+                self._in_flight[key] = [fingerprint, 1]
+            elif entry[0] != fingerprint:
+                raise IdempotencyConflict(f"Idempotency key {key[-1]!r} is in use by a different request")
+            else:
+                entry[1] += 1
+
+    def release(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._in_flight[key]
+
+    def put(self, key: Hashable, fingerprint: str, response: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, fingerprint, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+single_flight = SingleFlight.from_env()
+idempotency_cache = IdempotencyCache.from_env()
+
+
+async def run_deduplicated(
+    tenant_id: str,
+    fingerprint: str,
+    func: Callable[[], Awaitable[Any]],
+    idempotency_key: Optional[str] = None,
+) -> Tuple[Any, bool]:
+    """
+    Runs a request at most once per identical in-flight request and per idempotency key.
+
+    Args:
+        tenant_id: Tenant (keys are scoped by tenant)
+        fingerprint: request_fingerprint() of the request
+        func: The actual work (e.g. one Runner.run)
+        idempotency_key: Value of the Idempotency-Key header, if any
+
+    Returns:
+        (response, replayed): replayed is True if the response came from the idempotency cache
+
+    Raises:
+        IdempotencyConflict: the key was already used for a different request
+    """
+    if idempotency_key:
+        cache_key = (tenant_id, idempotency_key)
+        cached = idempotency_cache.get(cache_key, fingerprint)
+        if cached is not None:
+            idempotency_replays.inc(tenant_id)
+            return cached, True
+        flight_key = ("idempotency", cache_key, fingerprint)
+
+        async def work():
+            # Stored inside the shared task, so the answer is kept even if the first
+            # caller disconnects. Failed requests are not stored and can be retried.
+            response = await func()
+            idempotency_cache.put(cache_key, fingerprint, response)
+            return response
+
+        idempotency_cache.acquire(cache_key, fingerprint)
+        try:
+            response, shared = await single_flight.do(flight_key, work)
+        finally:
+            idempotency_cache.release(cache_key)
+    else:
+        response, shared = await single_flight.do(("request", tenant_id, fingerprint), func)
+    if shared:
+        coalesced_requests.inc(tenant_id)
+    return response, False
@@ -0,0 +1,326 @@
+"""
+Deadlines, retries, hedging and a circuit breaker around model calls.
+
+`ResilientModel` wraps any SDK `Model` (OpenAI or the mock model) and is what
+`get_agent_model()` hands to every agent, including the agents behind the
+`hr_consultation` / `payroll_consultation` tools. For one model call it:
+
+- enforces the agent's deadline (all attempts together), raising ModelTimeout;
+- retries transient failures (connection errors, 429, 5xx, timeouts) with
+  exponential backoff and full jitter while the deadline allows;
+- optionally hedges: if the first request has not answered after the agent's
+  recent p95 latency, a second identical request is sent and the first answer
+  wins (the other is cancelled). Only non-streaming calls are hedged;
+- goes through a circuit breaker shared by all agents of the provider: after
+  MODEL_BREAKER_FAILURES consecutive failures calls fail fast with CircuitOpen
+  for MODEL_BREAKER_RESET_SECONDS, then one probe call decides whether it closes.
+
+Streaming calls get the breaker, the deadline and retries up to the first event;
+once events have been passed to the runner they cannot be replayed.
+
+Configuration (environment variables; <AGENT> is the agent key in upper case:
+ROUTE, CEO, HR, PAYROLL, OFFICE_CULTURE):
+- MODEL_RESILIENCE_ENABLED: "true"/"false" (default true)
+- MODEL_TIMEOUT_SECONDS, MODEL_TIMEOUT_SECONDS_<AGENT>: deadline per model call (default 60)
+- MODEL_MAX_ATTEMPTS: attempts per call, including the first (default 3)
+- MODEL_BACKOFF_SECONDS / MODEL_BACKOFF_MAX_SECONDS: backoff base and cap (default 0.25 / 4)
+- MODEL_HEDGE_AGENTS: comma separated agent keys to hedge, e.g. "route,ceo" (default none)
+- MODEL_HEDGE_MIN_DELAY_SECONDS: lower bound of the hedge delay (default 0.05)
+- MODEL_BREAKER_FAILURES: consecutive failures that open the breaker (default 5, 0 = off)
+- MODEL_BREAKER_RESET_SECONDS: how long the breaker stays open (default 30)
+
+Metrics (see agents/metrics.py):
+- model_call_duration_seconds{agent}: successful calls, retries and hedges included
+- model_call_failures_total{agent,reason}: reason is timeout, circuit_open or error
+- model_retries_total{agent}
+- model_hedges_total{agent,outcome}: outcome is fired or won (the hedge answered first)
+- model_breaker_transitions_total{state}: state is open, half_open or closed
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from agents.models.interface import Model
+
+from .metrics import DURATION_BUCKETS, registry
+
+T = TypeVar("T")
+
+model_call_duration = registry.histogram(
+    "model_call_duration_seconds", "Model call duration including retries and hedges", ("agent",), DURATION_BUCKETS
+)
+model_call_failures = registry.counter(
+    "model_call_failures_total", "Model calls that failed after retries", ("agent", "reason")
+)
+model_retries = registry.counter("model_retries_total", "Model call retries", ("agent",))
+model_hedges = registry.counter("model_hedges_total", "Hedged model requests", ("agent", "outcome"))
+model_breaker_transitions = registry.counter(
+    "model_breaker_transitions_total", "Circuit breaker state changes", ("state",)
+)
+
+# Latency samples per agent for the hedge delay, and how many are needed before hedging starts
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+
+class ModelUnavailable(Exception):
+    """The model could not answer in time or the provider is failing."""
+
+
+class ModelTimeout(ModelUnavailable):
+    """The agent's model deadline passed."""
+
+
+class CircuitOpen(ModelUnavailable):
+    """The circuit breaker is open; `retry_after` is the time until the next probe."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Connection errors, timeouts, 408/409/429 and 5xx responses are worth retrying."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, TimeoutError)):
+        return True
+    try:
+        import openai
+    except ImportError:  # pragma: no cover - openai comes with the agents SDK
+        return False
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(error, openai.APIStatusError) and (status in (408, 409, 429) or status >= 500)
+
+
+@dataclass(frozen=True)
+class ModelPolicy:
+    timeout_seconds: float = 60
+    max_attempts: int = 3
+    backoff_seconds: float = 0.25
+    backoff_max_seconds: float = 4
+    hedge: bool = False
+    hedge_min_delay_seconds: float = 0.05
+
+    @classmethod
+    def from_env(cls, agent_key: str) -> "ModelPolicy":
+        hedge_agents = {a.strip().lower() for a in os.getenv("MODEL_HEDGE_AGENTS", "").split(",") if a.strip()}
+        timeout = os.getenv(f"MODEL_TIMEOUT_SECONDS_{agent_key.upper()}") or os.getenv("MODEL_TIMEOUT_SECONDS", "60")
+        return cls(
+            timeout_seconds=float(timeout),
+            max_attempts=max(1, int(os.getenv("MODEL_MAX_ATTEMPTS", "3"))),
+            backoff_seconds=float(os.getenv("MODEL_BACKOFF_SECONDS", "0.25")),
+            backoff_max_seconds=float(os.getenv("MODEL_BACKOFF_MAX_SECONDS", "4")),
+            hedge=agent_key.lower() in hedge_agents,
+            hedge_min_delay_seconds=float(os.getenv("MODEL_HEDGE_MIN_DELAY_SECONDS", "0.05")),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed or open."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        return cls(
+            failure_threshold=int(os.getenv("MODEL_BREAKER_FAILURES", "5")),
+            reset_seconds=float(os.getenv("MODEL_BREAKER_RESET_SECONDS", "30")),
+        )
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            model_breaker_transitions.inc(state)
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CircuitOpen: the provider is considered down, or a probe is already in flight
+        """
+        if self.failure_threshold <= 0 or self.state == "closed":
+            return
+        remaining = self.opened_at + self.reset_seconds - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self._transition("half_open")
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpen("Model provider is unavailable (circuit open)", retry_after=max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self._transition("closed")
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or (self.failure_threshold > 0 and self.failures >= self.failure_threshold):
+            self._probing = False
+            self.opened_at = time.monotonic()
+            self._transition("open")
+
+    def record_cancelled(self) -> None:
+        """The caller gave up: a probe in flight neither proves nor disproves the provider."""
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+def _percentile(values: Deque[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _first_success(calls: Dict[str, Awaitable[T]]) -> tuple:
+    """Runs the calls concurrently; returns (name, result) of the first success, or raises the last error."""
+    tasks = {asyncio.ensure_future(call): name for name, call in calls.items()}
+    pending = set(tasks)
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return tasks[task], task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class ResilientModel(Model):
+    """Model wrapper applying deadlines, retries, hedging and the circuit breaker (see module docs)."""
+
+    def __init__(self, model: Model, agent_key: str, policy: Optional[ModelPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.model = model
+        self.agent_key = agent_key
+        self.policy = policy or ModelPolicy.from_env(agent_key)
+        self.breaker = breaker or get_circuit_breaker()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 of recent call latencies, or None while there are too few samples."""
+        if not self.policy.hedge or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(self.policy.hedge_min_delay_seconds, _percentile(self._latencies, 0.95))
+
+    async def _hedged(self, call: Callable[[], Awaitable[T]]) -> T:
+        delay = self.hedge_delay()
+        first = asyncio.ensure_future(call())
+        try:
+            if delay is None:
+                return await first
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                return first.result()
+            model_hedges.inc(self.agent_key, "fired")
+            winner, result = await _first_success({"primary": first, "hedge": call()})
+            if winner == "hedge":
+                model_hedges.inc(self.agent_key, "won")
+            return result
+        finally:
+            first.cancel()
+
+    async def _call(self, call: Callable[[], Awaitable[T]], hedge: bool) -> T:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.policy.timeout_seconds
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                self.breaker.before_call()
+            except CircuitOpen:
+                model_call_failures.inc(self.agent_key, "circuit_open")
+                raise
+            attempt_start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(
+                    self._hedged(call) if hedge else call(), max(deadline - loop.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                model_call_failures.inc(self.agent_key, "timeout")
+                raise ModelTimeout(
+                    f"Model for '{self.agent_key}' did not answer within {self.policy.timeout_seconds:g}s"
+                ) from None
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered (e.g. 400): it is up
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                backoff = self.policy.backoff(attempt)
+                if attempt >= self.policy.max_attempts or loop.time() + backoff >= deadline:
+                    model_call_failures.inc(self.agent_key, "error")
+                    raise
+                model_retries.inc(self.agent_key)
+                await asyncio.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            self._latencies.append(time.perf_counter() - attempt_start)
+            model_call_duration.observe(time.perf_counter() - start, self.agent_key)
+            return result
+
+    async def get_response(self, *args: Any, **kwargs: Any):
+        return await self._call(lambda: self.model.get_response(*args, **kwargs), hedge=self.policy.hedge)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        async def open_stream():
+            stream = self.model.stream_response(*args, **kwargs).__aiter__()
+            try:
+                return stream, await stream.__anext__()
+            except StopAsyncIteration:
+                return stream, None
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        # Deadline, retries and breaker cover the wait for the first event
+        stream, first = await self._call(open_stream, hedge=False)
+        if first is None:
+            return
+        try:
+            yield first
+            async for event in stream:
+                yield event
+        finally:
+            await stream.aclose()
+
+
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Circuit breaker shared by all agents of the process (they use one provider)."""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker.from_env()
+    return _breaker
+
+
+def resilience_enabled() -> bool:
+    return os.getenv("MODEL_RESILIENCE_ENABLED", "true").lower() == "true"
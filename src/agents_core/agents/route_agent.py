@@ -1,29 +1,19 @@
-from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, SQLiteSession, set_default_openai_key
+from agents import Agent, InputGuardrail, GuardrailFunctionOutput, Runner, SQLiteSession
 from agents.exceptions import InputGuardrailTripwireTriggered
 from pydantic import BaseModel
 import asyncio
-from dotenv import load_dotenv
 import os
-import sys
-from pathlib import Path
-
-# Add src directory to Python path for correct imports
-current_file = Path(__file__).resolve()
-src_dir = current_file.parent.parent.parent
-if str(src_dir) not in sys.path:
-    sys.path.insert(0, str(src_dir))
 
 from agents_core.agents.context.context_manager import ContextManager
+from agents_core.agents.context.tool_format import with_output_format
+from agents_core.agents.model_config import get_agent_model
 from agents_core.agents.context.functions import get_user_basic_info
 from agents_core.agents.office_culture import office_culture_agent
 from agents_core.agents.ceo_agent import ceo_agent
+from agents_core.agents.hooks import agent_hooks
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-model = os.getenv("MODEL_NAME")
-if not api_key:
-    raise EnvironmentError("OPENAI_API_KEY not found in environment variables. Check the .env file")
-set_default_openai_key(api_key)
+# OpenAI model (MODEL_NAME) or the offline mock model, depending on MODEL_PROVIDER
+model = get_agent_model("route")
 
 
 route_agent = Agent[ContextManager](
@@ -39,8 +29,9 @@ route_agent = Agent[ContextManager](
    Route to office_culture_agent for office culture topics.
    Route to ceo_agent for approval requests.
    """,
-    tools=[get_user_basic_info],
-    handoffs=[office_culture_agent, ceo_agent]   
+    tools=with_output_format([get_user_basic_info], "Route Agent"),
+    handoffs=[office_culture_agent, ceo_agent],
+    hooks=agent_hooks
 )
 
 async def main():
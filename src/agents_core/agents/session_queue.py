@@ -0,0 +1,117 @@
+"""
+Per-session execution queue: turns of one session run one at a time, in arrival order.
+
+Two concurrent requests for the same session would otherwise run the agents in
+parallel against the same history: both write to the session store at once and
+their turns interleave. `SessionQueue` is a keyed lock map. Each session gets a
+FIFO lock while it has running or waiting turns, and the entry is removed as
+soon as the session is idle, so the map only holds active sessions. Different
+sessions run fully in parallel. A session is identified by tenant and session id,
+like its history, so tenants that reuse a session id do not queue behind each other.
+
+When more than `max_waiting` turns already wait for a session, new turns are
+rejected with SessionQueueFull (the API answers 429).
+
+Configuration (environment variables):
+- SESSION_QUEUE_ENABLED: "true"/"false" (default true)
+- SESSION_QUEUE_MAX_WAITING: turns allowed to wait per session (default 8)
+
+Metrics (see agents/metrics.py):
+- session_queue_wait_seconds{tenant}: time a turn waited for earlier turns of its session
+- session_queue_rejections_total{tenant}: turns rejected because the queue was full
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, Tuple
+
+from .metrics import DURATION_BUCKETS, registry
+
+queue_wait_seconds = registry.histogram(
+    "session_queue_wait_seconds", "Time a turn waited for earlier turns of its session", ("tenant",), DURATION_BUCKETS
+)
+queue_rejections = registry.counter(
+    "session_queue_rejections_total", "Turns rejected because the session queue was full", ("tenant",)
+)
+
+
+class SessionQueueFull(Exception):
+    """Too many turns are already waiting for this session."""
+
+
+class _SessionSlot:
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()  # FIFO: waiters acquire in arrival order
+        self.pending = 0  # running + waiting turns
+
+
+class SessionQueue:
+    """Keyed lock map that serializes turns within a session."""
+
+    def __init__(self, max_waiting: int = 8, enabled: bool = True):
+        self.max_waiting = max_waiting
+        self.enabled = enabled
+        # (event loop, tenant, session) -> slot; removed when the session has no pending turns
+        self._slots: Dict[Tuple[int, str, Hashable], _SessionSlot] = {}
+
+    @classmethod
+    def from_env(cls) -> "SessionQueue":
+        return cls(
+            max_waiting=int(os.getenv("SESSION_QUEUE_MAX_WAITING", "8")),
+            enabled=os.getenv("SESSION_QUEUE_ENABLED", "true").lower() == "true",
+        )
+
+    def _key(self, session_id: str, tenant_id: str) -> Tuple[int, str, Hashable]:
+        return id(asyncio.get_running_loop()), tenant_id, session_id
+
+    def waiting(self, session_id: str, tenant_id: str = "default") -> int:
+        """Turns waiting for the session (not counting the running one)."""
+        slot = self._slots.get(self._key(session_id, tenant_id))
+        return max(slot.pending - 1, 0) if slot else 0
+
+    def is_full(self, session_id: str, tenant_id: str = "default") -> bool:
+        slot = self._slots.get(self._key(session_id, tenant_id))
+        return slot is not None and slot.pending > self.max_waiting
+
+    @asynccontextmanager
+    async def turn(self, session_id: str, tenant_id: str = "default") -> AsyncIterator[None]:
+        """
+        Waits for earlier turns of the session, then runs the body exclusively.
+
+        Raises:
+            SessionQueueFull: more than max_waiting turns already wait for the session
+        """
+        if not self.enabled:
+            yield
+            return
+
+        key = self._key(session_id, tenant_id)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _SessionSlot()
+        elif slot.pending > self.max_waiting:
+            queue_rejections.inc(tenant_id)
+            raise SessionQueueFull(
+                f"Too many requests for session '{session_id}': {slot.pending - 1} already waiting"
+            )
+
+        slot.pending += 1
+        try:
+            start = time.perf_counter()
+            async with slot.lock:
+                queue_wait_seconds.observe(time.perf_counter() - start, tenant_id)
+                yield
+        finally:
+            slot.pending -= 1
+            if slot.pending == 0:
+                del self._slots[key]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+session_queue = SessionQueue.from_env()
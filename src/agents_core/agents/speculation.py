@@ -0,0 +1,264 @@
+"""
+Speculative execution of the likely specialist alongside Route Agent.
+
+When the pre-router is not confident, a turn costs Route Agent's model call
+before the specialist even starts. Most sessions stay with the same specialist,
+so for opted-in tenants the predicted specialist (the session's last agent, or
+the pre-router's best guess above SPECULATIVE_MIN_CONFIDENCE) starts at the same
+time as Route Agent:
+- Both run streamed. Route Agent keeps the real session; the speculative run gets
+  the specialist's history as explicit input, no session, and its own context
+  whose Pub/Sub messages are buffered (see hooks.py), so it leaves no trace yet.
+- As soon as Route Agent hands off: if it chose the predicted specialist (hit),
+  the routed run is cancelled before its specialist gets far, the speculative
+  run is awaited, its turn is written to the session and its buffered Pub/Sub
+  messages are published. Otherwise (miss, or Route Agent answered itself) the
+  speculative run is cancelled and the routed run completes as usual.
+- Input guardrails (the model guardrail, see input_guardrail.py) run as a third
+  concurrent task and are awaited before either run is kept: a streamed run
+  cancelled on a hit would never report them.
+
+Latency saved by a hit is the part of the specialist's run that overlapped
+routing: min(routing time, speculative run time). Wasted tokens are the tokens of
+the speculative model calls completed before a miss was cancelled (a call in
+flight at cancellation is not counted).
+
+Only the synchronous turn path (POST /api/v1/chat/, batches and jobs) speculates;
+streaming turns route as before.
+
+Configuration (environment variables):
+- SPECULATIVE_ROUTING_TENANTS: tenants that opt in, comma separated, "*" for all (default: none)
+- SPECULATIVE_MIN_CONFIDENCE: minimum pre-router confidence of a prediction without history (default 0.6)
+- SPECULATIVE_MAX_SESSIONS: sessions whose last agent is remembered (LRU, default 100000)
+
+Metrics (see agents/metrics.py):
+- speculative_runs_total{tenant,source,outcome}: source is history or pre_router, outcome hit or miss
+- speculative_saved_seconds{tenant}: latency saved per hit
+- speculative_wasted_tokens_total{tenant}: tokens of cancelled speculative runs
+Per-tenant summary: `speculation_stats()` (GET /api/v1/chat/speculation).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+from agents import Agent, InputGuardrail, ItemHelpers, RunContextWrapper, Runner
+from agents.exceptions import InputGuardrailTripwireTriggered
+from agents.memory import Session
+from agents.result import RunResultStreaming
+
+from .metrics import registry
+from .pre_router import RouteDecision, pre_router
+
+speculative_runs = registry.counter(
+    "speculative_runs_total", "Speculative specialist runs by outcome", ("tenant", "source", "outcome")
+)
+speculative_saved = registry.histogram(
+    "speculative_saved_seconds", "Latency saved by a speculative hit", ("tenant",)
+)
+speculative_wasted_tokens = registry.counter(
+    "speculative_wasted_tokens_total", "Model tokens of cancelled speculative runs", ("tenant",)
+)
+
+HIT = "hit"
+MISS = "miss"
+
+
+@dataclass
+class Prediction:
+    """Routing path expected for a turn and where the expectation comes from."""
+    label: str
+    source: str
+
+
+@dataclass
+class SpeculativeOutcome:
+    final_output: Any
+    last_agent: Agent
+    hit: bool
+
+
+async def _drain(result: RunResultStreaming) -> None:
+    async for _ in result.stream_events():
+        pass
+
+
+async def _check_guardrails(guardrails: Sequence[InputGuardrail], agent: Agent, message: str, context: Any) -> None:
+    """Runs input guardrails concurrently; raises InputGuardrailTripwireTriggered like the Runner does."""
+    wrapper = RunContextWrapper(context=context)
+    results = await asyncio.gather(*(guardrail.run(agent, message, wrapper) for guardrail in guardrails))
+    for result in results:
+        if result.output.tripwire_triggered:
+            raise InputGuardrailTripwireTriggered(result)
+
+
+async def _cancel(result: RunResultStreaming, task: Optional[asyncio.Task] = None) -> None:
+    result.cancel()
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+class Speculator:
+    """Per-session last-agent memory plus the speculative run itself."""
+
+    def __init__(self, tenants: Optional[Set[str]] = None, min_confidence: float = 0.6, max_sessions: int = 100_000):
+        # None: every tenant
+        self.tenants = tenants if tenants is None else set(tenants)
+        self.min_confidence = min_confidence
+        self.max_sessions = max_sessions
+        self._last_labels: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Speculator":
+        tenants = os.getenv("SPECULATIVE_ROUTING_TENANTS", "").strip()
+        return cls(
+            tenants=None if tenants == "*" else {tenant.strip() for tenant in tenants.split(",") if tenant.strip()},
+            min_confidence=float(os.getenv("SPECULATIVE_MIN_CONFIDENCE", "0.6")),
+            max_sessions=int(os.getenv("SPECULATIVE_MAX_SESSIONS", "100000")),
+        )
+
+    def enabled_for(self, tenant: str) -> bool:
+        return self.tenants is None or tenant in self.tenants
+
+    def remember(self, tenant: str, session_id: str, label: Optional[str]) -> None:
+        """Records the routing path that served the session's last turn."""
+        if label is None:
+            return
+        key = (tenant, session_id)
+        with self._lock:
+            self._last_labels[key] = label
+            self._last_labels.move_to_end(key)
+            while len(self._last_labels) > self.max_sessions:
+                self._last_labels.popitem(last=False)
+
+    def predict(self, tenant: str, session_id: str, decision: RouteDecision) -> Optional[Prediction]:
+        """The session's last path, else the pre-router's guess if confident enough; None: do not speculate."""
+        if not self.enabled_for(tenant):
+            return None
+        with self._lock:
+            label = self._last_labels.get((tenant, session_id))
+        if label is not None:
+            return Prediction(label, "history")
+        if decision.label is not None and decision.confidence >= self.min_confidence:
+            return Prediction(decision.label, "pre_router")
+        return None
+
+    async def run(
+        self,
+        router: Agent,
+        specialist: Agent,
+        prediction: Prediction,
+        message: str,
+        session: Session,
+        specialist_session: Session,
+        context: Any,
+        speculative_context: Any,
+        input_guardrails: Sequence[InputGuardrail] = (),
+    ) -> SpeculativeOutcome:
+        """
+        Runs Route Agent and the predicted specialist concurrently; keeps one of them.
+
+        Args:
+            router: Route Agent (the starting agent without speculation)
+            specialist: Agent serving prediction.label
+            session: History session of the turn; only the kept run's turn is written to it
+            specialist_session: Session with the specialist's history policy (read only)
+            context: Context of the routed run
+            speculative_context: Separate context of the speculative run, with a `pubsub_buffer` list
+            input_guardrails: Checked concurrently with both runs, before either is kept
+        """
+        tenant = str(getattr(context, "tenant_id", "default"))
+        start = time.perf_counter()
+        history = await specialist_session.get_items()
+        speculative = Runner.run_streamed(
+            specialist, history + ItemHelpers.input_to_new_input_list(message), context=speculative_context
+        )
+        speculative_task = asyncio.create_task(_drain(speculative))
+        speculative_done: Dict[str, float] = {}
+        speculative_task.add_done_callback(lambda _: speculative_done.setdefault("at", time.perf_counter()))
+        guardrails_task = asyncio.create_task(_check_guardrails(input_guardrails, router, message, context))
+        routed = Runner.run_streamed(router, message, session=session, context=context)
+
+        try:
+            chosen = None
+            async for event in routed.stream_events():
+                if event.type == "agent_updated_stream_event" and event.new_agent is not router:
+                    chosen = event.new_agent
+                    break
+            decided = time.perf_counter()
+
+            if chosen is not None and chosen.name == specialist.name:
+                await _cancel(routed)
+                await speculative_task
+                await guardrails_task
+                await session.add_items(
+                    ItemHelpers.input_to_new_input_list(message)
+                    + [item.to_input_item() for item in speculative.new_items]
+                )
+                _publish_buffered(speculative_context)
+                speculative_runs.inc(tenant, prediction.source, HIT)
+                speculative_saved.observe(min(decided, speculative_done.get("at", decided)) - start, tenant)
+                return SpeculativeOutcome(speculative.final_output, speculative.last_agent, hit=True)
+
+            await _cancel(speculative, speculative_task)
+            speculative_runs.inc(tenant, prediction.source, MISS)
+            speculative_wasted_tokens.inc(tenant, amount=speculative.context_wrapper.usage.total_tokens)
+            await guardrails_task
+            if chosen is not None:
+                await _drain(routed)
+            return SpeculativeOutcome(routed.final_output, routed.last_agent, hit=False)
+        finally:
+            # Timeout, guardrail tripwire or client gone: stop whatever still runs
+            if not routed.is_complete:
+                routed.cancel()
+            if not speculative_task.done():
+                await _cancel(speculative, speculative_task)
+            if not guardrails_task.done():
+                guardrails_task.cancel()
+                await asyncio.gather(guardrails_task, return_exceptions=True)
+
+
+def _publish_buffered(context: Any) -> None:
+    """Publishes the Pub/Sub messages a kept speculative run buffered."""
+    from .pubsub_publisher import get_publisher
+
+    buffered, context.pubsub_buffer = context.pubsub_buffer or [], None
+    publisher = get_publisher()
+    if publisher is None:
+        return
+    for data, attributes in buffered:
+        publisher.publish(data, **attributes)
+
+
+def speculation_stats() -> Dict[str, Dict[str, float]]:
+    """Speculative runs, hit rate, latency saved and wasted tokens per tenant since start."""
+    runs: Dict[str, Dict[str, float]] = {}
+    for (tenant, source, outcome), count in speculative_runs._merged().items():
+        tenant_runs = runs.setdefault(tenant, {HIT: 0, MISS: 0})
+        tenant_runs[outcome] += count
+    saved = speculative_saved._merged()
+    wasted = speculative_wasted_tokens._merged()
+    stats = {}
+    for tenant, counts in sorted(runs.items()):
+        total = counts[HIT] + counts[MISS]
+        saved_seconds = saved[(tenant,)][-2] if (tenant,) in saved else 0.0
+        wasted_tokens = wasted.get((tenant,), 0)
+        stats[tenant] = {
+            "runs": total,
+            "hits": counts[HIT],
+            "hit_rate": round(counts[HIT] / total, 4) if total else 0.0,
+            "saved_seconds": round(saved_seconds, 4),
+            "mean_saved_ms_per_run": round(saved_seconds * 1000 / total, 2) if total else 0.0,
+            "wasted_tokens": wasted_tokens,
+            "wasted_tokens_per_run": round(wasted_tokens / total, 1) if total else 0.0,
+        }
+    return stats
+
+
+speculator = Speculator.from_env()
@@ -0,0 +1,398 @@
+"""
+Employee directory backing ContextManager.
+
+Employees and tenant configuration live in a local SQLite store indexed by
+(tenant_id, user_id), read through a memory-mapped connection. Hydrated
+records (UserContext + vacation dates + salary increase percentages) are kept
+in a bounded in-process LRU, so building a ContextManager is a cache lookup.
+On the event loop use `get_async` (ContextManager.load): an LRU miss then reads
+SQLite in a worker thread. Cache lookups never wait for a SQLite read.
+
+Users that are not in the directory get the default profile from
+context_config.py with their user_id, as before.
+
+Hydrated records are shared between requests and must be treated as read-only;
+use `upsert_employee` / `upsert_tenant_config` to change data. Both bump the
+record version and invalidate the LRU entry and the context tool cache.
+
+`salary_table` returns a tenant's (or department's) salaries and ratings as
+NumPy arrays for the vectorized payroll engine.
+
+Configuration (environment variables):
+- EMPLOYEE_DB_PATH: SQLite file (default src/database/employees.db, independent of the working directory)
+- EMPLOYEE_CACHE_SIZE: number of hydrated records kept in memory (default 10000)
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from agents_core.agents.context.context_config import (
+    user_context as default_user_context,
+    available_dates_for_vacation as default_vacation_dates,
+    available_salary_increase_percentages as default_salary_increase_percentages,
+)
+from agents_core.agents.context.context_manager import (
+    UserContext,
+    AvailableDatesForVacation,
+    AvailableSalaryIncreasePercentages,
+)
+from agents_core.agents.context.tool_cache import tool_cache
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent.parent / "database" / "employees.db"
+
+
+@dataclass(frozen=True)
+class EmployeeRecord:
+    """Hydrated employee data used to build a ContextManager (read-only)."""
+    tenant_id: str
+    user_id: str
+    user_context: UserContext
+    available_dates_for_vacation: AvailableDatesForVacation
+    available_salary_increase_percentages: AvailableSalaryIncreasePercentages
+    version: int
+
+
+class EmployeeDirectory:
+    """SQLite employee store with an LRU of hydrated records."""
+
+    def __init__(self, db_path: str, cache_size: int = 10000, mmap_size: int = 256 * 1024 * 1024):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            cache_size: Maximum number of hydrated records kept in memory
+            mmap_size: Bytes of the database file to memory-map for reads
+        """
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], EmployeeRecord]" = OrderedDict()
+        # Per-tenant objects shared by all records of the tenant
+        self._tenants: Dict[str, Tuple[AvailableDatesForVacation, AvailableSalaryIncreasePercentages, int]] = {}
+        # _lock guards the LRU, the tenant objects and stats; _db_lock the connection.
+        # Invalidations bump _generation, so a read that raced a write is not cached.
+        self._lock = threading.RLock()
+        self._db_lock = threading.Lock()
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "defaults": 0}
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS employees (
+                    tenant_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    first_name TEXT NOT NULL,
+                    last_name TEXT NOT NULL,
+                    position TEXT NOT NULL,
+                    current_salary NUMERIC NOT NULL,
+                    employee_rating INTEGER NOT NULL,
+                    vacation_dates TEXT,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    department TEXT,
+                    PRIMARY KEY (tenant_id, user_id)
+                ) WITHOUT ROWID
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(employees)")}
+            if "department" not in columns:
+                self._conn.execute("ALTER TABLE employees ADD COLUMN department TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_employees_department ON employees (tenant_id, department)"
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tenant_config (
+                    tenant_id TEXT PRIMARY KEY,
+                    vacation_dates TEXT,
+                    salary_increase_percentages TEXT,
+                    version INTEGER NOT NULL DEFAULT 1
+                ) WITHOUT ROWID
+                """
+            )
+
+    # ===============================
+    # READ PATH
+    # ===============================
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[EmployeeRecord]:
+        with self._lock:
+            record = self._cache.get(key)
+            if record is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+            return record
+
+    def get(self, tenant_id: str, user_id: Optional[str]) -> EmployeeRecord:
+        """Returns the hydrated record for a user, from the LRU if possible (a miss reads SQLite)."""
+        if not user_id:
+            user_id = default_user_context["user_id"]
+        key = (tenant_id, user_id)
+
+        record = self._cached(key)
+        if record is not None:
+            return record
+        with self._lock:
+            self.stats["misses"] += 1
+            generation = self._generation
+        record = self._load(tenant_id, user_id)
+        with self._lock:
+            if generation == self._generation:
+                self._cache[key] = record
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return record
+
+    async def get_async(self, tenant_id: str, user_id: Optional[str]) -> EmployeeRecord:
+        """Like `get`, but an LRU miss reads SQLite in a worker thread instead of on the event loop."""
+        record = self._cached((tenant_id, user_id or default_user_context["user_id"]))
+        if record is not None:
+            return record
+        return await asyncio.to_thread(self.get, tenant_id, user_id)
+
+    def _load_tenant(self, tenant_id: str) -> Tuple[AvailableDatesForVacation, AvailableSalaryIncreasePercentages, int]:
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            generation = self._generation
+        if tenant is None:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT vacation_dates, salary_increase_percentages, version FROM tenant_config WHERE tenant_id = ?",
+                    (tenant_id,),
+                ).fetchone()
+            dates, percentages, version = row or (None, None, 0)
+            tenant = (
+                AvailableDatesForVacation(
+                    dates=json.loads(dates) if dates else list(default_vacation_dates)
+                ),
+                AvailableSalaryIncreasePercentages(
+                    percentages=json.loads(percentages) if percentages else list(default_salary_increase_percentages)
+                ),
+                version,
+            )
+            with self._lock:
+                if generation == self._generation:
+                    tenant = self._tenants.setdefault(tenant_id, tenant)
+        return tenant
+
+    def _load(self, tenant_id: str, user_id: str) -> EmployeeRecord:
+        tenant_dates, percentages, tenant_version = self._load_tenant(tenant_id)
+
+        with self._db_lock:
+            row = self._conn.execute(
+                """
+                SELECT first_name, last_name, position, current_salary, employee_rating, vacation_dates, version
+                FROM employees WHERE tenant_id = ? AND user_id = ?
+                """,
+                (tenant_id, user_id),
+            ).fetchone()
+
+        if row is None:
+            with self._lock:
+                self.stats["defaults"] += 1
+            user_data = dict(default_user_context, user_id=user_id)
+            return EmployeeRecord(
+                tenant_id=tenant_id,
+                user_id=user_id,
+                user_context=UserContext(**user_data),
+                available_dates_for_vacation=tenant_dates,
+                available_salary_increase_percentages=percentages,
+                version=tenant_version,
+            )
+
+        first_name, last_name, position, salary, rating, vacation_dates, version = row
+        return EmployeeRecord(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            user_context=UserContext(
+                user_id=user_id,
+                first_name=first_name,
+                last_name=last_name,
+                position=position,
+                current_salary=salary,
+                employee_rating=rating,
+            ),
+            available_dates_for_vacation=(
+                AvailableDatesForVacation(dates=json.loads(vacation_dates)) if vacation_dates else tenant_dates
+            ),
+            available_salary_increase_percentages=percentages,
+            # Combined version changes whenever the employee or the tenant config changes
+            version=version * 1_000_000 + tenant_version,
+        )
+
+    def get_tenant_config(self, tenant_id: str) -> Tuple[AvailableDatesForVacation, AvailableSalaryIncreasePercentages, int]:
+        """Returns the tenant's shared vacation dates, salary increase percentages and config version."""
+        return self._load_tenant(tenant_id)
+
+    def salary_table(self, tenant_id: str, department: Optional[str] = None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Returns user ids, salaries and ratings of a tenant's employees (optionally one department)
+        as arrays for the vectorized payroll engine.
+        """
+        query = "SELECT user_id, current_salary, employee_rating FROM employees WHERE tenant_id = ?"
+        params: Tuple = (tenant_id,)
+        if department is not None:
+            query += " AND department = ?"
+            params += (department,)
+        with self._db_lock:
+            rows = self._conn.execute(query, params).fetchall()
+        user_ids = [row[0] for row in rows]
+        salaries = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        ratings = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        return user_ids, salaries, ratings
+
+    # ===============================
+    # WRITE PATH
+    # ===============================
+
+    def upsert_employee(
+        self,
+        tenant_id: str,
+        user_id: str,
+        first_name: str,
+        last_name: str,
+        position: str,
+        current_salary: float,
+        employee_rating: int,
+        vacation_dates: Optional[List[str]] = None,
+        department: Optional[str] = None,
+    ) -> None:
+        """Creates or updates an employee and invalidates cached data for them."""
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO employees (tenant_id, user_id, first_name, last_name, position,
+                                       current_salary, employee_rating, vacation_dates, department)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (tenant_id, user_id) DO UPDATE SET
+                    first_name = excluded.first_name,
+                    last_name = excluded.last_name,
+                    position = excluded.position,
+                    current_salary = excluded.current_salary,
+                    employee_rating = excluded.employee_rating,
+                    vacation_dates = excluded.vacation_dates,
+                    department = excluded.department,
+                    version = employees.version + 1
+                """,
+                (tenant_id, user_id, first_name, last_name, position, current_salary, employee_rating,
+                 json.dumps(vacation_dates) if vacation_dates is not None else None, department),
+            )
+        with self._lock:
+            self._generation += 1
+            self._cache.pop((tenant_id, user_id), None)
+        tool_cache.invalidate_user(tenant_id, user_id)
+
+    def upsert_tenant_config(
+        self,
+        tenant_id: str,
+        vacation_dates: Optional[List[str]] = None,
+        salary_increase_percentages: Optional[List[int]] = None,
+    ) -> None:
+        """Creates or updates tenant configuration and invalidates cached data for the tenant."""
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO tenant_config (tenant_id, vacation_dates, salary_increase_percentages)
+                VALUES (?, ?, ?)
+                ON CONFLICT (tenant_id) DO UPDATE SET
+                    vacation_dates = excluded.vacation_dates,
+                    salary_increase_percentages = excluded.salary_increase_percentages,
+                    version = tenant_config.version + 1
+                """,
+                (tenant_id,
+                 json.dumps(vacation_dates) if vacation_dates is not None else None,
+                 json.dumps(salary_increase_percentages) if salary_increase_percentages is not None else None),
+            )
+        with self._lock:
+            self._generation += 1
+            self._tenants.pop(tenant_id, None)
+            for key in [k for k in self._cache if k[0] == tenant_id]:
+                del self._cache[key]
+        tool_cache.invalidate_tenant(tenant_id)
+
+    def load_employees(self, employees: Iterable[dict]) -> int:
+        """
+        Bulk-loads employees (dicts with the `upsert_employee` fields) in one transaction.
+        Existing employees are updated and their version is bumped, like `upsert_employee`.
+
+        Returns:
+            Number of loaded employees
+        """
+        rows = (
+            (e["tenant_id"], e["user_id"], e["first_name"], e["last_name"], e["position"],
+             e["current_salary"], e["employee_rating"],
+             json.dumps(e["vacation_dates"]) if e.get("vacation_dates") is not None else None,
+             e.get("department"))
+            for e in employees
+        )
+        with self._db_lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """
+                INSERT INTO employees (tenant_id, user_id, first_name, last_name, position,
+                                       current_salary, employee_rating, vacation_dates, department)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (tenant_id, user_id) DO UPDATE SET
+                    first_name = excluded.first_name,
+                    last_name = excluded.last_name,
+                    position = excluded.position,
+                    current_salary = excluded.current_salary,
+                    employee_rating = excluded.employee_rating,
+                    vacation_dates = excluded.vacation_dates,
+                    department = excluded.department,
+                    version = employees.version + 1
+                """,
+                rows,
+            )
+            loaded = self._conn.total_changes - before
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+        tool_cache.clear()
+        return loaded
+
+    def close(self) -> None:
+        with self._lock, self._db_lock:
+            self._cache.clear()
+            self._tenants.clear()
+            self._conn.close()
+
+
+_directory: Optional[EmployeeDirectory] = None
+_directory_lock = threading.Lock()
+
+
+def get_employee_directory() -> EmployeeDirectory:
+    """Returns the process-wide employee directory, opening it on first use."""
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                _directory = EmployeeDirectory(
+                    os.getenv("EMPLOYEE_DB_PATH", str(DEFAULT_DB_PATH)),
+                    cache_size=int(os.getenv("EMPLOYEE_CACHE_SIZE", "10000")),
+                )
+    return _directory
+
+
+def set_employee_directory(directory: Optional[EmployeeDirectory]) -> None:
+    """Installs a different employee directory (closing the previous one)."""
+    global _directory
+    with _directory_lock:
+        previous, _directory = _directory, directory
+    if previous is not None and previous is not directory:
+        previous.close()
@@ -0,0 +1,215 @@
+"""
+Bounded conversation history with rolling summaries.
+
+`CompactingSession` sits between the session store and the runner. On every
+turn the model gets:
+- a rolling summary of older turns (one system message), and
+- the last turns verbatim: at most `max_turns`, and no more than
+  `token_budget` estimated tokens (the latest turn is always kept)
+
+Turns that fall out of the window are folded into the summary once, and the
+summary is stored next to the session (see SessionBackend.save_summary). The
+full history stays in the store; only the prompt is bounded. A turn starts at a
+user message, so tool calls and their outputs are never split.
+
+Configuration (environment variables):
+- HISTORY_COMPACTION_ENABLED: "true"/"false" (default true)
+- HISTORY_MAX_TURNS: turns kept verbatim (default 6)
+- HISTORY_TOKEN_BUDGET: token budget of the verbatim turns (default 4000)
+- HISTORY_TOKEN_BUDGETS: per-agent budgets as JSON, e.g. {"Route Agent": 1000, "CEO Agent": 6000}
+- HISTORY_SUMMARY_TOKENS: maximum size of the summary (default 800)
+
+Metrics (see agents/metrics.py):
+- history_prompt_tokens{agent}: estimated history tokens sent to the model per turn
+- history_turns{agent}: turns sent verbatim
+- history_compactions_total{agent}: compactions (turns folded into the summary)
+"""
+
+import json
+import os
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agents.memory.session import SessionABC
+
+from agents_core.agents.metrics import COUNT_BUCKETS, TOKEN_BUCKETS, registry
+from agents_core.storage.session_store import DEFAULT_TENANT, SessionBackend, StoredSession, get_session_backend
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+# summarizer(previous summary, items to fold, max tokens) -> new summary
+Summarizer = Callable[[str, List[dict], int], str]
+
+history_prompt_tokens = registry.histogram(
+    "history_prompt_tokens", "Estimated history tokens sent to the model per turn", ("agent",), TOKEN_BUCKETS
+)
+history_turns = registry.histogram(
+    "history_turns", "Conversation turns sent verbatim per turn", ("agent",), COUNT_BUCKETS
+)
+history_compactions = registry.counter(
+    "history_compactions_total", "Compactions of old turns into the rolling summary", ("agent",)
+)
+
+
+def estimate_tokens(value) -> int:
+    """Rough token estimate (4 characters per token of the JSON form)."""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    return len(text) // 4
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict) and part.get("text"))
+    return ""
+
+
+def _is_user_message(item: dict) -> bool:
+    return item.get("role") == "user" and item.get("type", "message") == "message"
+
+
+def extractive_summary(previous: str, items: List[dict], max_tokens: int, line_chars: int = 300) -> str:
+    """
+    Default summarizer: keeps user requests and assistant answers as short lines
+    (tool calls and outputs are dropped) and removes the oldest lines over `max_tokens`.
+    """
+    lines = previous.splitlines() if previous else []
+    for item in items:
+        if _is_user_message(item):
+            lines.append(f"- User: {_text_of(item.get('content'))[:line_chars]}")
+        elif item.get("role") == "assistant" and item.get("type", "message") == "message":
+            text = _text_of(item.get("content"))
+            if text:
+                lines.append(f"  Assistant: {text[:line_chars]}")
+
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class HistoryPolicy:
+    max_turns: int = 6
+    token_budget: int = 4000
+    summary_tokens: int = 800
+
+
+def _split_turns(rows: List[Tuple[int, dict]]) -> List[List[Tuple[int, dict]]]:
+    turns: List[List[Tuple[int, dict]]] = []
+    for row in rows:
+        if not turns or _is_user_message(row[1]):
+            turns.append([])
+        turns[-1].append(row)
+    return turns
+
+
+class CompactingSession(SessionABC):
+    """Session that returns a rolling summary plus the latest turns instead of the full history."""
+
+    def __init__(
+        self,
+        session_id: str,
+        backend: SessionBackend,
+        policy: HistoryPolicy,
+        summarizer: Summarizer = extractive_summary,
+        agent_name: str = "default",
+        tenant_id: str = DEFAULT_TENANT,
+    ):
+        self.session_id = session_id
+        self.backend = backend
+        self.tenant_id = tenant_id
+        self.policy = policy
+        self.summarizer = summarizer
+        self.agent_name = agent_name
+
+    def _window(self, turns: List[list]) -> int:
+        """Number of newest turns kept verbatim."""
+        kept, tokens = 0, 0
+        for turn in reversed(turns):
+            turn_tokens = sum(estimate_tokens(item) for _, item in turn)
+            if kept and (kept >= self.policy.max_turns or tokens + turn_tokens > self.policy.token_budget):
+                break
+            kept += 1
+            tokens += turn_tokens
+        return kept
+
+    async def get_items(self, limit: Optional[int] = None) -> List[dict]:
+        summary, _, rows = await self.backend.get_tail(self.session_id, tenant_id=self.tenant_id)
+        turns = _split_turns(rows)
+        kept = self._window(turns)
+
+        folded = turns[:len(turns) - kept]
+        if folded:
+            summary = self.summarizer(summary, [item for turn in folded for _, item in turn], self.policy.summary_tokens)
+            await self.backend.save_summary(
+                self.session_id, summary, folded[-1][-1][0], tenant_id=self.tenant_id
+            )
+            history_compactions.inc(self.agent_name)
+
+        items = [item for turn in turns[len(turns) - kept:] for _, item in turn]
+        if summary:
+            items.insert(0, {"role": "system", "content": f"{SUMMARY_PREFIX}\n{summary}"})
+
+        history_prompt_tokens.observe(sum(estimate_tokens(item) for item in items), self.agent_name)
+        history_turns.observe(kept, self.agent_name)
+        return items[-limit:] if limit else items
+
+    async def add_items(self, items: List[dict]) -> None:
+        await self.backend.add_items(self.session_id, items, tenant_id=self.tenant_id)
+
+    async def pop_item(self) -> Optional[dict]:
+        return await self.backend.pop_item(self.session_id, tenant_id=self.tenant_id)
+
+    async def clear_session(self) -> None:
+        await self.backend.clear_session(self.session_id, tenant_id=self.tenant_id)
+
+
+class HistoryManager:
+    """Builds sessions with the history policy of the agent that runs the turn."""
+
+    def __init__(
+        self,
+        default_policy: HistoryPolicy = HistoryPolicy(),
+        agent_policies: Optional[Dict[str, HistoryPolicy]] = None,
+        summarizer: Summarizer = extractive_summary,
+        enabled: bool = True,
+    ):
+        self.default_policy = default_policy
+        self.agent_policies = agent_policies or {}
+        self.summarizer = summarizer
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls) -> "HistoryManager":
+        default_policy = HistoryPolicy(
+            max_turns=int(os.getenv("HISTORY_MAX_TURNS", "6")),
+            token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "4000")),
+            summary_tokens=int(os.getenv("HISTORY_SUMMARY_TOKENS", "800")),
+        )
+        budgets = json.loads(os.getenv("HISTORY_TOKEN_BUDGETS", "{}"))
+        return cls(
+            default_policy=default_policy,
+            agent_policies={name: replace(default_policy, token_budget=int(budget)) for name, budget in budgets.items()},
+            enabled=os.getenv("HISTORY_COMPACTION_ENABLED", "true").lower() == "true",
+        )
+
+    def policy_for(self, agent_name: str) -> HistoryPolicy:
+        return self.agent_policies.get(agent_name, self.default_policy)
+
+    def session(self, session_id: str, agent_name: str, backend: Optional[SessionBackend] = None,
+                tenant_id: str = DEFAULT_TENANT) -> SessionABC:
+        backend = (backend or get_session_backend()).backend_for(tenant_id, session_id)
+        if not self.enabled:
+            return StoredSession(session_id, backend, tenant_id)
+        return CompactingSession(
+            session_id, backend, self.policy_for(agent_name), self.summarizer, agent_name, tenant_id
+        )
+
+
+history_manager = HistoryManager.from_env()
+
+
+def get_history_session(session_id: str, agent_name: str, tenant_id: str = "default") -> SessionABC:
+    """Returns a session for a turn started by `agent_name`, with that agent's history policy."""
+    return history_manager.session(session_id, agent_name, tenant_id=tenant_id)
@@ -0,0 +1,160 @@
+"""
+Retention of conversation history: archive idle sessions, keep shards compact.
+
+A background task (started by the application) periodically:
+- moves sessions idle for longer than SESSION_RETENTION_IDLE_DAYS out of the
+  session store into compressed, append-only archive files;
+- refreshes SQLite planner statistics (ANALYZE) of every shard and, every
+  SESSION_VACUUM_INTERVAL_SECONDS, rebuilds the files with VACUUM so space freed
+  by archived sessions is returned.
+
+Archive files are gzip JSON lines, one file per UTC day in SESSION_ARCHIVE_DIR
+(sessions-YYYYMMDD.jsonl.gz). Every batch is appended as its own gzip member and
+synced to disk before the sessions are deleted from the store, so files are only
+ever appended to and nothing is lost if the process dies in between (the batch
+is archived again next time). One line per session:
+{"tenant_id", "session_id", "updated_at", "archived_at", "summary", "items"}; read them back
+with `iter_archived()`.
+
+Configuration (environment variables):
+- SESSION_RETENTION_IDLE_DAYS: archive sessions idle for longer (default 0: never)
+- SESSION_ARCHIVE_DIR: archive directory (default src/database/archive)
+- SESSION_MAINTENANCE_INTERVAL_SECONDS: how often the job runs (default 3600, 0 = never)
+- SESSION_VACUUM_INTERVAL_SECONDS: how often shards are vacuumed (default 86400, 0 = never)
+
+Metrics (see agents/metrics.py):
+- history_archived_sessions_total: sessions moved to the archive
+- history_maintenance_seconds{operation}: duration of archive, analyze and vacuum runs
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from agents_core.agents.metrics import DURATION_BUCKETS, registry
+from agents_core.storage.session_store import SessionBackend, get_session_backend
+
+logger = logging.getLogger(__name__)
+
+archived_sessions = registry.counter("history_archived_sessions_total", "Sessions moved to the history archive")
+maintenance_seconds = registry.histogram(
+    "history_maintenance_seconds", "Duration of history maintenance runs", ("operation",), DURATION_BUCKETS
+)
+
+
+class SessionArchive:
+    """Append-only gzip JSON-lines files, one per UTC day."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        # Shards archive from their own writer threads
+        self._lock = threading.Lock()
+
+    def path_for(self, day: datetime) -> Path:
+        return self.directory / f"sessions-{day:%Y%m%d}.jsonl.gz"
+
+    def write(self, records: List[dict]) -> None:
+        """Appends session records and syncs them to disk."""
+        now = datetime.now(timezone.utc)
+        archived_at = now.isoformat()
+        data = "".join(
+            json.dumps({**record, "archived_at": archived_at}, ensure_ascii=False) + "\n" for record in records
+        ).encode()
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.path_for(now), "ab") as file:
+                with gzip.GzipFile(fileobj=file, mode="wb") as member:
+                    member.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+
+
+def iter_archived(directory: str) -> Iterator[dict]:
+    """Archived session records, oldest file first."""
+    for path in sorted(Path(directory).glob("sessions-*.jsonl.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class HistoryRetention:
+    """Periodic archive and compaction of the session store."""
+
+    def __init__(
+        self,
+        idle_seconds: float = 0,
+        archive_dir: str = "src/database/archive",
+        interval_seconds: float = 3600,
+        vacuum_interval_seconds: float = 86400,
+        backend: Callable[[], SessionBackend] = get_session_backend,
+    ):
+        self.idle_seconds = idle_seconds
+        self.archive = SessionArchive(archive_dir)
+        self.interval_seconds = interval_seconds
+        self.vacuum_interval_seconds = vacuum_interval_seconds
+        self._backend = backend
+        self._last_vacuum = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "HistoryRetention":
+        return cls(
+            idle_seconds=float(os.getenv("SESSION_RETENTION_IDLE_DAYS", "0")) * 86400,
+            archive_dir=os.getenv("SESSION_ARCHIVE_DIR", "src/database/archive"),
+            interval_seconds=float(os.getenv("SESSION_MAINTENANCE_INTERVAL_SECONDS", "3600")),
+            vacuum_interval_seconds=float(os.getenv("SESSION_VACUUM_INTERVAL_SECONDS", "86400")),
+        )
+
+    async def run_once(self, vacuum: bool = False) -> int:
+        """Archives idle sessions (if enabled) and optimizes the shards. Returns the number archived."""
+        backend = self._backend()
+        archived = 0
+        if self.idle_seconds > 0:
+            start = time.perf_counter()
+            archived = await backend.archive_idle_sessions(self.idle_seconds, self.archive.write)
+            maintenance_seconds.observe(time.perf_counter() - start, "archive")
+            archived_sessions.inc(amount=archived)
+        start = time.perf_counter()
+        await backend.optimize(vacuum=vacuum)
+        maintenance_seconds.observe(time.perf_counter() - start, "vacuum" if vacuum else "analyze")
+        return archived
+
+    def _vacuum_due(self) -> bool:
+        if self.vacuum_interval_seconds <= 0:
+            return False
+        if time.monotonic() - self._last_vacuum < self.vacuum_interval_seconds:
+            return False
+        self._last_vacuum = time.monotonic()
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                archived = await self.run_once(vacuum=self._vacuum_due())
+                if archived:
+                    logger.info("Archived %d idle sessions", archived)
+            except Exception:
+                logger.exception("History maintenance failed")
+
+    def start(self) -> None:
+        """Starts the periodic job on the running loop (no-op with the interval set to 0)."""
+        if self.interval_seconds > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+history_retention = HistoryRetention.from_env()
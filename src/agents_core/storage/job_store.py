@@ -0,0 +1,247 @@
+"""
+Durable table of asynchronous chat jobs.
+
+A job is one chat message run in the background (see agents/chat_jobs.py). The
+table keeps its request, status, result and timings, so a client can poll for
+the answer after its own HTTP request is long gone, and jobs that were still
+queued when the process stopped are picked up again on the next start.
+
+Statuses: queued -> running -> succeeded | failed. Finished jobs expire
+`ttl_seconds` after they finish and are removed by `delete_expired()`.
+
+All database work runs on worker threads, off the event loop; writes go through
+a single writer thread.
+
+Configuration (environment variables):
+- CHAT_JOB_DB_PATH: SQLite file (default src/database/chat_jobs.db)
+- CHAT_JOB_TTL_SECONDS: how long finished jobs are kept (default 3600)
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    tenant_id: str
+    session_id: str
+    user_id: str
+    message: str
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    response: Optional[str] = None
+    error: Optional[str] = None
+    # HTTP status the synchronous endpoint would have answered with (504/503/500)
+    error_status: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["queue_seconds"] = (self.started_at - self.created_at) if self.started_at else None
+        data["run_seconds"] = (self.finished_at - self.started_at) if self.finished_at and self.started_at else None
+        return data
+
+
+_COLUMNS = [
+    "id", "tenant_id", "session_id", "user_id", "message", "status", "created_at",
+    "started_at", "finished_at", "expires_at", "response", "error", "error_status",
+]
+
+
+class JobStore:
+    """SQLite job table with off-loop execution."""
+
+    def __init__(self, db_path: str, ttl_seconds: float = 3600, busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-write")
+        self._init_schema()
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        return cls(
+            os.getenv("CHAT_JOB_DB_PATH", "src/database/chat_jobs.db"),
+            ttl_seconds=float(os.getenv("CHAT_JOB_TTL_SECONDS", "3600")),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout_ms / 1000)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Returns the connection owned by the current worker thread."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.connection = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chat_jobs (
+                    id TEXT PRIMARY KEY,
+                    tenant_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    expires_at REAL,
+                    response TEXT,
+                    error TEXT,
+                    error_status INTEGER
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_jobs_status ON chat_jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_jobs_expires_at ON chat_jobs (expires_at)")
+            conn.commit()
+        finally:
+            conn.close()
+
+    async def _run(self, executor: ThreadPoolExecutor, func: Callable[[], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, func)
+
+    async def create(self, tenant_id: str, session_id: str, user_id: str, message: str) -> Job:
+        """Stores a new queued job."""
+        job = Job(
+            id=uuid.uuid4().hex, tenant_id=tenant_id, session_id=session_id, user_id=user_id,
+            message=message, status=QUEUED, created_at=time.time(),
+        )
+
+        def _create_sync():
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    f"INSERT INTO chat_jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    [getattr(job, column) for column in _COLUMNS],
+                )
+
+        await self._run(self._writer, _create_sync)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        def _get_sync():
+            row = self._get_connection().execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM chat_jobs WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (job_id, time.time()),
+            ).fetchone()
+            return Job(*row) if row is not None else None
+
+        return await self._run(self._readers, _get_sync)
+
+    async def mark_running(self, job_id: str) -> float:
+        started_at = time.time()
+
+        def _mark_running_sync():
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    "UPDATE chat_jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, started_at, job_id)
+                )
+
+        await self._run(self._writer, _mark_running_sync)
+        return started_at
+
+    async def finish(self, job_id: str, response: Optional[str] = None, error: Optional[str] = None,
+                     error_status: Optional[int] = None) -> None:
+        """Stores the job's answer (or error) and starts its TTL."""
+        finished_at = time.time()
+
+        def _finish_sync():
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    """
+                    UPDATE chat_jobs
+                    SET status = ?, finished_at = ?, expires_at = ?, response = ?, error = ?, error_status = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        FAILED if error is not None else SUCCEEDED, finished_at, finished_at + self.ttl_seconds,
+                        response, error, error_status, job_id,
+                    ),
+                )
+
+        await self._run(self._writer, _finish_sync)
+
+    async def recover(self) -> List[Job]:
+        """
+        After a restart: jobs that were running are failed (their turn may be half
+        written to the session), queued jobs are returned to be enqueued again.
+        """
+        def _recover_sync():
+            conn = self._get_connection()
+            now = time.time()
+            with conn:
+                conn.execute(
+                    """
+                    UPDATE chat_jobs
+                    SET status = ?, finished_at = ?, expires_at = ?, error = ?, error_status = 500
+                    WHERE status = ?
+                    """,
+                    (FAILED, now, now + self.ttl_seconds, "Interrupted by a restart", RUNNING),
+                )
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM chat_jobs WHERE status = ? ORDER BY created_at",
+                (QUEUED,),
+            ).fetchall()
+            return [Job(*row) for row in rows]
+
+        return await self._run(self._writer, _recover_sync)
+
+    async def delete_expired(self) -> int:
+        """Removes finished jobs past their TTL. Returns the number removed."""
+        def _delete_expired_sync():
+            conn = self._get_connection()
+            with conn:
+                return conn.execute("DELETE FROM chat_jobs WHERE expires_at <= ?", (time.time(),)).rowcount
+
+        return await self._run(self._writer, _delete_expired_sync)
+
+    async def counts(self) -> Dict[str, int]:
+        """Number of stored jobs per status."""
+        def _counts_sync():
+            rows = self._get_connection().execute("SELECT status, COUNT(*) FROM chat_jobs GROUP BY status").fetchall()
+            return dict(rows)
+
+        return await self._run(self._readers, _counts_sync)
+
+    def close(self) -> None:
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -0,0 +1,664 @@
+"""
+Conversation history storage for agent sessions.
+
+The store is created once per process and shared by all requests:
+- SessionBackend is the pluggable storage interface
+- SQLitePoolBackend keeps pooled connections open (WAL, synchronous=NORMAL,
+  busy timeout) and runs all database work on worker threads, off the event loop;
+  writes go through a single writer thread so they never fight for the lock
+- StoredSession adapts a backend to the agents SDK Session protocol
+- the backend also keeps one rolling summary per session for history
+  compaction (see history.py)
+- ShardedSessionBackend spreads sessions over several SQLite files by a hash
+  of (tenant_id, session_id); each shard is a SQLitePoolBackend with its own
+  writer thread, so shards are written in parallel and stay small
+
+Sessions are keyed by (tenant_id, session_id): tenants using the same session
+id never share history, whatever shard they land on. The tables are those of
+the SDK's SQLiteSession plus a tenant_id column in every key. Files created
+before that (SDK schema) are migrated in place on first open: their rows, which
+were not partitioned by tenant, are assigned to SESSION_LEGACY_TENANT.
+Idle sessions are archived and shards vacuumed by history_retention.py.
+
+Configuration (environment variables):
+- SESSION_DB_PATH: SQLite file (default src/database/conversation_history.db); with
+  shards, shard i is stored next to it as conversation_history-<i>.db
+- SESSION_SHARDS: number of shard files (default 1: a single file at SESSION_DB_PATH).
+  Sessions are assigned by hash modulo the shard count, so changing it moves sessions
+  to other shards: existing history is not found until it is migrated
+- SESSION_POOL_SIZE: number of reader connections/threads, split between shards (default 8)
+- SESSION_BUSY_TIMEOUT_MS: SQLite busy timeout (default 5000)
+- SESSION_SYNCHRONOUS: SQLite synchronous mode (default NORMAL)
+- SESSION_LEGACY_TENANT: tenant of rows migrated from a file without tenants (default "default")
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.memory.session import SessionABC
+
+DEFAULT_TENANT = "default"
+
+
+class SessionBackend(ABC):
+    """
+    Storage backend for conversation items, shared by all sessions.
+
+    A session is identified by (tenant_id, session_id); `tenant_id` defaults to
+    the "default" tenant.
+    """
+
+    @abstractmethod
+    async def get_items(self, session_id: str, limit: Optional[int] = None, *,
+                        tenant_id: str = DEFAULT_TENANT) -> List[dict]:
+        """Returns session items in chronological order (the latest `limit` if given)."""
+
+    @abstractmethod
+    async def add_items(self, session_id: str, items: List[dict], *, tenant_id: str = DEFAULT_TENANT) -> None:
+        """Appends items to the session."""
+
+    @abstractmethod
+    async def pop_item(self, session_id: str, *, tenant_id: str = DEFAULT_TENANT) -> Optional[dict]:
+        """Removes and returns the most recent item of the session."""
+
+    @abstractmethod
+    async def clear_session(self, session_id: str, *, tenant_id: str = DEFAULT_TENANT) -> None:
+        """Removes all items of the session."""
+
+    @abstractmethod
+    async def get_tail(self, session_id: str, *,
+                       tenant_id: str = DEFAULT_TENANT) -> Tuple[str, int, List[Tuple[int, dict]]]:
+        """
+        Returns the session summary and the items it does not cover yet.
+
+        Returns:
+            (summary, id of the last summarized item, [(item id, item), ...] newer than it)
+        """
+
+    @abstractmethod
+    async def save_summary(self, session_id: str, summary: str, until_id: int, *,
+                           tenant_id: str = DEFAULT_TENANT) -> None:
+        """Stores the summary of all items up to `until_id` (ignored if a newer summary exists)."""
+
+    def backend_for(self, tenant_id: str, session_id: str) -> "SessionBackend":
+        """Backend that stores the session (its shard, for sharded backends)."""
+        return self
+
+    @abstractmethod
+    async def archive_idle_sessions(
+        self, idle_seconds: float, archive: Callable[[List[dict]], None], batch_size: int = 100
+    ) -> int:
+        """
+        Moves sessions not updated for `idle_seconds` out of the store.
+
+        Args:
+            idle_seconds: Minimum idle time of an archived session
+            archive: Called with a batch of session records ({tenant_id, session_id, updated_at,
+                     summary, items}); it must store them durably before returning, the sessions
+                     are deleted afterwards
+            batch_size: Sessions per batch
+
+        Returns:
+            Number of archived sessions
+        """
+
+    async def optimize(self, vacuum: bool = False) -> None:
+        """Refreshes query planner statistics and, with `vacuum`, rebuilds the database file."""
+
+    def close(self) -> None:
+        """Releases backend resources."""
+
+
+class SQLitePoolBackend(SessionBackend):
+    """
+    SQLite backend with pooled connections and off-loop execution.
+
+    Each worker thread owns one long-lived connection. Reads run on a pool of
+    `pool_size` threads, writes on one dedicated writer thread.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 8,
+        busy_timeout_ms: int = 5000,
+        synchronous: str = "NORMAL",
+        sessions_table: str = "agent_sessions",
+        messages_table: str = "agent_messages",
+        summaries_table: str = "agent_session_summaries",
+        legacy_tenant: str = DEFAULT_TENANT,
+    ):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Number of reader threads (and connections)
+            busy_timeout_ms: How long a connection waits for a lock before failing
+            synchronous: SQLite synchronous mode (OFF, NORMAL, FULL)
+            sessions_table: Name of the session metadata table
+            messages_table: Name of the message table
+            summaries_table: Name of the rolling summary table
+            legacy_tenant: Tenant of the rows of a file created without tenant_id columns
+        """
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.sessions_table = sessions_table
+        self.messages_table = messages_table
+        self.summaries_table = summaries_table
+        self.legacy_tenant = legacy_tenant
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._readers = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="session-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-write")
+
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout_ms / 1000)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Returns the connection owned by the current worker thread."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.connection = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.sessions_table} (
+                tenant_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (tenant_id, session_id)
+            )
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.messages_table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tenant_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                message_data TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (tenant_id, session_id) REFERENCES {self.sessions_table} (tenant_id, session_id)
+                    ON DELETE CASCADE
+            )
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.messages_table}_tenant_session
+            ON {self.messages_table} (tenant_id, session_id, id)
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS idx_{self.sessions_table}_updated_at
+            ON {self.sessions_table} (updated_at)
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.summaries_table} (
+                tenant_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                until_id INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (tenant_id, session_id)
+            )
+            """
+        )
+
+    def _columns(self, conn: sqlite3.Connection, table: str) -> set:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+    def _migrate_legacy(self, conn: sqlite3.Connection) -> None:
+        """Rebuilds tables of the SDK schema (keyed by session_id only) with tenant_id in every key."""
+        tables = (self.sessions_table, self.messages_table, self.summaries_table)
+        legacy = [table for table in tables if self._columns(conn, table) and "tenant_id" not in self._columns(conn, table)]
+        if not legacy:
+            return
+        for table in legacy:
+            for (index,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+            ).fetchall():
+                conn.execute(f"DROP INDEX {index}")
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        self._create_tables(conn)
+        if self.sessions_table in legacy:
+            conn.execute(
+                f"""
+                INSERT INTO {self.sessions_table} (tenant_id, session_id, created_at, updated_at)
+                SELECT ?, session_id, created_at, updated_at FROM {self.sessions_table}_legacy
+                """,
+                (self.legacy_tenant,),
+            )
+        if self.messages_table in legacy:
+            # Item ids are kept: summaries refer to them
+            conn.execute(
+                f"""
+                INSERT INTO {self.messages_table} (id, tenant_id, session_id, message_data, created_at)
+                SELECT id, ?, session_id, message_data, created_at FROM {self.messages_table}_legacy
+                """,
+                (self.legacy_tenant,),
+            )
+        if self.summaries_table in legacy:
+            conn.execute(
+                f"""
+                INSERT INTO {self.summaries_table} (tenant_id, session_id, summary, until_id, updated_at)
+                SELECT ?, session_id, summary, until_id, updated_at FROM {self.summaries_table}_legacy
+                """,
+                (self.legacy_tenant,),
+            )
+        # Children first
+        for table in reversed(tables):
+            if table in legacy:
+                conn.execute(f"DROP TABLE {table}_legacy")
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        try:
+            # One transaction, taken before looking at the schema: processes opening the
+            # file at the same time migrate it once
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._migrate_legacy(conn)
+                self._create_tables(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    async def _run(self, executor: ThreadPoolExecutor, func: Callable[[], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, func)
+
+    async def get_items(self, session_id: str, limit: Optional[int] = None, *,
+                        tenant_id: str = DEFAULT_TENANT) -> List[dict]:
+        def _get_items_sync():
+            conn = self._get_connection()
+            if limit is None:
+                rows = conn.execute(
+                    f"""
+                    SELECT message_data FROM {self.messages_table}
+                    WHERE tenant_id = ? AND session_id = ? ORDER BY id ASC
+                    """,
+                    (tenant_id, session_id),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    f"""
+                    SELECT message_data FROM {self.messages_table}
+                    WHERE tenant_id = ? AND session_id = ? ORDER BY id DESC LIMIT ?
+                    """,
+                    (tenant_id, session_id, limit),
+                ).fetchall()
+                rows.reverse()
+
+            items = []
+            for (message_data,) in rows:
+                try:
+                    items.append(json.loads(message_data))
+                except json.JSONDecodeError:
+                    # Skip invalid JSON entries
+                    continue
+            return items
+
+        return await self._run(self._readers, _get_items_sync)
+
+    async def add_items(self, session_id: str, items: List[dict], *, tenant_id: str = DEFAULT_TENANT) -> None:
+        if not items:
+            return
+
+        def _add_items_sync():
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    f"INSERT OR IGNORE INTO {self.sessions_table} (tenant_id, session_id) VALUES (?, ?)",
+                    (tenant_id, session_id),
+                )
+                conn.executemany(
+                    f"INSERT INTO {self.messages_table} (tenant_id, session_id, message_data) VALUES (?, ?, ?)",
+                    [(tenant_id, session_id, json.dumps(item)) for item in items],
+                )
+                conn.execute(
+                    f"""
+                    UPDATE {self.sessions_table} SET updated_at = CURRENT_TIMESTAMP
+                    WHERE tenant_id = ? AND session_id = ?
+                    """,
+                    (tenant_id, session_id),
+                )
+
+        await self._run(self._writer, _add_items_sync)
+
+    async def pop_item(self, session_id: str, *, tenant_id: str = DEFAULT_TENANT) -> Optional[dict]:
+        def _pop_item_sync():
+            conn = self._get_connection()
+            with conn:
+                row = conn.execute(
+                    f"""
+                    DELETE FROM {self.messages_table}
+                    WHERE id = (
+                        SELECT id FROM {self.messages_table}
+                        WHERE tenant_id = ? AND session_id = ?
+                        ORDER BY id DESC
+                        LIMIT 1
+                    )
+                    RETURNING message_data
+                    """,
+                    (tenant_id, session_id),
+                ).fetchone()
+            if row is None:
+                return None
+            try:
+                return json.loads(row[0])
+            except json.JSONDecodeError:
+                return None
+
+        return await self._run(self._writer, _pop_item_sync)
+
+    async def clear_session(self, session_id: str, *, tenant_id: str = DEFAULT_TENANT) -> None:
+        def _clear_session_sync():
+            conn = self._get_connection()
+            with conn:
+                for table in (self.messages_table, self.summaries_table, self.sessions_table):
+                    conn.execute(f"DELETE FROM {table} WHERE tenant_id = ? AND session_id = ?", (tenant_id, session_id))
+
+        await self._run(self._writer, _clear_session_sync)
+
+    async def get_tail(self, session_id: str, *,
+                       tenant_id: str = DEFAULT_TENANT) -> Tuple[str, int, List[Tuple[int, dict]]]:
+        def _get_tail_sync():
+            conn = self._get_connection()
+            row = conn.execute(
+                f"SELECT summary, until_id FROM {self.summaries_table} WHERE tenant_id = ? AND session_id = ?",
+                (tenant_id, session_id),
+            ).fetchone()
+            summary, until_id = row if row is not None else ("", 0)
+            rows = conn.execute(
+                f"""
+                SELECT id, message_data FROM {self.messages_table}
+                WHERE tenant_id = ? AND session_id = ? AND id > ? ORDER BY id ASC
+                """,
+                (tenant_id, session_id, until_id),
+            ).fetchall()
+
+            items = []
+            for item_id, message_data in rows:
+                try:
+                    items.append((item_id, json.loads(message_data)))
+                except json.JSONDecodeError:
+                    # Skip invalid JSON entries
+                    continue
+            return summary, until_id, items
+
+        return await self._run(self._readers, _get_tail_sync)
+
+    async def save_summary(self, session_id: str, summary: str, until_id: int, *,
+                           tenant_id: str = DEFAULT_TENANT) -> None:
+        def _save_summary_sync():
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    f"""
+                    INSERT INTO {self.summaries_table} (tenant_id, session_id, summary, until_id) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (tenant_id, session_id) DO UPDATE SET
+                        summary = excluded.summary,
+                        until_id = excluded.until_id,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE excluded.until_id > {self.summaries_table}.until_id
+                    """,
+                    (tenant_id, session_id, summary, until_id),
+                )
+
+        await self._run(self._writer, _save_summary_sync)
+
+    async def archive_idle_sessions(
+        self, idle_seconds: float, archive: Callable[[List[dict]], None], batch_size: int = 100
+    ) -> int:
+        def _archive_sync():
+            conn = self._get_connection()
+            archived = 0
+            while True:
+                sessions = conn.execute(
+                    f"""
+                    SELECT tenant_id, session_id, updated_at FROM {self.sessions_table}
+                    WHERE updated_at < datetime('now', ?)
+                    ORDER BY updated_at
+                    LIMIT ?
+                    """,
+                    (f"-{int(idle_seconds)} seconds", batch_size),
+                ).fetchall()
+                if not sessions:
+                    return archived
+
+                records, last_ids = [], {}
+                for tenant_id, session_id, updated_at in sessions:
+                    key = (tenant_id, session_id)
+                    rows = conn.execute(
+                        f"""
+                        SELECT id, message_data FROM {self.messages_table}
+                        WHERE tenant_id = ? AND session_id = ? ORDER BY id ASC
+                        """,
+                        key,
+                    ).fetchall()
+                    summary = conn.execute(
+                        f"SELECT summary FROM {self.summaries_table} WHERE tenant_id = ? AND session_id = ?", key
+                    ).fetchone()
+                    items = []
+                    for _, message_data in rows:
+                        try:
+                            items.append(json.loads(message_data))
+                        except json.JSONDecodeError:
+                            # Skip invalid JSON entries
+                            continue
+                    last_ids[key] = rows[-1][0] if rows else 0
+                    records.append({
+                        "tenant_id": tenant_id,
+                        "session_id": session_id,
+                        "updated_at": updated_at,
+                        "summary": summary[0] if summary else "",
+                        "items": items,
+                    })
+                archive(records)
+
+                with conn:
+                    for tenant_id, session_id, updated_at in sessions:
+                        key = (tenant_id, session_id)
+                        # Another process may have appended to the session since it was read
+                        deleted = conn.execute(
+                            f"DELETE FROM {self.sessions_table} WHERE tenant_id = ? AND session_id = ? AND updated_at = ?",
+                            (*key, updated_at),
+                        ).rowcount
+                        conn.execute(
+                            f"DELETE FROM {self.messages_table} WHERE tenant_id = ? AND session_id = ? AND id <= ?",
+                            (*key, last_ids[key]),
+                        )
+                        if deleted:
+                            conn.execute(
+                                f"DELETE FROM {self.summaries_table} WHERE tenant_id = ? AND session_id = ?", key
+                            )
+                archived += len(sessions)
+
+        return await self._run(self._writer, _archive_sync)
+
+    async def optimize(self, vacuum: bool = False) -> None:
+        def _optimize_sync():
+            conn = self._get_connection()
+            # Sampled statistics: bounded cost on large shards
+            conn.execute("PRAGMA analysis_limit=1000")
+            conn.execute("ANALYZE")
+            if vacuum:
+                conn.execute("VACUUM")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        await self._run(self._writer, _optimize_sync)
+
+    def close(self) -> None:
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def shard_index(tenant_id: str, session_id: str, shards: int) -> int:
+    """Shard of a session: stable across processes and restarts (unlike hash())."""
+    digest = hashlib.blake2b(f"{tenant_id}\x00{session_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def shard_path(db_path: str, index: int) -> str:
+    """conversation_history.db -> conversation_history-03.db"""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}-{index:02d}{ext or '.db'}"
+
+
+class ShardedSessionBackend(SessionBackend):
+    """
+    Sessions spread over several backends by hash of (tenant_id, session_id).
+
+    Sessions are bound to their shard with `backend_for()` (get_session and the
+    history manager do this); the SessionBackend methods pick the shard themselves.
+    """
+
+    def __init__(self, shards: List[SessionBackend]):
+        if not shards:
+            raise ValueError("ShardedSessionBackend needs at least one shard")
+        self._shards = shards
+
+    @classmethod
+    def sqlite(cls, db_path: str, shards: int, pool_size: int = 8, **options: Any) -> "ShardedSessionBackend":
+        """SQLite shards next to `db_path`, sharing `pool_size` reader threads."""
+        readers = max(2, pool_size // shards)
+        return cls([SQLitePoolBackend(shard_path(db_path, i), pool_size=readers, **options) for i in range(shards)])
+
+    def backend_for(self, tenant_id: str, session_id: str) -> SessionBackend:
+        return self._shards[shard_index(tenant_id, session_id, len(self._shards))]
+
+    async def get_items(self, session_id: str, limit: Optional[int] = None, *,
+                        tenant_id: str = DEFAULT_TENANT) -> List[dict]:
+        return await self.backend_for(tenant_id, session_id).get_items(session_id, limit, tenant_id=tenant_id)
+
+    async def add_items(self, session_id: str, items: List[dict], *, tenant_id: str = DEFAULT_TENANT) -> None:
+        await self.backend_for(tenant_id, session_id).add_items(session_id, items, tenant_id=tenant_id)
+
+    async def pop_item(self, session_id: str, *, tenant_id: str = DEFAULT_TENANT) -> Optional[dict]:
+        return await self.backend_for(tenant_id, session_id).pop_item(session_id, tenant_id=tenant_id)
+
+    async def clear_session(self, session_id: str, *, tenant_id: str = DEFAULT_TENANT) -> None:
+        await self.backend_for(tenant_id, session_id).clear_session(session_id, tenant_id=tenant_id)
+
+    async def get_tail(self, session_id: str, *,
+                       tenant_id: str = DEFAULT_TENANT) -> Tuple[str, int, List[Tuple[int, dict]]]:
+        return await self.backend_for(tenant_id, session_id).get_tail(session_id, tenant_id=tenant_id)
+
+    async def save_summary(self, session_id: str, summary: str, until_id: int, *,
+                           tenant_id: str = DEFAULT_TENANT) -> None:
+        await self.backend_for(tenant_id, session_id).save_summary(session_id, summary, until_id, tenant_id=tenant_id)
+
+    async def archive_idle_sessions(
+        self, idle_seconds: float, archive: Callable[[List[dict]], None], batch_size: int = 100
+    ) -> int:
+        counts = await asyncio.gather(
+            *(shard.archive_idle_sessions(idle_seconds, archive, batch_size) for shard in self._shards)
+        )
+        return sum(counts)
+
+    async def optimize(self, vacuum: bool = False) -> None:
+        # One shard at a time: VACUUM rewrites the whole file
+        for shard in self._shards:
+            await shard.optimize(vacuum)
+
+    def close(self) -> None:
+        for shard in self._shards:
+            shard.close()
+
+
+class StoredSession(SessionABC):
+    """Agents SDK session backed by a shared SessionBackend."""
+
+    def __init__(self, session_id: str, backend: SessionBackend, tenant_id: str = DEFAULT_TENANT):
+        self.session_id = session_id
+        self.backend = backend
+        self.tenant_id = tenant_id
+
+    async def get_items(self, limit: Optional[int] = None) -> List[dict]:
+        return await self.backend.get_items(self.session_id, limit, tenant_id=self.tenant_id)
+
+    async def add_items(self, items: List[dict]) -> None:
+        await self.backend.add_items(self.session_id, items, tenant_id=self.tenant_id)
+
+    async def pop_item(self) -> Optional[dict]:
+        return await self.backend.pop_item(self.session_id, tenant_id=self.tenant_id)
+
+    async def clear_session(self) -> None:
+        await self.backend.clear_session(self.session_id, tenant_id=self.tenant_id)
+
+
+_backend: Optional[SessionBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_session_backend() -> SessionBackend:
+    """Returns the process-wide session backend, creating it from the environment on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                db_path = os.getenv("SESSION_DB_PATH", "src/database/conversation_history.db")
+                shards = int(os.getenv("SESSION_SHARDS", "1"))
+                options: Dict[str, Any] = dict(
+                    pool_size=int(os.getenv("SESSION_POOL_SIZE", "8")),
+                    busy_timeout_ms=int(os.getenv("SESSION_BUSY_TIMEOUT_MS", "5000")),
+                    synchronous=os.getenv("SESSION_SYNCHRONOUS", "NORMAL"),
+                    legacy_tenant=os.getenv("SESSION_LEGACY_TENANT", DEFAULT_TENANT),
+                )
+                if shards > 1:
+                    _backend = ShardedSessionBackend.sqlite(db_path, shards, **options)
+                else:
+                    _backend = SQLitePoolBackend(db_path, **options)
+    return _backend
+
+
+def set_session_backend(backend: Optional[SessionBackend]) -> None:
+    """Installs a different session backend (closing the previous one)."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    if previous is not None and previous is not backend:
+        previous.close()
+
+
+def get_session(session_id: str, tenant_id: str = DEFAULT_TENANT) -> StoredSession:
+    """Returns the tenant's session, bound to its shard of the shared backend."""
+    return StoredSession(session_id, get_session_backend().backend_for(tenant_id, session_id), tenant_id)
+
+
+def close_session_backend() -> None:
+    """Closes the process-wide session backend if it was created."""
+    set_session_backend(None)
@@ -0,0 +1,131 @@
+"""
+Middleware допуска запросов к чату по арендаторам
+"""
+import json
+import math
+from typing import Dict, Optional
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from agents_core.agents.admission import AdmissionController, AdmissionRejected, get_admission_controller
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+async def _read_body(receive: Receive, limit: int) -> bytes:
+    """Читает тело запроса; _BodyTooLarge, если оно больше limit байт"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            raise _BodyTooLarge()
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _content_length(scope: Scope) -> Optional[int]:
+    for name, value in scope.get("headers", []):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    """receive, который сначала отдает уже прочитанное тело, затем - события клиента (отключение)"""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+def _charges(controller: AdmissionController, body: bytes) -> Dict[str, tuple]:
+    """Списания по арендаторам: {tenant_id: (запросов, оценка токенов модели)}"""
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    # Пакет списывается с арендатора каждого сообщения
+    items = data["messages"] if isinstance(data.get("messages"), list) else [data]
+
+    charges: Dict[str, tuple] = {}
+    for item in items:
+        item = item if isinstance(item, dict) else {}
+        tenant_id = str(item.get("tenant_id", "default"))
+        message = item.get("message")
+        tokens = controller.estimate_tokens(tenant_id, message if isinstance(message, str) else "")
+        requests, total = charges.get(tenant_id, (0, 0))
+        charges[tenant_id] = (requests + 1, total + tokens)
+    return charges or {"default": (1, controller.estimate_tokens("default", ""))}
+
+
+class AdmissionMiddleware:
+    """
+    Допуск POST запросов к чату по лимитам арендатора (см. agents_core/agents/admission.py).
+
+    Запрос сверх лимита арендатора или без свободной глобальной емкости сразу
+    получает 429 с Retry-After, а не копится в event loop. Допущенный запрос
+    занимает глобальный слот до конца ответа (включая потоковую отдачу).
+    Тело читается целиком ради tenant_id, поэтому оно ограничено
+    ADMISSION_MAX_BODY_BYTES: больший запрос получает 413.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/api/v1/chat",
+                 controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller or get_admission_controller()
+        if not controller.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        limit = controller.max_body_bytes
+        try:
+            length = _content_length(scope)
+            if length is not None and length > limit:
+                raise _BodyTooLarge()
+            body = await _read_body(receive, limit)
+        except _BodyTooLarge:
+            response = JSONResponse({"detail": f"Тело запроса больше {limit} байт"}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        charges = _charges(controller, body)
+        try:
+            gate = await controller.admit(charges)
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                {"detail": f"Запрос отклонен: {e}"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, _replay(body, receive), send)
+        finally:
+            gate.release()
@@ -5,6 +5,9 @@ from typing import List, Dict, Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from agents_core.agents.context.tool_cache import tool_cache
+from agents_core.agents.prompt_cache import prompt_cache_stats
+
 router = APIRouter()
 
 
@@ -62,6 +65,18 @@ async def get_agents():
     return AgentListResponse(agents=agents_info)
 
 
+@router.get("/tools/cache")
+async def get_tool_cache_metrics():
+    """Статистика кэша результатов контекстных инструментов (попадания/промахи по инструментам)"""
+    return tool_cache.metrics()
+
+
+@router.get("/prompt-cache")
+async def get_prompt_cache_metrics():
+    """Кэширование промптов у провайдера: входные и закэшированные токены по агентам"""
+    return prompt_cache_stats()
+
+
 @router.get("/{agent_name}", response_model=AgentDetailResponse)
 async def get_agent(agent_name: str):
     """Получить информацию о конкретном агенте"""
@@ -1,11 +1,34 @@
 """
 Эндпоинт для обработки сообщений через агентов
 """
-from fastapi import APIRouter, HTTPException
+import asyncio
+import copy
+import json
+import math
+import os
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from agents import Runner, SQLiteSession
-from src.agents_core.agents.route_agent import route_agent
-from src.agents_core.agents.context.context_manager import ContextManager
+from agents import Agent, RunConfig, Runner
+from agents.exceptions import InputGuardrailTripwireTriggered
+from agents.result import RunResultStreaming
+from agents.stream_events import StreamEvent
+
+from agents_core.agents.registry import agent_registry
+from agents_core.agents.pre_router import pre_router, RouteDecision
+from agents_core.agents.input_guardrail import ANSWER, GuardrailDecision, InputRejected, input_guard
+from agents_core.agents.speculation import speculation_stats, speculator
+from agents_core.agents.ceo_fanout import CONSULTATION_TOOLS, FanOut, fanout_enabled, start_fan_out
+from agents_core.agents.request_dedup import IdempotencyConflict, request_fingerprint, run_deduplicated
+from agents_core.agents.session_queue import SessionQueueFull, session_queue
+from agents_core.agents.admission import get_admission_controller
+from agents_core.agents.chat_jobs import JobQueueFull, chat_job_queue
+from agents_core.agents.resilient_model import CircuitOpen, ModelTimeout, ModelUnavailable
+from agents_core.agents.context.context_manager import ContextManager
+from agents_core.storage.history import get_history_session
+from agents_core.storage.job_store import Job
 
 router = APIRouter()
 
@@ -21,28 +44,557 @@ class MessageResponse(BaseModel):
     response: str
 
 
-@router.post("/", response_model=MessageResponse)
-async def process_message(request: MessageRequest):
-    """Обработка сообщения через route_agent"""
-    try:
-        # Создаем сессию с встроенным менеджером базы данных
-        session = SQLiteSession(request.session_id, "src/database/conversation_history.db")
-        user_id = request.user_id
-        # Создаем контекст-менеджер с передачей session_id, tenant_id и user_id
-        context_manager = ContextManager(
-            session_id=request.session_id,
-            tenant_id=request.tenant_id,
-            user_id=request.user_id
-        )
-        
-        # Обрабатываем сообщение через route_agent с передачей контекста
-        result = await Runner.run(
-            route_agent,
-            request.message,
-            session=session,
-            context=context_manager
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    tenant_id: str
+    session_id: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    # Время ожидания свободного исполнителя и время выполнения, с
+    queue_seconds: Optional[float] = None
+    run_seconds: Optional[float] = None
+    response: Optional[str] = None
+    error: Optional[str] = None
+    # Код ответа, который вернул бы синхронный POST /api/v1/chat/
+    error_status: Optional[int] = None
+
+
+class BatchRequest(BaseModel):
+    messages: List[MessageRequest]
+    # True - результаты отдаются NDJSON строками по мере готовности
+    stream: bool = False
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    response: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
+
+
+# Ограничения пакетной обработки (общие для всех пакетов процесса)
+BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "8"))
+BATCH_TENANT_CONCURRENCY = int(os.getenv("CHAT_BATCH_TENANT_CONCURRENCY", "4"))
+# Предельное время одного хода (все агенты и инструменты), 0 - без ограничения
+CHAT_TIMEOUT_SECONDS = float(os.getenv("CHAT_TIMEOUT_SECONDS", "120"))
+
+
+
+class _BatchLimits:
+    """Общий и арендаторские семафоры пакетной обработки, привязанные к event loop"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.total = asyncio.Semaphore(BATCH_CONCURRENCY)
+        self.tenants: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(BATCH_TENANT_CONCURRENCY)
         )
-        
-        return MessageResponse(response=result.final_output)
+
+
+_batch_limits: Optional[_BatchLimits] = None
+
+
+def _get_batch_limits() -> _BatchLimits:
+    global _batch_limits
+    if _batch_limits is None or _batch_limits.loop is not asyncio.get_running_loop():
+        _batch_limits = _BatchLimits()
+    return _batch_limits
+
+
+def _select_agent(message: str) -> Tuple[Agent, RouteDecision]:
+    """Выбирает стартового агента: целевой агент при уверенном локальном решении, иначе route_agent"""
+    decision = pre_router.classify(message)
+    fast_path = pre_router.is_confident(decision)
+    pre_router.record_decision(decision, fast_path)
+    if fast_path:
+        return agent_registry.route_target(decision.label), decision
+    return agent_registry.get("route"), decision
+
+
+def _run_config() -> Optional[RunConfig]:
+    """INPUT_GUARDRAIL_MODEL_ENABLED: модельная проверка выполняется параллельно с первым ходом (маршрутизацией)"""
+    guardrails = input_guard.model_guardrails()
+    return RunConfig(input_guardrails=guardrails) if guardrails else None
+
+
+def _record_route(request: MessageRequest, starting_agent: Agent, decision: RouteDecision, last_agent: Agent) -> None:
+    """
+    Сравнивает локальное решение с выбором route_agent (для настройки порога)
+    и запоминает последний маршрут сессии (прогноз для спекулятивного режима)
+    """
+    label = agent_registry.route_label(last_agent.name)
+    if starting_agent is agent_registry.get("route"):
+        pre_router.record_router_choice(decision, label)
+    speculator.remember(request.tenant_id, request.session_id, label)
+
+
+def _start_fan_out(agent: Agent, message: str, context_manager: ContextManager) -> Optional[FanOut]:
+    """
+    CEO_FANOUT_ENABLED: запрос, направленный пре-роутером прямо к CEO Agent, сначала параллельно
+    консультируется с нужными отделами, и CEO Agent отвечает за один ход.
+    Передача от Route Agent к CEO Agent идет к обычному CEO Agent (консультации - его инструментами).
+
+    Returns:
+        Запущенные консультации или None, если режим не применяется
+    """
+    if fanout_enabled() and agent is agent_registry.get("ceo"):
+        return start_fan_out(message, context_manager)
+    return None
+
+
+async def _fan_out(agent: Agent, message: str, context_manager: ContextManager) -> Agent:
+    """Агент для первого хода: CEO Agent с готовыми консультациями (см. _start_fan_out) или исходный агент"""
+    fan_out = _start_fan_out(agent, message, context_manager)
+    if fan_out is None:
+        return agent
+    try:
+        return await fan_out.synthesizer()
+    finally:
+        fan_out.cancel()
+
+
+async def _run_message(request: MessageRequest) -> str:
+    """Прогоняет одно сообщение через агентов и возвращает финальный ответ"""
+    # Пустые, слишком длинные и заблокированные сообщения отклоняются (InputRejected),
+    # на посторонние и на неподдерживаемом языке - готовый ответ без вызова модели
+    guard = input_guard.enforce(request.message, request.tenant_id)
+    if guard.action == ANSWER:
+        return guard.reply
+
+    # Создаем контекст-менеджер с передачей session_id, tenant_id и user_id
+    context_manager = await ContextManager.load(
+        session_id=request.session_id,
+        tenant_id=request.tenant_id,
+        user_id=request.user_id
+    )
+
+    # Очевидные запросы идут сразу к целевому агенту, остальные - через route_agent
+    agent, decision = _select_agent(request.message)
+    # История: сводка старых ходов + последние ходы в пределах бюджета стартового агента
+    session = get_history_session(request.session_id, agent.name, request.tenant_id)
+    # Ходы одной сессии выполняются по очереди, разные сессии - параллельно
+    async with session_queue.turn(request.session_id, request.tenant_id):
+        # SPECULATIVE_ROUTING_TENANTS: вероятный специалист запускается параллельно с route_agent
+        prediction = speculator.predict(request.tenant_id, request.session_id, decision) \
+            if agent is agent_registry.get("route") else None
+
+        async def run() -> Tuple[Any, Agent]:
+            if prediction is not None:
+                specialist = agent_registry.route_target(prediction.label)
+                # Отдельный контекст: сообщения PubSub спекулятивного прогона публикуются, только если он принят
+                speculative_context = copy.copy(context_manager)
+                speculative_context.pubsub_buffer = []
+                outcome = await speculator.run(
+                    agent, specialist, prediction, request.message, session,
+                    get_history_session(request.session_id, specialist.name, request.tenant_id),
+                    context_manager, speculative_context, input_guard.model_guardrails()
+                )
+                return outcome.final_output, outcome.last_agent
+            result = await Runner.run(
+                await _fan_out(agent, request.message, context_manager),
+                request.message,
+                session=session,
+                context=context_manager,
+                run_config=_run_config()
+            )
+            return result.final_output, result.last_agent
+
+        try:
+            final_output, last_agent = await asyncio.wait_for(run(), CHAT_TIMEOUT_SECONDS or None)
+        except asyncio.TimeoutError:
+            raise ModelTimeout(f"Ответ не получен за {CHAT_TIMEOUT_SECONDS:g} с") from None
+        except InputGuardrailTripwireTriggered:
+            # Модельная проверка отклонила запрос: ход прерван, в историю ничего не записано
+            return input_guard.off_topic_reply(guard.language)
+    _record_route(request, agent, decision, last_agent)
+    return str(final_output)
+
+
+async def _run_deduplicated(request: MessageRequest, idempotency_key: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Выполняет сообщение без дублей: одинаковые одновременные запросы ждут один общий Runner.run,
+    повтор с тем же Idempotency-Key получает сохраненный ответ. Возвращает (ответ, из кэша ли он)
+    """
+    fingerprint = request_fingerprint(request.tenant_id, request.session_id, request.user_id, request.message)
+    return await run_deduplicated(
+        request.tenant_id, fingerprint, lambda: _run_message(request), idempotency_key
+    )
+
+
+def _model_unavailable(error: ModelUnavailable) -> HTTPException:
+    """504 при истечении срока ответа модели, 503 при недоступном провайдере (открытый предохранитель)"""
+    if isinstance(error, ModelTimeout):
+        return HTTPException(status_code=504, detail=str(error))
+    headers = {"Retry-After": str(math.ceil(error.retry_after))} if isinstance(error, CircuitOpen) else None
+    return HTTPException(status_code=503, detail=str(error), headers=headers)
+
+
+def _error_status(error: Exception) -> int:
+    """Код ответа синхронного эндпоинта для ошибки хода (сохраняется в задании)"""
+    if isinstance(error, ModelUnavailable):
+        return _model_unavailable(error).status_code
+    if isinstance(error, SessionQueueFull):
+        return 429
+    if isinstance(error, InputRejected):
+        return error.status
+    return 500
+
+
+async def _run_job(job: Job) -> str:
+    """Выполняет задание так же, как синхронный запрос"""
+    request = MessageRequest(
+        message=job.message, session_id=job.session_id, user_id=job.user_id, tenant_id=job.tenant_id
+    )
+    answer, _ = await _run_deduplicated(request)
+    return answer
+
+
+chat_job_queue.configure(_run_job, _error_status)
+
+
+@router.post("/", response_model=MessageResponse)
+async def process_message(
+    request: MessageRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Обработка сообщения через route_agent.
+
+    Одинаковые одновременные запросы выполняются один раз. С заголовком Idempotency-Key
+    ответ хранится IDEMPOTENCY_TTL_SECONDS: повтор получает его без нового прогона агентов
+    (заголовок Idempotent-Replayed: true), тот же ключ с другим запросом - 422.
+    Ходы одной сессии выполняются по очереди; если в очереди сессии уже
+    SESSION_QUEUE_MAX_WAITING запросов - 429.
+    Ход ограничен CHAT_TIMEOUT_SECONDS, вызовы модели - сроками агентов (resilient_model.py):
+    по истечении срока - 504, при открытом предохранителе провайдера - 503 с Retry-After.
+    Сообщение сначала проверяется локально (input_guardrail.py): пустое - 422, слишком длинное - 413,
+    из блок-листа - 400; на посторонние темы и неподдерживаемом языке - готовый ответ без вызова модели.
+    """
+    try:
+        answer, replayed = await _run_deduplicated(request, idempotency_key)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except InputRejected as e:
+        raise HTTPException(status_code=e.status, detail=f"Сообщение отклонено: {e}")
+    except SessionQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ModelUnavailable as e:
+        raise _model_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ошибка обработки сообщения: {str(e)}")
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return MessageResponse(response=answer)
+
+
+async def _run_batch_item(index: int, request: MessageRequest, session_lock: asyncio.Lock) -> BatchItemResult:
+    """Выполняет элемент пакета под общим и арендаторским лимитами; ошибка не прерывает пакет"""
+    limits = _get_batch_limits()
+    # Сообщения одной сессии выполняются по порядку, чтобы не перемешать историю
+    async with session_lock, limits.tenants[request.tenant_id], limits.total:
+        try:
+            answer, _ = await _run_deduplicated(request)
+            return BatchItemResult(index=index, response=answer)
+        except Exception as e:
+            return BatchItemResult(index=index, error=f"Ошибка обработки сообщения: {str(e)}")
+
+
+def _start_batch(requests: List[MessageRequest]) -> List[asyncio.Task]:
+    session_locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+    return [
+        asyncio.create_task(_run_batch_item(index, request, session_locks[request.tenant_id, request.session_id]))
+        for index, request in enumerate(requests)
+    ]
+
+
+async def _ndjson_results(tasks: List[asyncio.Task]) -> AsyncIterator[str]:
+    """Отдает результаты по мере готовности, по одной JSON строке на элемент"""
+    try:
+        for finished in asyncio.as_completed(tasks):
+            item = await finished
+            yield item.model_dump_json() + "\n"
+    finally:
+        # Клиент отключился - отменяем оставшиеся элементы
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(request: MessageRequest, response: Response, http_request: Request):
+    """
+    Асинхронная обработка сообщения: задание сохраняется и сразу возвращается его id.
+
+    Ход выполняет пул исполнителей (CHAT_JOB_WORKERS) так же, как POST /api/v1/chat/;
+    результат - GET /api/v1/chat/jobs/{job_id}. Если свободных исполнителей ждут уже
+    CHAT_JOB_MAX_QUEUED заданий - 429.
+    """
+    try:
+        job = await chat_job_queue.submit(request.tenant_id, request.session_id, request.user_id, request.message)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    response.headers["Location"] = str(http_request.url_for("get_job", job_id=job.id))
+    return JobSubmitResponse(job_id=job.id, status=job.status, created_at=job.created_at)
+
+
+@router.get("/jobs/stats")
+async def job_stats():
+    """Очередь заданий: глубина очереди, занятость исполнителей, число заданий по статусам"""
+    return await chat_job_queue.stats()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Статус и результат задания: queued, running, succeeded (response) или failed (error, error_status).
+    Завершенные задания хранятся CHAT_JOB_TTL_SECONDS, затем - 404.
+    """
+    job = await chat_job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Задание '{job_id}' не найдено")
+    data = job.to_dict()
+    return JobResponse(job_id=data.pop("id"), **data)
+
+
+@router.post("/batch")
+async def process_batch(request: BatchRequest):
+    """
+    Пакетная обработка сообщений.
+
+    Сообщения выполняются параллельно (не более CHAT_BATCH_CONCURRENCY одновременно,
+    не более CHAT_BATCH_TENANT_CONCURRENCY на арендатора), сообщения одной сессии - по порядку.
+    Ошибка элемента возвращается в его результате и не прерывает пакет.
+    При stream=true результаты отдаются как application/x-ndjson по мере готовности
+    (поле index указывает позицию в запросе), иначе - списком в исходном порядке.
+    """
+    if len(request.messages) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много сообщений в пакете: {len(request.messages)} > {BATCH_MAX_ITEMS}"
+        )
+
+    tasks = _start_batch(request.messages)
+    if request.stream:
+        return StreamingResponse(_ndjson_results(tasks), media_type="application/x-ndjson")
+
+    try:
+        return BatchResponse(results=await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _sse(event: str, data: dict) -> str:
+    """Форматирует одно SSE событие"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _stream_event_to_sse(event: StreamEvent) -> Optional[str]:
+    """Преобразует событие SDK в SSE событие (или None, если событие не нужно клиенту)"""
+    if event.type == "raw_response_event":
+        if event.data.type == "response.output_text.delta":
+            return _sse("delta", {"delta": event.data.delta})
+        return None
+
+    if event.type == "agent_updated_stream_event":
+        return _sse("agent", {"agent": event.new_agent.name})
+
+    item = event.item
+    if event.name == "handoff_occured":
+        return _sse("handoff", {"from": item.source_agent.name, "to": item.target_agent.name})
+    if event.name == "tool_called":
+        return _sse("tool_call", {
+            "agent": item.agent.name,
+            "tool": getattr(item.raw_item, "name", None),
+            "arguments": getattr(item.raw_item, "arguments", None),
+        })
+    if event.name == "tool_output":
+        return _sse("tool_output", {"agent": item.agent.name, "output": str(item.output)})
+    return None
+
+
+async def _fan_out_events(agent: Agent, fan_out: FanOut) -> AsyncIterator[str]:
+    """
+    Отдает ход консультаций веерного режима так же, как их вызовы инструментами CEO Agent:
+    agent, tool_call для каждого отдела сразу и tool_output каждого по мере готовности
+    """
+    yield _sse("agent", {"agent": agent.name})
+    for department in fan_out.departments:
+        yield _sse("tool_call", {"agent": agent.name, "tool": CONSULTATION_TOOLS[department], "arguments": None})
+    for consultation in fan_out.as_completed():
+        _, answer = await consultation
+        yield _sse("tool_output", {"agent": agent.name, "output": answer})
+
+
+async def _sse_events(request: MessageRequest, result: RunResultStreaming, agent: Agent, decision: RouteDecision,
+                      guard: GuardrailDecision, announced: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Отдает события выполнения агентов, затем финальный ответ.
+    announced - агент, уже объявленный клиенту (его первое событие agent не повторяется)
+    """
+    try:
+        async for event in result.stream_events():
+            if announced and event.type == "agent_updated_stream_event" and event.new_agent.name == announced:
+                announced = None
+                continue
+            payload = _stream_event_to_sse(event)
+            if payload is not None:
+                yield payload
+        _record_route(request, agent, decision, result.last_agent)
+        yield _sse("done", {"response": str(result.final_output)})
+    except InputGuardrailTripwireTriggered:
+        yield _sse("done", {"response": input_guard.off_topic_reply(guard.language)})
+    except Exception as e:
+        yield _sse("error", {"detail": f"Ошибка обработки сообщения: {str(e)}"})
+    finally:
+        # Клиент отключился - останавливаем цепочку агентов
+        if not result.is_complete:
+            result.cancel()
+
+
+# Отметка _stream_turn: очередь сессии пройдена, начался ход (клиенту не отдается)
+_TURN_STARTED = ""
+
+
+async def _with_deadline(events: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Выполняет поток событий в отдельной задаче и ограничивает ход CHAT_TIMEOUT_SECONDS
+    (как в process_message, без ожидания очереди сессии): по истечении срока выполнение
+    отменяется, клиент получает событие error
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def produce() -> None:
+        try:
+            async for payload in events:
+                queue.put_nowait(payload)
+        finally:
+            queue.put_nowait(finished)
+
+    task = asyncio.create_task(produce())
+    deadline = None
+    try:
+        while True:
+            try:
+                payload = await asyncio.wait_for(
+                    queue.get(), None if deadline is None else max(deadline - loop.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                yield _sse("error", {"detail": f"Ответ не получен за {CHAT_TIMEOUT_SECONDS:g} с"})
+                return
+            if payload is finished:
+                await task
+                return
+            if payload == _TURN_STARTED:
+                deadline = loop.time() + CHAT_TIMEOUT_SECONDS if CHAT_TIMEOUT_SECONDS else None
+                continue
+            yield payload
+    finally:
+        # Клиент отключился или срок истек - останавливаем консультации и цепочку агентов
+        task.cancel()
+
+
+async def _stream_turn(request: MessageRequest, guard: GuardrailDecision) -> AsyncIterator[str]:
+    """Ждет своей очереди в сессии и отдает события выполнения"""
+    if guard.action == ANSWER:
+        yield _sse("done", {"response": guard.reply})
+        return
+
+    context_manager = await ContextManager.load(
+        session_id=request.session_id,
+        tenant_id=request.tenant_id,
+        user_id=request.user_id
+    )
+
+    agent, decision = _select_agent(request.message)
+    session = get_history_session(request.session_id, agent.name, request.tenant_id)
+    try:
+        async with session_queue.turn(request.session_id, request.tenant_id):
+            yield _TURN_STARTED
+            starting_agent, announced = agent, None
+            fan_out = _start_fan_out(agent, request.message, context_manager)
+            if fan_out is not None:
+                # Консультации - самая долгая часть хода: клиент видит их ход, а не тишину
+                try:
+                    async for payload in _fan_out_events(agent, fan_out):
+                        yield payload
+                    starting_agent, announced = await fan_out.synthesizer(), agent.name
+                finally:
+                    fan_out.cancel()
+            result = Runner.run_streamed(
+                starting_agent,
+                request.message,
+                session=session,
+                context=context_manager,
+                run_config=_run_config()
+            )
+            async for payload in _sse_events(request, result, agent, decision, guard, announced):
+                yield payload
+    except SessionQueueFull as e:
+        yield _sse("error", {"detail": str(e)})
+
+
+@router.post("/stream")
+async def stream_message(request: MessageRequest):
+    """
+    Обработка сообщения с потоковой отдачей (Server-Sent Events).
+
+    События: agent, handoff, tool_call, tool_output, delta, done, error.
+    В веерном режиме CEO Agent (CEO_FANOUT_ENABLED) консультации отделов приходят событиями
+    tool_call (сразу) и tool_output (по мере готовности) до ответа CEO Agent.
+    История сохраняется в сессию так же, как в process_message.
+    Ходы одной сессии выполняются по очереди (как в process_message), при полной очереди - 429.
+    Локальные проверки сообщения - как в process_message; готовый ответ приходит событием done.
+    Ход ограничен CHAT_TIMEOUT_SECONDS, как в process_message: по истечении срока - событие error.
+    """
+    try:
+        guard = input_guard.enforce(request.message, request.tenant_id)
+    except InputRejected as e:
+        raise HTTPException(status_code=e.status, detail=f"Сообщение отклонено: {e}")
+    if session_queue.is_full(request.session_id, request.tenant_id):
+        raise HTTPException(status_code=429, detail=f"Слишком много запросов для сессии '{request.session_id}'")
+
+    return StreamingResponse(
+        _with_deadline(_stream_turn(request, guard)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/routing/metrics")
+async def routing_metrics():
+    """Метрики локального пре-роутера (доля быстрых маршрутов, задержка, согласие с route_agent)"""
+    return pre_router.metrics()
+
+
+@router.get("/guardrail/metrics")
+async def guardrail_metrics():
+    """Решения локальных проверок входящих сообщений по арендаторам, проверкам и действиям"""
+    return input_guard.stats()
+
+
+@router.get("/speculation")
+async def speculation_metrics():
+    """Спекулятивный запуск специалиста по арендаторам: доля попаданий, выигрыш по задержке, лишние токены"""
+    return speculation_stats()
+
+
+@router.get("/admission")
+async def admission_stats():
+    """Состояние допуска: занятые и ожидающие слоты, остаток лимитов арендаторов"""
+    return get_admission_controller().stats()
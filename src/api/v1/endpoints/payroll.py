@@ -0,0 +1,108 @@
+"""
+Эндпоинты для расчетов по зарплате
+"""
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, model_validator
+
+from agents_core.agents.context.payroll_engine import STATUS_NAMES, simulate_raises
+from agents_core.storage.employee_directory import get_employee_directory
+
+router = APIRouter()
+
+
+class RaiseSimulationRequest(BaseModel):
+    tenant_id: str = "default"
+    # Сотрудники из справочника (весь арендатор или один отдел)...
+    department: Optional[str] = None
+    # ...или явные массивы зарплат и рейтингов
+    salaries: Optional[List[float]] = None
+    ratings: Optional[List[int]] = None
+    # Один процент для всех или процент для каждого сотрудника
+    requested_percentage: Optional[int] = None
+    requested_percentages: Optional[List[int]] = None
+    # По умолчанию - доступные проценты из конфигурации арендатора
+    available_percentages: Optional[List[int]] = None
+    include_employees: bool = False
+
+    @model_validator(mode="after")
+    def _ratings_need_salaries(self) -> "RaiseSimulationRequest":
+        # Без salaries рейтинги берутся из справочника, явные ratings не применились бы - 422
+        if self.ratings is not None and self.salaries is None:
+            raise ValueError("ratings require salaries")
+        return self
+
+
+class EmployeeRaiseResult(BaseModel):
+    user_id: Optional[str] = None
+    status: str
+    applied_percentage: int
+    current_salary: float
+    new_salary: float
+
+
+class RaiseSimulationSummary(BaseModel):
+    employees: int
+    counts: dict
+    current_payroll: float
+    new_payroll: float
+    total_increase: float
+    budget_impact_percent: float
+
+
+class RaiseSimulationResponse(BaseModel):
+    summary: RaiseSimulationSummary
+    employees: Optional[List[EmployeeRaiseResult]] = None
+
+
+def _simulate(request: RaiseSimulationRequest) -> RaiseSimulationResponse:
+    directory = get_employee_directory()
+
+    if request.salaries is not None:
+        if request.ratings is None or len(request.ratings) != len(request.salaries):
+            raise ValueError("ratings must be provided for every salary")
+        user_ids, salaries, ratings = None, request.salaries, request.ratings
+    else:
+        user_ids, salaries, ratings = directory.salary_table(request.tenant_id, request.department)
+
+    if request.requested_percentages is not None:
+        if len(request.requested_percentages) != len(salaries):
+            raise ValueError("requested_percentages must have one value per employee")
+        requested = request.requested_percentages
+    elif request.requested_percentage is not None:
+        requested = request.requested_percentage
+    else:
+        raise ValueError("requested_percentage or requested_percentages is required")
+
+    available = request.available_percentages
+    if available is None:
+        available = directory.get_tenant_config(request.tenant_id)[1].percentages
+
+    simulation = simulate_raises(salaries, ratings, requested, available)
+    response = RaiseSimulationResponse(summary=RaiseSimulationSummary(**simulation.summary()))
+    if request.include_employees:
+        response.employees = [
+            EmployeeRaiseResult(
+                user_id=user_ids[i] if user_ids is not None else None,
+                status=STATUS_NAMES[int(status)],
+                applied_percentage=int(applied),
+                current_salary=float(current),
+                new_salary=float(new),
+            )
+            for i, (status, applied, current, new) in enumerate(zip(
+                simulation.status, simulation.applied_percentages,
+                simulation.current_salaries, simulation.new_salaries,
+            ))
+        ]
+    return response
+
+
+@router.post("/simulate", response_model=RaiseSimulationResponse)
+async def simulate_department_raises(request: RaiseSimulationRequest):
+    """Симуляция повышения зарплат для отдела или списка сотрудников (те же правила, что у Payroll Agent)"""
+    try:
+        # Расчет на больших массивах выполняется вне event loop
+        return await asyncio.to_thread(_simulate, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,15 +1,59 @@
 """
 FastAPI приложение для работы с AI агентами
 """
+import os
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+# Единственная точка настройки путей: пакеты приложения импортируются как agents_core.*
+# (общие синглтоны), API - как src.api.*. Модули агентов и API путь не меняют.
+src_dir = Path(__file__).resolve().parent
+for path in (src_dir, src_dir.parent):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
 from src.api.v1.routes import api_router
+from src.api.middleware import AdmissionMiddleware
+from agents_core.agents.pubsub_publisher import shutdown_publisher
+from agents_core.agents.event_log import event_log
+from agents_core.agents.registry import agent_registry
+from agents_core.agents.chat_jobs import chat_job_queue
+from agents_core.storage.session_store import close_session_backend
+from agents_core.storage.history_retention import history_retention
+from agents_core.agents.metrics import registry as metrics_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запуск и остановка приложения"""
+    # Агенты создаются при первом использовании; AGENT_WARMUP=false откладывает это до первого запроса
+    if os.getenv("AGENT_WARMUP", "true").lower() == "true":
+        agent_registry.warmup()
+    # Исполнители асинхронных заданий; задания, оставшиеся в очереди, выполняются снова
+    await chat_job_queue.start()
+    # Архивация неактивных сессий и обслуживание файлов истории
+    history_retention.start()
+    yield
+    await history_retention.stop()
+    await chat_job_queue.stop()
+    # Отправляем накопленные PubSub сообщения перед остановкой
+    shutdown_publisher()
+    # Закрываем пул соединений к базе истории
+    close_session_backend()
+    # Дописываем события хуков, оставшиеся в очереди журнала
+    event_log.close()
+
 
 app = FastAPI(
     title="AI Agents API",
     version="1.0.0",
     description="API для работы с AI агентами",
-    openapi_url="/api/v1/openapi.json"
+    openapi_url="/api/v1/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -21,6 +65,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Лимиты арендаторов и глобальная емкость для /api/v1/chat
+app.add_middleware(AdmissionMiddleware, path_prefix="/api/v1/chat")
+
 # Подключение API роутов
 app.include_router(api_router, prefix="/api/v1")
 
@@ -34,6 +81,11 @@ async def health_check():
     """Проверка здоровья приложения"""
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Метрики агентов, инструментов и передач в формате Prometheus"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,12 @@
+import os
+import sys
+from pathlib import Path
+
+# The app imports its packages from src (agents_core, api), like main.py
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+
+# Offline: the mock model, no event log output
+os.environ.setdefault("MODEL_PROVIDER", "mock")
+os.environ.setdefault("EVENT_LOG_ENABLED", "false")
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agents_core.agents.admission import AdmissionConfig, AdmissionController, AdmissionRejected, TenantLimits
+from api.middleware import AdmissionMiddleware
+
+
+def _write(path, content: str, mtime: float) -> None:
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_bad_config_file_keeps_last_good_limits(tmp_path, monkeypatch):
+    path = tmp_path / "admission.json"
+    _write(path, json.dumps({"default": {"requests_per_second": 5, "request_burst": 100}}), 1000)
+    controller = AdmissionController(AdmissionConfig(), config_path=str(path), reload_seconds=0)
+    assert controller.config.default.requests_per_second == 5
+
+    parsed = []
+    original = AdmissionConfig.with_overrides
+    monkeypatch.setattr(AdmissionConfig, "with_overrides", lambda self, data: parsed.append(data) or original(self, data))
+
+    bad_files = [
+        '{"default": {"requests_per_sec',
+        '{"default": {"requests_per_second": "5"}}',
+        '{"default": {"requests_per_second": -1}}',
+        '{"max_concurrency": 0}',
+        '{"tenants": {"acme": []}}',
+        '[]',
+    ]
+    for mtime, content in enumerate(bad_files, start=1001):
+        _write(path, content, mtime)
+        assert controller.reload() is False
+        # The bad file is not re-parsed while it stays unchanged
+        assert controller.reload() is False
+        controller.check_rate({"acme": (1, 10)})
+        assert controller.config.default.requests_per_second == 5
+    assert len(parsed) == len(bad_files) - 1
+
+    _write(path, json.dumps({"default": {"requests_per_second": 7}, "tenants": {"acme": {"request_burst": 3}}}), 2000)
+    assert controller.reload() is True
+    assert controller.config.limits_for("acme").requests_per_second == 7
+    assert controller.config.limits_for("acme").request_burst == 3
+
+
+@pytest.mark.parametrize("data", [{"max_queued": 1.5}, {"default": {"tokens_per_request": True}}])
+def test_config_values_are_validated(data):
+    with pytest.raises(ValueError):
+        AdmissionConfig().with_overrides(data)
+
+
+def test_tenant_buckets_are_capped():
+    controller = AdmissionController(AdmissionConfig(default=TenantLimits(requests_per_second=1, request_burst=10)), max_tenants=3)
+    for tenant in ("a", "b", "c", "a", "d"):
+        controller.check_rate({tenant: (1, 0)})
+    assert list(controller._buckets) == ["c", "a", "d"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_gets_its_tokens_back():
+    config = AdmissionConfig(max_concurrency=1, max_queued=0, default=TenantLimits(requests_per_second=1, request_burst=2))
+    controller = AdmissionController(config)
+    gate = await controller.admit({"acme": (1, 0)})
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.admit({"acme": (1, 0)})
+    assert rejected.value.reason == "queue_full"
+    assert controller._buckets["acme"].requests.tokens == pytest.approx(1, abs=0.01)
+    gate.release()
+
+
+def test_middleware_rejects_large_bodies():
+    async def app(scope, receive, send):
+        raise AssertionError("the body must not reach the app")
+
+    controller = AdmissionController(AdmissionConfig(), max_body_bytes=100)
+    client = TestClient(AdmissionMiddleware(app, controller=controller))
+    response = client.post("/api/v1/chat/", content=b'{"message": "' + b"x" * 200 + b'"}')
+    assert response.status_code == 413
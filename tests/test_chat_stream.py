@@ -0,0 +1,74 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+MESSAGE = "I need approval for a 10% raise and vacation 15-17 August"
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("chat")
+    with pytest.MonkeyPatch.context() as env:
+        env.setenv("SESSION_DB_PATH", str(directory / "history.db"))
+        env.setenv("CHAT_JOB_DB_PATH", str(directory / "jobs.db"))
+        env.setenv("PUBSUB_PROJECT_ID", "disabled")
+        from main import app
+
+        with TestClient(app) as client:
+            yield client
+
+
+def _events(client, message: str, session_id: str) -> list:
+    events = []
+    with client.stream("POST", "/api/v1/chat/stream", json={"message": message, "session_id": session_id}) as response:
+        assert response.status_code == 200
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event != "delta":
+                events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+def test_fan_out_consultations_stream_before_the_answer(client, monkeypatch):
+    monkeypatch.setenv("CEO_FANOUT_ENABLED", "true")
+    events = _events(client, MESSAGE, "fan-out")
+
+    names = [event for event, _ in events]
+    assert names == ["agent", "tool_call", "tool_call", "tool_output", "tool_output", "done"]
+    assert events[0][1] == {"agent": "CEO Agent"}
+    assert {data["tool"] for event, data in events if event == "tool_call"} == {"payroll_consultation", "hr_consultation"}
+    outputs = [data["output"] for event, data in events if event == "tool_output"]
+    assert any(output.startswith("[mock payroll]") for output in outputs)
+    assert any(output.startswith("[mock hr]") for output in outputs)
+    assert events[-1][1]["response"].startswith("[mock ceo]")
+
+
+def test_without_fan_out_ceo_consults_through_its_tools(client, monkeypatch):
+    monkeypatch.setenv("CEO_FANOUT_ENABLED", "false")
+    events = _events(client, MESSAGE, "no-fan-out")
+
+    assert events[0] == ("agent", {"agent": "CEO Agent"})
+    assert events[-1][0] == "done"
+
+
+def test_stream_stops_at_the_chat_deadline(client, monkeypatch):
+    from src.api.v1.endpoints import chat
+    from agents_core.agents import ceo_fanout
+
+    async def stalled(department, request, context):
+        await asyncio.sleep(30)
+
+    monkeypatch.setenv("CEO_FANOUT_ENABLED", "true")
+    monkeypatch.setattr(chat, "CHAT_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(ceo_fanout, "_consult", stalled)
+    start = time.perf_counter()
+    events = _events(client, MESSAGE, "deadline")
+
+    assert time.perf_counter() - start < 5
+    assert [event for event, _ in events] == ["agent", "tool_call", "tool_call", "error"]
+    assert "0.2" in events[-1][1]["detail"]
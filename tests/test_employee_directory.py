@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from agents_core.agents.context.context_manager import ContextManager
+from agents_core.storage.employee_directory import EmployeeDirectory, set_employee_directory
+
+EMPLOYEE = {
+    "tenant_id": "acme", "user_id": "u1", "first_name": "Ann", "last_name": "Lee", "position": "Engineer",
+    "current_salary": 100000, "employee_rating": 85,
+}
+
+
+@pytest.fixture
+def directory(tmp_path):
+    directory = EmployeeDirectory(str(tmp_path / "employees.db"))
+    yield directory
+    directory.close()
+
+
+def test_reloading_an_employee_bumps_the_version(directory):
+    assert directory.load_employees([EMPLOYEE]) == 1
+    first = directory.get("acme", "u1").version
+    directory.load_employees([dict(EMPLOYEE, current_salary=110000)])
+    second = directory.get("acme", "u1")
+    assert second.user_context.current_salary == 110000
+    assert second.version > first
+    directory.upsert_employee(**dict(EMPLOYEE, employee_rating=90))
+    assert directory.get("acme", "u1").version > second.version
+
+
+@pytest.mark.asyncio
+async def test_context_is_loaded_off_the_event_loop(directory, monkeypatch):
+    directory.load_employees([EMPLOYEE])
+    set_employee_directory(directory)
+    loop_thread = threading.current_thread()
+    load = directory._load
+    threads = []
+    monkeypatch.setattr(directory, "_load", lambda *args: threads.append(threading.current_thread()) or load(*args))
+    try:
+        context = await ContextManager.load(session_id="s1", tenant_id="acme", user_id="u1")
+        assert context.user_context.first_name == "Ann"
+        assert threads and loop_thread not in threads
+        # An LRU hit does not read SQLite
+        await ContextManager.load(session_id="s1", tenant_id="acme", user_id="u1")
+        assert len(threads) == 1
+    finally:
+        set_employee_directory(None)
+
+
+def test_read_racing_a_write_is_not_cached(directory, monkeypatch):
+    directory.load_employees([EMPLOYEE])
+    load = directory._load
+
+    def load_then_write(*args):
+        record = load(*args)
+        directory.upsert_employee(**dict(EMPLOYEE, first_name="Anna"))
+        return record
+
+    monkeypatch.setattr(directory, "_load", load_then_write)
+    assert directory.get("acme", "u1").user_context.first_name == "Ann"
+    monkeypatch.setattr(directory, "_load", load)
+    assert directory.get("acme", "u1").user_context.first_name == "Anna"
@@ -0,0 +1,50 @@
+import gc
+from types import SimpleNamespace
+
+import pytest
+from agents import Agent
+from agents.usage import Usage
+
+from agents_core.agents import hooks as hooks_module
+from agents_core.agents.hooks import UnifiedAgentHooks
+
+
+def _context(usage: Usage, **fields) -> SimpleNamespace:
+    request = SimpleNamespace(tenant_id="tests", session_id="s1", user_context=None)
+    return SimpleNamespace(context=request, usage=usage, **fields)
+
+
+@pytest.mark.asyncio
+async def test_state_of_an_abandoned_run_is_dropped(monkeypatch):
+    monkeypatch.setattr(hooks_module, "get_publisher", lambda: None)
+    hooks = UnifiedAgentHooks()
+    agent = Agent(name="HR Agent")
+    tool = SimpleNamespace(name="get_employee_info")
+
+    # Cancelled run: on_end and on_tool_end never come
+    usage = Usage()
+    await hooks.on_start(_context(usage), agent)
+    await hooks.on_tool_start(_context(usage, tool_call_id="call-1"), agent, tool)
+    assert len(hooks._states) == 1
+    del usage
+    gc.collect()
+    assert hooks._states == {}
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_counted_per_run(monkeypatch):
+    monkeypatch.setattr(hooks_module, "get_publisher", lambda: None)
+    observed = []
+    monkeypatch.setattr(
+        hooks_module.agent_input_tokens, "observe", lambda value, *labels: observed.append(value)
+    )
+    hooks = UnifiedAgentHooks()
+    agent = Agent(name="HR Agent")
+
+    usage = Usage(input_tokens=100)
+    context = _context(usage)
+    await hooks.on_start(context, agent)
+    usage.input_tokens += 40
+    await hooks.on_end(context, agent, "done")
+    assert observed == [40]
+    assert hooks._states[id(usage)].agents == {}
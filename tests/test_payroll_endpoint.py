@@ -0,0 +1,24 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.v1.endpoints.payroll import router
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(router, prefix="/payroll")
+    return TestClient(app)
+
+
+def test_ratings_without_salaries_are_rejected():
+    response = _client().post("/payroll/simulate", json={"ratings": [90, 80], "requested_percentage": 10})
+    assert response.status_code == 422
+    assert "ratings require salaries" in response.text
+
+
+def test_explicit_salaries_and_ratings():
+    response = _client().post("/payroll/simulate", json={
+        "salaries": [1000, 2000], "ratings": [90, 60], "requested_percentage": 10, "available_percentages": [10],
+    })
+    assert response.status_code == 200
+    assert response.json()["summary"]["new_payroll"] == 3100
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from agents_core.agents.context.payroll_engine import (
+    APPROVED,
+    CAPPED,
+    PERCENTAGE_UNAVAILABLE,
+    RATING_TOO_LOW,
+    evaluate_raise,
+    max_allowed_increase,
+    max_allowed_increases,
+    simulate_raises,
+)
+
+AVAILABLE = [[5, 10, 15, 20, 25], [10], [3, 7, 30], []]
+
+
+def legacy_raise(current_salary, employee_rating, percentage, available_percentages):
+    """The rules as calculate_salary_increase applied them inline before the payroll engine."""
+    if percentage not in available_percentages:
+        return PERCENTAGE_UNAVAILABLE, 0, current_salary
+    if employee_rating < 70:
+        return RATING_TOO_LOW, 0, current_salary
+    max_allowed_percentage = min(percentage, employee_rating // 10 * 5)
+    if max_allowed_percentage < percentage:
+        return CAPPED, max_allowed_percentage, current_salary * (1 + max_allowed_percentage / 100)
+    return APPROVED, percentage, current_salary * (1 + percentage / 100)
+
+
+def legacy_max_allowed(employee_rating, available_percentages):
+    """get_max_allowed_salary_increase before the payroll engine (0: none allowed)."""
+    if employee_rating < 70:
+        return 0
+    allowed = [p for p in available_percentages if p <= employee_rating // 10 * 5]
+    return max(allowed) if allowed else 0
+
+
+@pytest.fixture(scope="module")
+def grid():
+    """Every rating 0-100 x requested percentage 0-30, on random salaries."""
+    ratings, percentages = np.meshgrid(np.arange(0, 101), np.arange(0, 31))
+    ratings, percentages = ratings.ravel(), percentages.ravel()
+    salaries = np.random.default_rng(0).uniform(10_000, 500_000, ratings.size).round(2)
+    return salaries, ratings, percentages
+
+
+@pytest.mark.parametrize("available", AVAILABLE)
+def test_scalar_rules_match_legacy(grid, available):
+    for salary, rating, percentage in zip(*(values.tolist() for values in grid)):
+        assert evaluate_raise(salary, rating, percentage, available) == legacy_raise(salary, rating, percentage, available)
+        assert max_allowed_increase(rating, available) == legacy_max_allowed(rating, available)
+
+
+@pytest.mark.parametrize("available", AVAILABLE)
+def test_vectorized_rules_match_scalar(grid, available):
+    salaries, ratings, percentages = grid
+    simulation = simulate_raises(salaries, ratings, percentages, available)
+    allowed = max_allowed_increases(ratings, available)
+    for i in range(ratings.size):
+        expected = evaluate_raise(float(salaries[i]), int(ratings[i]), int(percentages[i]), available)
+        actual = (int(simulation.status[i]), int(simulation.applied_percentages[i]), float(simulation.new_salaries[i]))
+        assert actual == expected, (salaries[i], ratings[i], percentages[i])
+        assert int(allowed[i]) == max_allowed_increase(int(ratings[i]), available)
+
+
+def test_summary_totals(grid):
+    salaries, ratings, percentages = grid
+    summary = simulate_raises(salaries, ratings, percentages, AVAILABLE[0]).summary()
+    expected = sum(
+        evaluate_raise(salary, rating, percentage, AVAILABLE[0])[2]
+        for salary, rating, percentage in zip(*(values.tolist() for values in grid))
+    )
+    assert summary["employees"] == ratings.size
+    assert sum(summary["counts"].values()) == ratings.size
+    assert summary["new_payroll"] == pytest.approx(expected)
+    assert summary["total_increase"] == pytest.approx(expected - salaries.sum())
@@ -0,0 +1,52 @@
+import json
+from concurrent.futures import Future
+
+from agents_core.agents.pubsub_publisher import PubSubPublisher
+
+
+class StalledClient:
+    """Publisher client whose messages are never confirmed."""
+
+    def __init__(self):
+        self.futures = []
+
+    def topic_path(self, project_id, topic_id):
+        return f"projects/{project_id}/topics/{topic_id}"
+
+    def publish(self, topic, data, **attributes):
+        self.futures.append(Future())
+        return self.futures[-1]
+
+
+def test_overflow_is_spilled_by_the_writer_thread(tmp_path, monkeypatch):
+    path = tmp_path / "spill.jsonl"
+    publisher = PubSubPublisher("p", "t", client=StalledClient(), max_pending=2, overflow="spill", spill_path=str(path))
+    writes = []
+    original = publisher._write_spill
+    monkeypatch.setattr(publisher, "_write_spill", lambda records: writes.append(len(records)) or original(records))
+
+    sent = [publisher.publish({"n": n}, tenant="acme") for n in range(50)]
+
+    assert sent[:2] == [True, True] and not any(sent[2:])
+    # Confirms the two in-flight messages so flush only waits for the spill writer
+    for future in publisher._client.futures:
+        future.set_result("id")
+    assert publisher.flush(timeout=5)
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["data"]["n"] for line in lines] == list(range(2, 50))
+    assert lines[0]["attributes"] == {"tenant": "acme"}
+    assert publisher.stats["spilled"] == 48 and publisher.stats["dropped"] == 0
+    assert sum(writes) == 48
+    publisher.shutdown(timeout=1)
+    assert publisher._spill_thread is None
+
+
+def test_spill_queue_overflow_is_dropped(tmp_path):
+    publisher = PubSubPublisher("p", "t", client=StalledClient(), max_pending=0, overflow="spill",
+                                spill_path=str(tmp_path / "missing" / "spill.jsonl"), spill_queue_size=1)
+    for n in range(20):
+        publisher.publish({"n": n})
+    publisher._spill_queue.join()
+    # Unwritable file: everything ends up dropped, nothing is spilled
+    assert publisher.stats["dropped"] == 20
+    assert publisher.stats["spilled"] == 0
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from agents_core.agents.request_dedup import IdempotencyConflict, idempotency_cache, request_fingerprint, run_deduplicated
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_another_body_is_rejected_while_in_flight():
+    release = asyncio.Event()
+    runs = []
+
+    async def slow(answer):
+        runs.append(answer)
+        await release.wait()
+        return answer
+
+    first = asyncio.create_task(run_deduplicated("acme", request_fingerprint("a"), lambda: slow("a"), "key-1"))
+    await asyncio.sleep(0)
+    with pytest.raises(IdempotencyConflict):
+        await run_deduplicated("acme", request_fingerprint("b"), lambda: slow("b"), "key-1")
+    # The same body joins the running request; another tenant has its own keys
+    same = asyncio.create_task(run_deduplicated("acme", request_fingerprint("a"), lambda: slow("a"), "key-1"))
+    other = asyncio.create_task(run_deduplicated("globex", request_fingerprint("b"), lambda: slow("b"), "key-1"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == ("a", False)
+    assert await same == ("a", False)
+    assert await other == ("b", False)
+    assert runs == ["a", "b"]
+    with pytest.raises(IdempotencyConflict):
+        await run_deduplicated("acme", request_fingerprint("b"), lambda: slow("b"), "key-1")
+
+
+@pytest.mark.asyncio
+async def test_failed_request_frees_the_key():
+    async def fail():
+        raise RuntimeError("model down")
+
+    async def succeed():
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await run_deduplicated("acme", request_fingerprint("a"), fail, "key-2")
+    assert await run_deduplicated("acme", request_fingerprint("b"), succeed, "key-2") == ("ok", False)
+    assert ("acme", "key-2") not in idempotency_cache._in_flight
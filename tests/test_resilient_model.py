@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import deque
+
+import httpx
+import openai
+import pytest
+
+from agents_core.agents.resilient_model import (
+    CircuitBreaker,
+    CircuitOpen,
+    ModelPolicy,
+    ModelTimeout,
+    ResilientModel,
+    is_retryable,
+)
+
+
+class ScriptedModel:
+    """Model stub; each call takes the next scripted reply: ("ok", delay_s) or ("error", exception)."""
+
+    def __init__(self, *replies: tuple):
+        self.script = deque(replies)
+        self.calls = 0
+
+    async def _reply(self) -> str:
+        self.calls += 1
+        kind, value = self.script.popleft() if self.script else ("ok", 0)
+        if kind == "error":
+            raise value
+        await asyncio.sleep(value)
+        return f"answer {self.calls}"
+
+    async def get_response(self, *args, **kwargs):
+        return await self._reply()
+
+    async def stream_response(self, *args, **kwargs):
+        yield await self._reply()
+        yield "end"
+
+
+def resilient(inner: ScriptedModel, breaker: CircuitBreaker = None, **policy) -> ResilientModel:
+    policy = {"timeout_seconds": 5, "backoff_seconds": 0.001, **policy}
+    return ResilientModel(inner, "test", ModelPolicy(**policy), breaker or CircuitBreaker(failure_threshold=0))
+
+
+def _status_error(status: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "http://model/v1/responses")
+    return openai.APIStatusError("injected", response=httpx.Response(status, request=request), body=None)
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (ConnectionError(), True),
+    (asyncio.TimeoutError(), True),
+    (_status_error(429), True),
+    (_status_error(503), True),
+    (_status_error(400), False),
+    (ValueError("bad"), False),
+])
+def test_retryable_errors(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    inner = ScriptedModel(("error", ConnectionError()), ("error", _status_error(503)), ("ok", 0))
+    assert await resilient(inner, max_attempts=3).get_response() == "answer 3"
+    assert inner.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_at_max_attempts():
+    inner = ScriptedModel(*[("error", ConnectionError())] * 3)
+    with pytest.raises(ConnectionError):
+        await resilient(inner, max_attempts=2).get_response()
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_is_raised_at_once():
+    inner = ScriptedModel(("error", _status_error(400)))
+    with pytest.raises(openai.APIStatusError):
+        await resilient(inner, max_attempts=3).get_response()
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_raises_model_timeout():
+    inner = ScriptedModel(("ok", 2.0))
+    start = time.perf_counter()
+    with pytest.raises(ModelTimeout):
+        await resilient(inner, timeout_seconds=0.1).get_response()
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_stream_is_retried_until_the_first_event():
+    inner = ScriptedModel(("error", ConnectionError()), ("ok", 0))
+    events = [event async for event in resilient(inner, max_attempts=2).stream_response()]
+    assert events == ["answer 2", "end"]
+
+
+@pytest.mark.asyncio
+async def test_hedge_overtakes_a_stalled_request():
+    inner = ScriptedModel()
+    hedged = resilient(inner, hedge=True, hedge_min_delay_seconds=0.02)
+    for _ in range(25):
+        inner.script.append(("ok", 0.005))
+        await hedged.get_response()
+    inner.script.extend([("ok", 2.0), ("ok", 0.005)])
+    start = time.perf_counter()
+    assert await hedged.get_response() == "answer 27"
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    inner = ScriptedModel(*[("error", ConnectionError())] * 3)
+    guarded = resilient(inner, breaker, max_attempts=1)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await guarded.get_response()
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpen) as raised:
+        await guarded.get_response()
+    assert inner.calls == 3
+    assert raised.value.retry_after > 0
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    inner = ScriptedModel(("error", ConnectionError()), ("ok", 0.1))
+    guarded = resilient(inner, breaker, max_attempts=1)
+    with pytest.raises(ConnectionError):
+        await guarded.get_response()
+    await asyncio.sleep(0.06)
+
+    probe = asyncio.create_task(guarded.get_response())
+    await asyncio.sleep(0.01)
+    assert breaker.state == "half_open"
+    # Only one probe at a time
+    with pytest.raises(CircuitOpen):
+        await guarded.get_response()
+    assert await probe == "answer 2"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    inner = ScriptedModel(("error", ConnectionError()), ("error", ConnectionError()))
+    guarded = resilient(inner, breaker, max_attempts=1)
+    with pytest.raises(ConnectionError):
+        await guarded.get_response()
+    await asyncio.sleep(0.06)
+
+    with pytest.raises(ConnectionError):
+        await guarded.get_response()
+    assert breaker.state == "open"
+    # The reset period starts again after the failed probe
+    with pytest.raises(CircuitOpen):
+        await guarded.get_response()
+    assert inner.calls == 2
+
+
+def test_cancelled_probe_lets_the_next_call_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    breaker.record_cancelled()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from agents_core.agents.session_queue import SessionQueue, SessionQueueFull
+
+
+@pytest.mark.asyncio
+async def test_tenants_sharing_a_session_id_do_not_queue_behind_each_other():
+    queue = SessionQueue(max_waiting=0)
+    async with queue.turn("default", "acme"):
+        assert queue.is_full("default", "acme")
+        assert not queue.is_full("default", "globex")
+        async with queue.turn("default", "globex"):
+            pass
+        with pytest.raises(SessionQueueFull):
+            async with queue.turn("default", "acme"):
+                pass
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_turns_of_a_session_run_in_order():
+    queue = SessionQueue()
+    order = []
+
+    async def turn(number: int) -> None:
+        async with queue.turn("s1", "acme"):
+            order.append(number)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(turn(number) for number in range(4)))
+    assert order == [0, 1, 2, 3]
+    assert queue.waiting("s1", "acme") == 0
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+from agents import SQLiteSession
+
+from agents_core.storage.session_store import ShardedSessionBackend, SQLitePoolBackend, StoredSession
+
+USER = {"role": "user", "content": "How many vacation days do I have?"}
+ANSWER = {"role": "assistant", "content": "14 days."}
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLitePoolBackend(str(tmp_path / "history.db"), pool_size=2)
+    yield backend
+    backend.close()
+
+
+@pytest.mark.asyncio
+async def test_tenants_do_not_share_a_session_id(backend):
+    acme, globex = StoredSession("s1", backend, "acme"), StoredSession("s1", backend, "globex")
+    await acme.add_items([USER, ANSWER])
+    await backend.save_summary("s1", "acme summary", 1, tenant_id="acme")
+
+    assert await globex.get_items() == []
+    assert await backend.get_tail("s1", tenant_id="globex") == ("", 0, [])
+    assert await globex.pop_item() is None
+    await globex.clear_session()
+    assert await acme.get_items() == [USER, ANSWER]
+    summary, until_id, _ = await backend.get_tail("s1", tenant_id="acme")
+    assert (summary, until_id) == ("acme summary", 1)
+
+
+@pytest.mark.asyncio
+async def test_sharded_backend_routes_by_tenant(tmp_path):
+    backend = ShardedSessionBackend.sqlite(str(tmp_path / "history.db"), 4)
+    try:
+        await backend.add_items("s1", [USER], tenant_id="acme")
+        assert await backend.get_items("s1", tenant_id="acme") == [USER]
+        assert await backend.get_items("s1", tenant_id="globex") == []
+        assert await backend.backend_for("acme", "s1").get_items("s1", tenant_id="acme") == [USER]
+    finally:
+        backend.close()
+
+
+@pytest.mark.asyncio
+async def test_archive_records_carry_the_tenant(backend):
+    await backend.add_items("s1", [USER], tenant_id="acme")
+    await backend.add_items("s1", [ANSWER], tenant_id="globex")
+    with sqlite3.connect(backend.db_path) as conn:
+        conn.execute("UPDATE agent_sessions SET updated_at = datetime('now', '-1 hour')")
+    records = []
+    assert await backend.archive_idle_sessions(60, records.extend) == 2
+    assert sorted((r["tenant_id"], r["session_id"], r["items"][0]["role"]) for r in records) == [
+        ("acme", "s1", "user"), ("globex", "s1", "assistant"),
+    ]
+    assert await backend.get_items("s1", tenant_id="acme") == []
+
+
+@pytest.mark.asyncio
+async def test_files_without_tenants_are_migrated(tmp_path):
+    path = str(tmp_path / "history.db")
+    legacy = SQLiteSession("s1", path)
+    await legacy.add_items([USER, ANSWER])
+    legacy.close()
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE agent_session_summaries (session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+            "until_id INTEGER NOT NULL, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.execute("INSERT INTO agent_session_summaries (session_id, summary, until_id) VALUES ('s1', 'old', 1)")
+        ids = [row[0] for row in conn.execute("SELECT id FROM agent_messages ORDER BY id")]
+
+    backend = SQLitePoolBackend(path, pool_size=2, legacy_tenant="acme")
+    try:
+        assert await backend.get_items("s1", tenant_id="acme") == [USER, ANSWER]
+        assert await backend.get_items("s1", tenant_id="default") == []
+        summary, until_id, items = await backend.get_tail("s1", tenant_id="acme")
+        assert (summary, until_id, [item_id for item_id, _ in items]) == ("old", 1, ids[1:])
+        # New items continue after the migrated ids
+        await backend.add_items("s1", [USER], tenant_id="acme")
+        _, _, items = await backend.get_tail("s1", tenant_id="acme")
+        assert items[-1][0] > ids[-1]
+    finally:
+        backend.close()
+    # Opening a migrated file again leaves it as it is
+    SQLitePoolBackend(path, pool_size=1).close()
+    with sqlite3.connect(path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert not any(name.endswith("_legacy") for name in tables)
+        assert conn.execute("SELECT COUNT(*) FROM agent_messages").fetchone()[0] == 3
@@ -0,0 +1,22 @@
+from agents_core.agents.context.tool_cache import ToolCache
+
+
+def test_keys_do_not_grow_generation_tables():
+    cache = ToolCache()
+    for user in range(100):
+        cache.make_key("acme", str(user), "get_user_info", {}, 1)
+    assert len(cache._tenant_generation) == 0
+    assert len(cache._user_generation) == 0
+
+
+def test_invalidation_changes_the_key():
+    cache = ToolCache()
+    key = cache.make_key("acme", "u1", "get_user_info", {}, 1)
+    cache.put(key, "old")
+    cache.invalidate_user("acme", "u1")
+    new_key = cache.make_key("acme", "u1", "get_user_info", {}, 1)
+    assert new_key != key
+    assert cache.make_key("acme", "u2", "get_user_info", {}, 1)[-1] == 0
+
+    cache.invalidate_tenant("acme")
+    assert cache.make_key("acme", "u1", "get_user_info", {}, 1) != new_key